@@ -0,0 +1,296 @@
+"""
+GHHS-EC&DC - asyncio interface
+Non-blocking encryption for asyncio services.
+
+Key derivation and AEAD work run on a bounded thread pool; a semaphore
+limits how many operations are in flight, so callers wait (backpressure)
+instead of piling work into the executor queue. The event loop itself
+never runs PBKDF2, scrypt, Argon2id or AES-GCM.
+
+Example:
+    async with AsyncEncryptor(max_concurrency=4) as crypto:
+        token = await crypto.encrypt(b"data", password)
+        data = await crypto.decrypt(token, password)
+"""
+
+import asyncio
+import functools
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from secure_crypto import (
+    AESGCMEncryptor, Compression, DecryptionError, DerivedKeyCache, KDFParams, StreamHeader
+)
+
+
+async def _read_up_to(reader: asyncio.StreamReader, size: int) -> bytes:
+    """Read exactly ``size`` bytes, or fewer at end of stream."""
+    try:
+        return await reader.readexactly(size)
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+
+
+class AsyncEncryptor:
+    """
+    asyncio façade over AESGCMEncryptor.
+    
+    Produces and accepts exactly the same data as the synchronous API.
+    """
+    
+    def __init__(self, max_concurrency: Optional[int] = None,
+                 executor: Optional[Executor] = None,
+                 kdf: Optional[KDFParams] = None,
+                 key_cache: Optional[DerivedKeyCache] = None,
+                 compression: Optional[str] = None):
+        """
+        Args:
+            max_concurrency: Operations running at once (default: CPU count)
+            executor: Executor for the blocking work; a thread pool of
+                ``max_concurrency`` workers is created (and owned) when omitted
+            kdf: Key derivation for new data; LEGACY_KDF when omitted
+            key_cache: Optional cache of derived keys shared between calls
+            compression: Codec compressing new data (see Compression.available())
+        """
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        if self.max_concurrency < 1:
+            raise ValueError("Concurrency limit must be positive")
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix='ghhs-crypto')
+        self._encryptor = AESGCMEncryptor(key_cache=key_cache, kdf=kdf, compression=compression)
+        # Created on first use so it binds to the running loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+    
+    async def __aenter__(self) -> "AsyncEncryptor":
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+    
+    async def aclose(self) -> None:
+        """Shut down the owned executor after running operations finish."""
+        if self._own_executor:
+            await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(self._executor.shutdown, wait=True))
+    
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run ``func(*args)`` on the executor once a concurrency slot is free."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args))
+    
+    async def encrypt(self, plaintext: bytes, password: str) -> bytes:
+        """Encrypt like ``AESGCMEncryptor.aes_encrypt`` without blocking the loop."""
+        return await self.run(self._encryptor.aes_encrypt, plaintext, password)
+    
+    async def decrypt(self, encrypted_data: bytes, password: str) -> bytes:
+        """
+        Decrypt like ``AESGCMEncryptor.aes_decrypt`` without blocking the loop.
+        
+        Raises:
+            DecryptionError: If decryption fails
+        """
+        return await self.run(self._encryptor.aes_decrypt, encrypted_data, password)
+    
+    async def encrypt_file(self, src_path: str, dst_path: str, password: str) -> int:
+        """Encrypt a file into the segmented container on the executor."""
+        return await self.run(self._encryptor.encrypt_file, src_path, dst_path, password)
+    
+    async def decrypt_file(self, src_path: str, dst_path: str, password: str) -> int:
+        """Decrypt a file on the executor."""
+        return await self.run(self._encryptor.decrypt_file, src_path, dst_path, password)
+    
+    async def open_writer(self, writer: asyncio.StreamWriter, password: str,
+                          segment_size: int = AESGCMEncryptor.SEGMENT_SIZE) -> "EncryptingWriter":
+        """Start a segmented container on ``writer``; the header is written immediately."""
+        stream = EncryptingWriter(self, writer, segment_size)
+        await stream._start(password)
+        return stream
+    
+    async def open_reader(self, reader: asyncio.StreamReader, password: str) -> "DecryptingReader":
+        """
+        Start decrypting a segmented container (or single-shot data) from ``reader``.
+        
+        Raises:
+            DecryptionError: If the header is invalid
+        """
+        stream = DecryptingReader(self, reader)
+        await stream._start(password)
+        return stream
+
+
+class EncryptingWriter:
+    """
+    Writes plaintext into a segmented container on an asyncio StreamWriter.
+    
+    Full segments are sealed on the executor and written with ``drain()``,
+    so a slow peer slows the producer down. One segment is held back until
+    more data arrives or ``close()`` marks it final, as the STREAM
+    construction requires.
+    
+    With a compression codec on the encryptor the segments are compressed
+    and framed as by ``encrypt_stream``. The header is written before any
+    data is seen, so there is no sample to skip compression by; segments
+    that do not shrink are stored raw.
+    """
+    
+    def __init__(self, crypto: AsyncEncryptor, writer: asyncio.StreamWriter, segment_size: int):
+        if not 0 < segment_size < 2 ** 32:
+            raise ValueError("Segment size must be between 1 and 2^32 - 1 bytes")
+        self._crypto = crypto
+        self._writer = writer
+        self._segment_size = segment_size
+        self._buffer = bytearray()
+        self._index = 0
+        self._seal: Optional[Callable[[int, bytes, bool], Tuple[bytes, int]]] = None
+        self.closed = False
+    
+    async def _start(self, password: str) -> None:
+        encryptor = self._crypto._encryptor
+        header = encryptor._new_header(self._segment_size, codec=encryptor._codec)
+        key = await self._crypto.run(encryptor._stream_key, password, header)
+        try:
+            aad = header.pack()
+            self._seal = encryptor._stream_sealer(AESGCM(key), header, aad)
+        finally:
+            encryptor._secure_wipe(key)
+        self._writer.write(aad)
+        await self._writer.drain()
+    
+    async def _emit(self, chunk: bytes, final: bool) -> None:
+        sealed, _ = await self._crypto.run(self._seal, self._index, chunk, final)
+        self._index += 1
+        self._writer.write(sealed)
+        await self._writer.drain()
+    
+    async def write(self, data: bytes) -> None:
+        """Buffer ``data`` and write every segment known not to be the last."""
+        if self.closed:
+            raise ValueError("Writer is closed")
+        self._buffer += data
+        while len(self._buffer) > self._segment_size:
+            chunk = bytes(self._buffer[:self._segment_size])
+            del self._buffer[:self._segment_size]
+            await self._emit(chunk, False)
+    
+    async def close(self) -> None:
+        """Seal the final segment. The underlying StreamWriter stays open."""
+        if self.closed:
+            return
+        self.closed = True
+        chunk = bytes(self._buffer)
+        self._buffer = bytearray()
+        await self._emit(chunk, True)
+        self._seal = None
+
+
+class DecryptingReader:
+    """
+    Reads plaintext from a segmented container on an asyncio StreamReader.
+    
+    Segments are authenticated on the executor before any of their bytes
+    are returned. Single-shot data has no segments; it is read completely
+    and decrypted in one step.
+    """
+    
+    def __init__(self, crypto: AsyncEncryptor, reader: asyncio.StreamReader):
+        self._crypto = crypto
+        self._reader = reader
+        self._aesgcm: Optional[AESGCM] = None
+        self._header: Optional[StreamHeader] = None
+        self._aad = b""
+        self._index = 0
+        self._next = b""
+        self._buffer = bytearray()
+        self._eof = False
+    
+    async def _start(self, password: str) -> None:
+        encryptor = self._crypto._encryptor
+        head = await _read_up_to(self._reader, StreamHeader.PREFIX_SIZE)
+        if not head.startswith(StreamHeader.MAGIC):
+            data = head + await self._reader.read()
+            self._buffer += await self._crypto.run(encryptor.aes_decrypt, data, password)
+            self._eof = True
+            return
+        
+        head += await _read_up_to(self._reader, StreamHeader.size_from_prefix(head) - len(head))
+        header = StreamHeader.unpack(head)
+        key = await self._crypto.run(encryptor._stream_key, password, header)
+        try:
+            self._aesgcm = AESGCM(key)
+        finally:
+            encryptor._secure_wipe(key)
+        self._header = header
+        self._aad = head
+        self._next = await self._read_sealed()
+    
+    async def _read_sealed(self) -> bytes:
+        header = self._header
+        if not header.framed:
+            return await _read_up_to(self._reader, header.sealed_size)
+        prefix = await _read_up_to(self._reader, header.FRAME.size)
+        if not prefix:
+            return b""
+        (length,) = header.FRAME.unpack(prefix) if len(prefix) == header.FRAME.size else (0,)
+        if not StreamHeader.TAG_SIZE < length <= header.max_frame:
+            raise DecryptionError("Encrypted stream is truncated or has an invalid segment length")
+        return await _read_up_to(self._reader, length)
+    
+    def _open(self, index: int, sealed: bytes, final: bool) -> bytes:
+        header = self._header
+        try:
+            plaintext = self._aesgcm.decrypt(*header.opening_params(index, sealed, final, self._aad))
+        except InvalidTag as e:
+            raise DecryptionError("Decryption failed - wrong password or corrupted data") from e
+        if header.framed:
+            plaintext = Compression.unpack_segment(header.codec, plaintext, header.segment_size, final)
+        return plaintext
+    
+    async def _fill(self) -> None:
+        """Authenticate the next segment into the buffer."""
+        current = self._next
+        # One segment of lookahead tells whether the current one is final
+        full = self._header.framed or len(current) == self._header.sealed_size
+        self._next = await self._read_sealed() if full else b""
+        final = not self._next
+        self._buffer += await self._crypto.run(self._open, self._index, current, final)
+        self._index += 1
+        if final:
+            self._eof = True
+            self._aesgcm = None
+    
+    async def read(self, size: int = -1) -> bytes:
+        """
+        Read up to ``size`` plaintext bytes; everything that is left when ``size`` < 0.
+        
+        Returns b"" at the end of the container.
+        
+        Raises:
+            DecryptionError: If a segment fails authentication or the stream is truncated
+        """
+        while not self._eof and (size < 0 or len(self._buffer) < size):
+            await self._fill()
+        if size < 0 or size >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer = bytearray()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return data
+    
+    def __aiter__(self) -> "DecryptingReader":
+        return self
+    
+    async def __anext__(self) -> bytes:
+        """Iterate over authenticated plaintext chunks of up to one segment."""
+        chunk = await self.read(self._header.segment_size if self._header else -1)
+        if not chunk:
+            raise StopAsyncIteration
+        return chunk
@@ -0,0 +1,379 @@
+"""
+GHHS-EC&DC - Benchmark harness
+Measures the crypto core and the data paths used by the GUI.
+
+Usage:
+    python benchmark.py run [--output results.json] [--max-size 1G] [--repeat 5]
+    python benchmark.py compare baseline.json candidate.json [--threshold 0.10]
+
+Every benchmark is timed over several repeats (median and minimum are
+reported) and then run once more under tracemalloc to record the peak
+Python heap allocation of the operation.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import cryptography
+
+import secure_crypto
+
+
+DEFAULT_SIZES = ['1K', '64K', '1M', '16M', '128M', '1G']
+UNITS = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+
+def parse_size(text: str) -> int:
+    """Parse sizes like 64K, 16M or 1G."""
+    text = text.strip().upper()
+    if text and text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def format_size(size: int) -> str:
+    """Format a byte count with the largest exact unit."""
+    for suffix in ('G', 'M', 'K'):
+        if size >= UNITS[suffix] and size % UNITS[suffix] == 0:
+            return f"{size // UNITS[suffix]}{suffix}"
+    return str(size)
+
+
+class NullWriter(io.RawIOBase):
+    """Writable sink that discards data, so output buffering is not measured."""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        return len(data)
+
+
+def measure(name: str, func: Callable[[], object], repeat: int, size: Optional[int] = None) -> Dict:
+    """Time ``func`` and record its peak traced allocation."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(timings)
+    result = {
+        'name': name,
+        'size': size,
+        'repeat': repeat,
+        'median_s': median,
+        'min_s': min(timings),
+        'peak_bytes': peak,
+    }
+    if size:
+        result['throughput_mb_s'] = size / median / 1024 ** 2 if median else None
+    return result
+
+
+def bench_kdf(repeat: int) -> List[Dict]:
+    """Cost of a single key derivation with the default parameters of every available algorithm."""
+    salt = os.urandom(secure_crypto.AESGCMEncryptor.SALT_SIZE)
+    results = []
+    for name in secure_crypto.KDFParams.available():
+        kdf = secure_crypto.KDFParams.default(name)
+        results.append(measure(f'kdf.{name}', lambda: kdf.derive('benchmark', salt), repeat))
+    return results
+
+
+def bench_single_shot(sizes: List[int], repeat: int) -> List[Dict]:
+    """aes_encrypt/aes_decrypt, KDF included, as the GUI calls them."""
+    results = []
+    for size in sizes:
+        # One call per size, so its buffers are freed before the next size
+        results += _bench_single_shot_size(size, repeat)
+    return results
+
+
+def _bench_single_shot_size(size: int, repeat: int) -> List[Dict]:
+    plaintext = os.urandom(size)
+    encrypted = secure_crypto.aes_encrypt(plaintext, 'benchmark')
+    encryptor = secure_crypto.AESGCMEncryptor()
+    return [
+        measure('single_shot.encrypt', lambda: secure_crypto.aes_encrypt(plaintext, 'benchmark'), repeat, size),
+        measure('single_shot.decrypt', lambda: secure_crypto.aes_decrypt(encrypted, 'benchmark'), repeat, size),
+        measure('single_shot.encrypt_into',
+                lambda: encryptor.aes_encrypt_into(plaintext, 'benchmark'), repeat, size),
+        measure('single_shot.decrypt_into',
+                lambda: encryptor.aes_decrypt_into(encrypted, 'benchmark'), repeat, size),
+    ]
+
+
+def bench_records(count: int, repeat: int) -> List[Dict]:
+    """encrypt_many/decrypt_many over ``count`` small records; size is the plaintext total."""
+    records = [os.urandom(64 + i % 192) for i in range(count)]
+    size = sum(len(r) for r in records)
+    encryptor = secure_crypto.AESGCMEncryptor()
+    batch = encryptor.encrypt_many(records, 'benchmark')
+    results = [
+        measure(f'records.encrypt_many.{count}', lambda: encryptor.encrypt_many(records, 'benchmark'), repeat, size),
+        measure(f'records.decrypt_many.{count}', lambda: encryptor.decrypt_many(batch, 'benchmark'), repeat, size),
+    ]
+    for r in results:
+        r['records_per_s'] = count / r['median_s'] if r['median_s'] else None
+    return results
+
+
+def bench_archive(count: int, repeat: int, workers: int) -> List[Dict]:
+    """Pack ``count`` small files into one archive, list it and extract one entry."""
+    results = []
+    engine = secure_crypto.ParallelSegmentEngine(workers)
+    with tempfile.TemporaryDirectory(prefix='ghhs-bench-') as directory:
+        tree = os.path.join(directory, 'tree')
+        os.mkdir(tree)
+        for i in range(count):
+            with open(os.path.join(tree, f'{i:06d}.bin'), 'wb') as f:
+                f.write(os.urandom(256 + i % 4096))
+        sources = list(secure_crypto.archive_sources([tree]))
+        size = sum(os.path.getsize(path) for _, path in sources)
+        archive = os.path.join(directory, 'tree.ghar')
+        encryptor = secure_crypto.AESGCMEncryptor()
+        encryptor.pack_archive(sources, archive, 'benchmark')
+        name = sources[count // 2][0]
+
+        def extract_one():
+            with secure_crypto.open_archive(archive, 'benchmark') as f:
+                f.read(name)
+
+        results.append(measure(f'archive.pack.{count}',
+                               lambda: encryptor.pack_archive(sources, archive, 'benchmark'), repeat, size))
+        results.append(measure(f'archive.pack.{count}.parallel{workers}',
+                               lambda: encryptor.pack_archive(sources, archive, 'benchmark', engine=engine),
+                               repeat, size))
+        results.append(measure(f'archive.list.{count}',
+                               lambda: secure_crypto.open_archive(archive, 'benchmark').close(), repeat))
+        results.append(measure(f'archive.extract_one.{count}', extract_one, repeat))
+    for r in results[:2]:
+        r['files_per_s'] = count / r['median_s'] if r['median_s'] else None
+    return results
+
+
+def bench_update(sizes: List[int], repeat: int, workers: int) -> List[Dict]:
+    """Full encryption of an updatable container against updates after no and after one changed byte."""
+    results = []
+    engine = secure_crypto.ParallelSegmentEngine(workers)
+    encryptor = secure_crypto.AESGCMEncryptor()
+    with tempfile.TemporaryDirectory(prefix='ghhs-bench-') as directory:
+        source = os.path.join(directory, 'source')
+        target = os.path.join(directory, 'source.enc')
+        for size in sizes:
+            with open(source, 'wb') as f:
+                f.write(os.urandom(size))
+
+            def full():
+                os.remove(target + secure_crypto.SegmentManifest.SUFFIX)
+                encryptor.update_file(source, target, 'benchmark', engine=engine)
+
+            def change_one():
+                with open(source, 'r+b') as f:
+                    f.seek(size // 2)
+                    byte = f.read(1)
+                    f.seek(size // 2)
+                    f.write(bytes([byte[0] ^ 1]))
+                encryptor.update_file(source, target, 'benchmark', engine=engine)
+
+            encryptor.update_file(source, target, 'benchmark', engine=engine)
+            results.append(measure(f'update.full.parallel{workers}', full, repeat, size))
+            results.append(measure(f'update.unchanged.parallel{workers}',
+                                   lambda: encryptor.update_file(source, target, 'benchmark', engine=engine),
+                                   repeat, size))
+            results.append(measure(f'update.one_byte.parallel{workers}', change_one, repeat, size))
+    return results
+
+
+def bench_hex(sizes: List[int], repeat: int) -> List[Dict]:
+    """Hex round-trip used by the text fields of the GUI."""
+    results = []
+    for size in sizes:
+        results += _bench_hex_size(size, repeat)
+    return results
+
+
+def _bench_hex_size(size: int, repeat: int) -> List[Dict]:
+    data = os.urandom(size)
+    text = data.hex()
+    return [
+        measure('hex.encode', lambda: data.hex(), repeat, size),
+        measure('hex.decode', lambda: bytes.fromhex(text), repeat, size),
+    ]
+
+
+def bench_stream(sizes: List[int], repeat: int, workers: int) -> List[Dict]:
+    """
+    Streaming container, single-threaded and on the parallel engine.
+
+    The parallel results carry ``speedup`` over the single-threaded run of
+    the same size; each call includes one key derivation, so the ratio is
+    meaningful for sizes of a few MB and up.
+    """
+    results = []
+    engine = secure_crypto.ParallelSegmentEngine(workers)
+    for size in sizes:
+        results += _bench_stream_size(size, repeat, engine)
+    return results
+
+
+def _encrypted_stream(plaintext: bytes, segment_size: int) -> bytes:
+    sink = io.BytesIO()
+    secure_crypto.AESGCMEncryptor().encrypt_stream(io.BytesIO(plaintext), sink, 'benchmark', segment_size)
+    return sink.getvalue()
+
+
+def _bench_stream_size(size: int, repeat: int, engine: secure_crypto.ParallelSegmentEngine) -> List[Dict]:
+    segment_size = 1024 * 1024
+    plaintext = os.urandom(size)
+    encrypted = _encrypted_stream(plaintext, segment_size)
+
+    def encrypt(engine=None):
+        secure_crypto.AESGCMEncryptor().encrypt_stream(
+            io.BytesIO(plaintext), NullWriter(), 'benchmark', segment_size, engine=engine)
+
+    def decrypt(engine=None):
+        secure_crypto.AESGCMEncryptor().decrypt_stream(
+            io.BytesIO(encrypted), NullWriter(), 'benchmark', engine=engine)
+
+    def random_read():
+        with secure_crypto.open_encrypted(io.BytesIO(encrypted), 'benchmark') as f:
+            f.seek(size // 2)
+            f.read(4096)
+
+    workers = engine.workers
+    results = [
+        measure('stream.encrypt', encrypt, repeat, size),
+        measure(f'stream.encrypt.parallel{workers}', lambda: encrypt(engine), repeat, size),
+        measure('stream.decrypt', decrypt, repeat, size),
+        measure(f'stream.decrypt.parallel{workers}', lambda: decrypt(engine), repeat, size),
+        measure('stream.random_read_4k', random_read, repeat, size),
+    ]
+    for single, parallel in (results[0:2], results[2:4]):
+        parallel['speedup'] = single['median_s'] / parallel['median_s'] if parallel['median_s'] else None
+    return results
+
+
+def run(args: argparse.Namespace) -> int:
+    """Run the selected benchmark groups and write JSON results."""
+    max_size = parse_size(args.max_size)
+    sizes = [s for s in (parse_size(t) for t in args.sizes) if s <= max_size]
+    workers = args.workers or os.cpu_count() or 1
+    groups = set(args.only or ['kdf', 'single_shot', 'hex', 'stream', 'records', 'archive', 'update'])
+
+    results = []
+    if 'kdf' in groups:
+        results += bench_kdf(args.repeat)
+    if 'single_shot' in groups:
+        results += bench_single_shot(sizes, args.repeat)
+    if 'hex' in groups:
+        results += bench_hex(sizes, args.repeat)
+    if 'stream' in groups:
+        results += bench_stream(sizes, args.repeat, workers)
+    if 'records' in groups:
+        results += bench_records(args.records, args.repeat)
+    if 'archive' in groups:
+        results += bench_archive(args.archive_files, args.repeat, workers)
+    if 'update' in groups:
+        results += bench_update(sizes, args.repeat, workers)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'python': platform.python_version(),
+            'cryptography': cryptography.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'workers': workers,
+        },
+        'results': results,
+    }
+
+    for r in results:
+        size = format_size(r['size']) if r['size'] else '-'
+        throughput = f"{r['throughput_mb_s']:10.1f} MB/s" if r.get('throughput_mb_s') else ' ' * 15
+        speedup = f" {r['speedup']:6.2f}x" if r.get('speedup') else ''
+        print(f"{r['name']:<28} {size:>6} {r['median_s'] * 1000:12.3f} ms {throughput} "
+              f"peak {r['peak_bytes'] / 1024 ** 2:10.1f} MB{speedup}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    """Compare two result files; exit with 1 if any benchmark regressed."""
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = {(r['name'], r['size']): r for r in json.load(f)['results']}
+    with open(args.candidate, encoding='utf-8') as f:
+        candidate = json.load(f)['results']
+
+    regressions = 0
+    print(f"{'benchmark':<28} {'size':>6} {'time':>9} {'peak mem':>9}")
+    for new in candidate:
+        old = baseline.get((new['name'], new['size']))
+        if old is None:
+            continue
+        time_delta = new['median_s'] / old['median_s'] - 1 if old['median_s'] else 0.0
+        mem_delta = new['peak_bytes'] / old['peak_bytes'] - 1 if old['peak_bytes'] else 0.0
+        regressed = time_delta > args.threshold or mem_delta > args.threshold
+        regressions += regressed
+        size = format_size(new['size']) if new['size'] else '-'
+        print(f"{new['name']:<28} {size:>6} {time_delta:+9.1%} {mem_delta:+9.1%}"
+              f"{'  REGRESSION' if regressed else ''}")
+
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Benchmark entry point."""
+    parser = argparse.ArgumentParser(description='GHHS-EC&DC benchmark harness')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='run benchmarks')
+    run_parser.add_argument('-o', '--output', help='write results as JSON to this file')
+    run_parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help='payload sizes')
+    run_parser.add_argument('--max-size', default='1G', help='skip payloads larger than this')
+    run_parser.add_argument('--repeat', type=int, default=5, help='timed repeats per benchmark')
+    run_parser.add_argument('--workers', type=int, help='parallel engine workers (default: CPU count)')
+    run_parser.add_argument('--records', type=int, default=100000, help='record count of the records group')
+    run_parser.add_argument('--archive-files', type=int, default=10000,
+                            help='file count of the archive group')
+    run_parser.add_argument('--only', nargs='+',
+                            choices=['kdf', 'single_shot', 'hex', 'stream', 'records', 'archive', 'update'],
+                            help='run only these benchmark groups')
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser('compare', help='compare two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='relative slowdown or memory growth reported as a regression')
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,481 @@
+"""
+GHHS-EC&DC - Command-line interface
+Headless encryption/decryption of files, directories and pipes.
+
+Usage:
+    python -m crypto_cli encrypt [options] INPUT [INPUT ...]
+    python -m crypto_cli decrypt [options] INPUT [INPUT ...]
+    python -m crypto_cli verify [options] INPUT [INPUT ...]
+    python -m crypto_cli pack [options] -o ARCHIVE INPUT [INPUT ...]
+    python -m crypto_cli list [options] ARCHIVE
+    python -m crypto_cli unpack [options] ARCHIVE [NAME ...]
+    python -m crypto_cli calibrate [--kdf NAME] [--target SECONDS]
+
+An INPUT of "-" reads from stdin and writes to stdout (or to --output).
+This module must not import PyQt6.
+"""
+
+import argparse
+import getpass
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+import secure_crypto
+
+
+ENCRYPTED_SUFFIX = '.enc'
+DECRYPTED_SUFFIX = '.dec'
+
+
+def read_password(args: argparse.Namespace) -> str:
+    """Read the password from an env var, a file descriptor or an interactive prompt."""
+    if args.password_env:
+        password = os.environ.get(args.password_env, '')
+        if not password:
+            raise ValueError(f"Environment variable {args.password_env} is empty or not set")
+        return password
+
+    if args.password_fd is not None:
+        with os.fdopen(args.password_fd, 'r', closefd=False) as f:
+            password = f.readline().rstrip('\r\n')
+        if not password:
+            raise ValueError(f"No password could be read from file descriptor {args.password_fd}")
+        return password
+
+    password = getpass.getpass('Password: ')
+    if args.command in ('encrypt', 'pack') and password:
+        if getpass.getpass('Repeat password: ') != password:
+            raise ValueError("Passwords do not match")
+    if not password:
+        raise ValueError("Password cannot be empty")
+    return password
+
+
+def default_output_name(path: str, command: str) -> str:
+    """Derive the output file name from the input name."""
+    if command == 'encrypt':
+        return path + ENCRYPTED_SUFFIX
+    if path.endswith(ENCRYPTED_SUFFIX) and len(path) > len(ENCRYPTED_SUFFIX):
+        return path[:-len(ENCRYPTED_SUFFIX)]
+    return path + DECRYPTED_SUFFIX
+
+
+def is_checkpoint_file(path: str) -> bool:
+    """
+    Whether ``path`` is the partial output or journal of an interrupted
+    --resume run, or the segment manifest of an --update output.
+    """
+    manifest = secure_crypto.SegmentManifest
+    if path.endswith(manifest.SUFFIX):
+        return os.path.exists(path[:-len(manifest.SUFFIX)])
+    journal = secure_crypto.CheckpointJournal
+    if path.endswith(journal.JOURNAL_SUFFIX):
+        return os.path.exists(path[:-len(journal.JOURNAL_SUFFIX)] + journal.PARTIAL_SUFFIX)
+    if path.endswith(journal.PARTIAL_SUFFIX):
+        return os.path.exists(path[:-len(journal.PARTIAL_SUFFIX)] + journal.JOURNAL_SUFFIX)
+    return False
+
+
+def plan_jobs(inputs: List[str], output: Optional[str], command: str) -> Iterator[Tuple[str, str]]:
+    """
+    Expand inputs into (source, destination) pairs.
+
+    Directories are walked recursively, skipping leftovers of interrupted
+    --resume runs and --update manifests. With --output, several inputs or a directory input are
+    mirrored into the output directory; otherwise every output is written
+    next to its input.
+    """
+    into_directory = output is not None and (
+        len(inputs) > 1 or any(os.path.isdir(p) for p in inputs) or os.path.isdir(output))
+
+    for path in inputs:
+        if os.path.isdir(path):
+            root = os.path.abspath(path)
+            base = os.path.join(output, os.path.basename(root)) if into_directory else root
+            for dirpath, _, filenames in os.walk(root):
+                for filename in sorted(filenames):
+                    source = os.path.join(dirpath, filename)
+                    if is_checkpoint_file(source):
+                        continue
+                    target = os.path.join(base, os.path.relpath(source, root))
+                    yield source, default_output_name(target, command)
+        elif into_directory:
+            target = os.path.join(output, os.path.basename(path))
+            yield path, default_output_name(target, command)
+        else:
+            yield path, output or default_output_name(path, command)
+
+
+def run_stream(src: BinaryIO, dst: BinaryIO, password: str, command: str,
+               engine: Optional[secure_crypto.ParallelSegmentEngine],
+               kdf: Optional[secure_crypto.KDFParams] = None,
+               compression: Optional[str] = None) -> int:
+    """Encrypt or decrypt ``src`` into ``dst``."""
+    encryptor = secure_crypto.AESGCMEncryptor(kdf=kdf, compression=compression)
+    if command == 'encrypt':
+        return encryptor.encrypt_stream(src, dst, password, engine=engine)
+    return encryptor.decrypt_stream(src, dst, password, engine=engine)
+
+
+def write_atomically(src: BinaryIO, destination: str, password: str, command: str,
+                     force: bool, engine: Optional[secure_crypto.ParallelSegmentEngine],
+                     kdf: Optional[secure_crypto.KDFParams] = None,
+                     compression: Optional[str] = None) -> int:
+    """
+    Write the result to a temporary file next to ``destination`` and rename it
+    into place, so a failed or interrupted run never leaves partial output.
+    """
+    if os.path.exists(destination) and not force:
+        raise FileExistsError(f"{destination} already exists (use --force to overwrite)")
+
+    directory = os.path.dirname(os.path.abspath(destination))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.ghhs-', suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as dst:
+            written = run_stream(src, dst, password, command, engine, kdf, compression)
+        os.replace(tmp_path, destination)
+        return written
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def process_file(source: str, destination: str, password: str, command: str,
+                 force: bool, engine: Optional[secure_crypto.ParallelSegmentEngine],
+                 kdf: Optional[secure_crypto.KDFParams] = None,
+                 compression: Optional[str] = None) -> int:
+    """Encrypt or decrypt one file."""
+    with open(source, 'rb') as src:
+        return write_atomically(src, destination, password, command, force, engine, kdf, compression)
+
+
+def process_file_resumable(source: str, destination: str, password: str, command: str,
+                           force: bool, engine: Optional[secure_crypto.ParallelSegmentEngine],
+                           kdf: Optional[secure_crypto.KDFParams] = None,
+                           compression: Optional[str] = None) -> int:
+    """
+    Encrypt or decrypt one file through a checkpoint journal.
+
+    An interrupted run leaves ``destination.part`` and ``destination.journal``
+    behind; running the same command again continues from the last checkpoint.
+    """
+    if os.path.exists(destination) and not force:
+        raise FileExistsError(f"{destination} already exists (use --force to overwrite)")
+
+    os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+    encryptor = secure_crypto.AESGCMEncryptor(kdf=kdf, compression=compression)
+    if command == 'encrypt':
+        return encryptor.encrypt_file_resumable(source, destination, password, engine=engine)
+    return encryptor.decrypt_file_resumable(source, destination, password, engine=engine)
+
+
+def process_file_updatable(source: str, destination: str, password: str, command: str,
+                           force: bool, engine: Optional[secure_crypto.ParallelSegmentEngine],
+                           kdf: Optional[secure_crypto.KDFParams] = None,
+                           compression: Optional[str] = None) -> Tuple[int, int]:
+    """
+    Encrypt one file into an updatable container, or bring an existing one up to date.
+
+    ``destination.manifest`` records a digest of every segment; a later run
+    rewrites only the segments that changed. Returns (segments rewritten,
+    segments in the container). An existing output without a manifest is
+    only replaced with --force.
+    """
+    manifest = destination + secure_crypto.SegmentManifest.SUFFIX
+    if os.path.exists(destination) and not os.path.exists(manifest) and not force:
+        raise FileExistsError(f"{destination} already exists (use --force to overwrite)")
+
+    os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+    encryptor = secure_crypto.AESGCMEncryptor(kdf=kdf)
+    return encryptor.update_file(source, destination, password, engine=engine)
+
+
+def process_pipe(output: Optional[str], password: str, command: str, force: bool,
+                 engine: Optional[secure_crypto.ParallelSegmentEngine],
+                 kdf: Optional[secure_crypto.KDFParams] = None,
+                 compression: Optional[str] = None) -> int:
+    """Encrypt or decrypt stdin to stdout, or to ``output`` when given."""
+    if output:
+        return write_atomically(sys.stdin.buffer, output, password, command, force, engine, kdf, compression)
+    written = run_stream(sys.stdin.buffer, sys.stdout.buffer, password, command, engine, kdf, compression)
+    sys.stdout.buffer.flush()
+    return written
+
+
+def add_password_arguments(sub: argparse.ArgumentParser) -> None:
+    """Add --password-env and --password-fd."""
+    password = sub.add_mutually_exclusive_group()
+    password.add_argument('--password-env', metavar='VAR',
+                          help='read the password from an environment variable')
+    password.add_argument('--password-fd', metavar='FD', type=int,
+                          help='read the password from the first line of a file descriptor')
+
+
+def add_encryption_arguments(sub: argparse.ArgumentParser) -> None:
+    """Add the options of commands that create encrypted data."""
+    sub.add_argument('--kdf', metavar='SPEC', default='pbkdf2',
+                     help='key derivation: pbkdf2, scrypt or argon2id, optionally with '
+                          'parameters, e.g. "scrypt:n=131072,r=8,p=1" (default: pbkdf2)')
+    sub.add_argument('--kdf-time', metavar='SECONDS', type=float,
+                     help='calibrate the --kdf algorithm to this derivation time first')
+    sub.add_argument('-z', '--compress', metavar='CODEC', choices=secure_crypto.Compression.available(),
+                     help='compress before encrypting: %(choices)s; skipped for data that '
+                          'does not compress')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser."""
+    parser = argparse.ArgumentParser(
+        prog='python -m crypto_cli',
+        description='GHHS-EC&DC - AES-256-GCM encryption without the GUI.',
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    for command in ('encrypt', 'decrypt', 'verify'):
+        if command == 'verify':
+            sub = subparsers.add_parser(command, help='check encrypted files without writing plaintext')
+            sub.add_argument('inputs', nargs='+', metavar='INPUT', help='files or directories to check')
+        else:
+            sub = subparsers.add_parser(command, help=f'{command} files, directories or stdin')
+            sub.add_argument('inputs', nargs='+', metavar='INPUT',
+                             help='files or directories to process; "-" for stdin')
+            sub.add_argument('-o', '--output',
+                             help='output file, or output directory for several inputs/directories')
+            sub.add_argument('-f', '--force', action='store_true', help='overwrite existing outputs')
+            sub.add_argument('-w', '--workers', type=int, default=1,
+                             help='segment worker threads per file (default: 1)')
+            sub.add_argument('--resume', action='store_true',
+                             help='keep a checkpoint journal next to each output and continue '
+                                  'an interrupted run of the same command')
+            if command == 'encrypt':
+                sub.add_argument('--update', action='store_true',
+                                 help='keep a segment manifest next to each output and rewrite only '
+                                      'the segments that changed since the last run')
+        sub.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                         help='number of files processed concurrently (default: CPU count)')
+        sub.add_argument('-q', '--quiet', action='store_true', help='only report errors')
+        add_password_arguments(sub)
+        if command == 'encrypt':
+            add_encryption_arguments(sub)
+
+    pack = subparsers.add_parser('pack', help='pack files and directories into one encrypted archive')
+    pack.add_argument('inputs', nargs='+', metavar='INPUT', help='files or directories to pack')
+    pack.add_argument('-o', '--output', required=True, metavar='ARCHIVE', help='archive to write')
+    unpack = subparsers.add_parser('unpack', help='extract files from an encrypted archive')
+    unpack.add_argument('archive', metavar='ARCHIVE')
+    unpack.add_argument('names', nargs='*', metavar='NAME', help='entries to extract (default: all)')
+    unpack.add_argument('-o', '--output', default='.', metavar='DIR',
+                        help='destination directory (default: current directory)')
+    for sub in (pack, unpack):
+        sub.add_argument('-f', '--force', action='store_true', help='overwrite existing outputs')
+        sub.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                         help='worker threads (default: CPU count)')
+        sub.add_argument('-q', '--quiet', action='store_true', help='only report errors')
+        add_password_arguments(sub)
+    add_encryption_arguments(pack)
+
+    listing = subparsers.add_parser('list', help='list the contents of an encrypted archive')
+    listing.add_argument('archive', metavar='ARCHIVE')
+    add_password_arguments(listing)
+
+    calibrate = subparsers.add_parser('calibrate', help='find key derivation parameters for this machine')
+    calibrate.add_argument('--kdf', default='pbkdf2', choices=list(secure_crypto.KDFParams.NAMES.values()),
+                           help='algorithm to calibrate (default: pbkdf2)')
+    calibrate.add_argument('--target', type=float, default=0.5,
+                           help='desired derivation time in seconds (default: 0.5)')
+    calibrate.add_argument('--max-memory', type=int, default=256, metavar='MB',
+                           help='memory budget of scrypt and Argon2id in MiB (default: 256)')
+    return parser
+
+
+def resolve_kdf(args: argparse.Namespace) -> secure_crypto.KDFParams:
+    """Key derivation for new data from --kdf and --kdf-time."""
+    kdf = secure_crypto.KDFParams.parse(args.kdf)
+    if args.kdf_time:
+        kdf = secure_crypto.calibrate_kdf(kdf.name, args.kdf_time)
+        if not args.quiet:
+            print(f"calibrated key derivation: {kdf}", file=sys.stderr)
+    return kdf
+
+
+def calibrate(args: argparse.Namespace) -> int:
+    """Print calibrated parameters, usable as --kdf SPEC."""
+    if args.kdf not in secure_crypto.KDFParams.available():
+        print(f"error: {args.kdf} is not supported by the installed cryptography", file=sys.stderr)
+        return 2
+    kdf = secure_crypto.calibrate_kdf(args.kdf, args.target, args.max_memory * 1024 * 1024)
+    salt = os.urandom(16)
+    start = time.perf_counter()
+    kdf.derive('calibration', salt)
+    print(kdf)
+    print(f"derivation time: {time.perf_counter() - start:.3f} s", file=sys.stderr)
+    return 0
+
+
+def verify(args: argparse.Namespace, password: str) -> int:
+    """Authenticate every input file and report good and bad ones; exit 1 if any is bad."""
+    files = [source for source, _ in plan_jobs(args.inputs, None, 'decrypt')]
+    report = secure_crypto.verify_files(files, password, workers=args.jobs)
+    if not args.quiet:
+        for path in report.good:
+            print(f"OK      {path}")
+    for path, error in report.bad:
+        print(f"FAILED  {path}: {error}")
+    if not args.quiet:
+        rate = report.bytes / max(report.elapsed, 1e-6) / (1024 * 1024)
+        print(f"{len(report.good)} good, {len(report.bad)} bad, "
+              f"{report.bytes / (1024 * 1024):.1f} MB in {report.elapsed:.2f} s ({rate:.1f} MB/s)",
+              file=sys.stderr)
+    return 0 if report.ok else 1
+
+
+def pack_archive(args: argparse.Namespace, password: str,
+                 kdf: Optional[secure_crypto.KDFParams] = None,
+                 compression: Optional[str] = None) -> int:
+    """Pack the inputs into a temporary file next to the archive and rename it into place."""
+    if os.path.exists(args.output) and not args.force:
+        raise FileExistsError(f"{args.output} already exists (use --force to overwrite)")
+
+    sources = list(secure_crypto.archive_sources(args.inputs))
+    encryptor = secure_crypto.AESGCMEncryptor(kdf=kdf, compression=compression)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(args.output)),
+                                    prefix='.ghhs-', suffix='.part')
+    os.close(fd)
+    try:
+        written = encryptor.pack_archive(sources, tmp_path, password,
+                                         engine=secure_crypto.ParallelSegmentEngine(args.workers))
+        os.replace(tmp_path, args.output)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if not args.quiet:
+        print(f"{len(sources)} files -> {args.output} ({written} bytes)", file=sys.stderr)
+    return 0
+
+
+def run_archive(args: argparse.Namespace, password: str,
+                kdf: Optional[secure_crypto.KDFParams] = None,
+                compression: Optional[str] = None) -> int:
+    """Run the pack, list and unpack commands."""
+    try:
+        if args.command == 'pack':
+            return pack_archive(args, password, kdf, compression)
+        with secure_crypto.open_archive(args.archive, password) as archive:
+            if args.command == 'list':
+                for entry in archive.entries:
+                    modified = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry.mtime / 1e9))
+                    print(f"{entry.size:>14}  {modified}  {entry.name}")
+                return 0
+            names = args.names or None
+            written = archive.extract_all(args.output, names, args.workers, args.force)
+            if not args.quiet:
+                print(f"{len(names or archive.entries)} files -> {args.output} ({written} bytes)",
+                      file=sys.stderr)
+            return 0
+    except KeyError as e:
+        print(f"error: {e.args[0]}", file=sys.stderr)
+    except (secure_crypto.DecryptionError, ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+    return 1
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point. Returns the process exit code."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == 'calibrate':
+        try:
+            return calibrate(args)
+        except ValueError as e:
+            parser.error(str(e))
+
+    inputs = getattr(args, 'inputs', [])
+    if args.command in ('verify', 'pack') and '-' in inputs:
+        parser.error(f'{args.command} needs files or directories, not "-"')
+    if '-' in inputs and len(inputs) > 1:
+        parser.error('"-" cannot be combined with other inputs')
+    if '-' in inputs and getattr(args, 'resume', False):
+        parser.error('--resume needs files or directories, not "-"')
+    update = getattr(args, 'update', False)
+    if update and '-' in inputs:
+        parser.error('--update needs files or directories, not "-"')
+    if update and (args.resume or args.compress):
+        parser.error('--update cannot be combined with --resume or --compress')
+    workers = getattr(args, 'workers', 1)
+    if getattr(args, 'jobs', 1) < 1 or workers < 1:
+        parser.error('--jobs and --workers must be positive')
+    missing = [p for p in inputs if p != '-' and not os.path.exists(p)]
+    if missing:
+        print(f"error: no such file or directory: {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    kdf = None
+    compression = getattr(args, 'compress', None)
+    if args.command in ('encrypt', 'pack'):
+        try:
+            kdf = resolve_kdf(args)
+        except ValueError as e:
+            parser.error(str(e))
+
+    try:
+        password = read_password(args)
+    except (ValueError, OSError, EOFError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    if args.command in ('pack', 'list', 'unpack'):
+        return run_archive(args, password, kdf, compression)
+
+    engine = secure_crypto.ParallelSegmentEngine(workers) if workers > 1 else None
+
+    if args.inputs == ['-']:
+        try:
+            process_pipe(args.output, password, args.command, args.force, engine, kdf, compression)
+        except (secure_crypto.DecryptionError, ValueError, OSError) as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 1
+        return 0
+
+    if args.command == 'verify':
+        return verify(args, password)
+
+    jobs = list(plan_jobs(args.inputs, args.output, args.command))
+    if update:
+        process = process_file_updatable
+    else:
+        process = process_file_resumable if args.resume else process_file
+    failures = 0
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        futures = [
+            (source, destination,
+             pool.submit(process, source, destination, password, args.command, args.force,
+                         engine, kdf, compression))
+            for source, destination in jobs
+        ]
+        for source, destination, future in futures:
+            try:
+                written = future.result()
+            except (secure_crypto.DecryptionError, ValueError, OSError) as e:
+                failures += 1
+                print(f"{source}: error: {e}", file=sys.stderr)
+            else:
+                if not args.quiet and update:
+                    rewritten, segments = written
+                    print(f"{source} -> {destination} ({rewritten} of {segments} segments rewritten)",
+                          file=sys.stderr)
+                elif not args.quiet:
+                    print(f"{source} -> {destination} ({written} bytes)", file=sys.stderr)
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
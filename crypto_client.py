@@ -0,0 +1,240 @@
+"""
+GHHS-EC&DC - Encryption daemon client
+Thin client for crypto_daemon over a Unix domain socket.
+
+Only the standard library is imported, so a short-lived script pays the
+cost of one socket round trip instead of importing ``cryptography`` and
+deriving a key. The data produced by the daemon is the same as that of
+``secure_crypto.aes_encrypt`` and can be decrypted without it.
+
+Framing (all integers big-endian):
+    request:  [body length u32][op u8][password length u16][password utf-8][payload]
+    response: [body length u32][status u8][body]
+
+On success the response body is the result; otherwise it is a UTF-8
+error message.
+
+Before a password is sent, the client checks that the socket file and
+the process listening on it belong to the current user, so another
+local user cannot stand in for the daemon.
+
+Example:
+    with CryptoClient() as client:
+        token = client.encrypt(b"data", password)
+        data = client.decrypt(token, password)
+"""
+
+import os
+import socket
+import stat
+import struct
+from typing import Optional
+
+
+REQUEST_HEADER = struct.Struct('>IBH')
+RESPONSE_HEADER = struct.Struct('>IB')
+
+OP_ENCRYPT = 1
+OP_DECRYPT = 2
+OP_PING = 3
+
+STATUS_OK = 0
+STATUS_DECRYPTION_FAILED = 1
+STATUS_BAD_REQUEST = 2
+STATUS_ERROR = 3
+
+MAX_PASSWORD_SIZE = 0xFFFF
+MAX_REQUEST_SIZE = 0xFFFFFFFF
+
+
+def fallback_socket_directory() -> str:
+    """Private per-user directory in /tmp for systems without $XDG_RUNTIME_DIR."""
+    return os.path.join('/tmp', f'ghhs-crypto-{os.getuid()}')
+
+
+def default_socket_path() -> str:
+    """Per-user socket path: $XDG_RUNTIME_DIR when set, otherwise a private directory in /tmp."""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, 'ghhs-crypto.sock')
+    return os.path.join(fallback_socket_directory(), 'ghhs-crypto.sock')
+
+
+class DaemonError(Exception):
+    """The daemon rejected the request or could not be reached."""
+    pass
+
+
+class DecryptionFailed(DaemonError):
+    """Wrong password or corrupted data."""
+    pass
+
+
+def check_private_directory(directory: str, create: bool = False) -> None:
+    """
+    Make sure only the current user can add or replace entries in ``directory``.
+
+    Args:
+        directory: Directory that holds the socket
+        create: Create it with mode 0700 when missing
+
+    Raises:
+        DaemonError: If the directory is a symlink, belongs to another user
+            or is accessible to others
+    """
+    if create:
+        try:
+            os.mkdir(directory, 0o700)
+        except FileExistsError:
+            pass
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise DaemonError(f"{directory} must be a directory of the current user with mode 0700")
+
+
+def check_socket_owner(path: str) -> None:
+    """
+    Make sure ``path`` is a socket owned by the current user.
+
+    Raises:
+        DaemonError: If it is not
+    """
+    info = os.stat(path)
+    if not stat.S_ISSOCK(info.st_mode) or info.st_uid != os.getuid():
+        raise DaemonError(f"{path} is not a socket of the current user")
+
+
+def peer_uid(sock: socket.socket) -> Optional[int]:
+    """User id of the process on the other end of a connected Unix socket; None if unknown."""
+    if hasattr(socket, 'SO_PEERCRED'):  # Linux
+        creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+        return struct.unpack('3i', creds)[1]
+    if hasattr(socket, 'LOCAL_PEERCRED'):  # macOS, FreeBSD: struct xucred, as getpeereid() reads it
+        creds = sock.getsockopt(getattr(socket, 'SOL_LOCAL', 0), socket.LOCAL_PEERCRED, 76)
+        return struct.unpack_from('=II', creds)[1]
+    return None
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if not n:
+            raise DaemonError("Connection closed by the daemon")
+        received += n
+    return bytes(buffer)
+
+
+class CryptoClient:
+    """
+    Connection to a running crypto_daemon.
+
+    The connection is opened on first use and kept for further requests.
+    A client is not thread-safe; use one per thread.
+    """
+
+    def __init__(self, path: Optional[str] = None, timeout: Optional[float] = None):
+        """
+        Args:
+            path: Socket path (default: ``default_socket_path()``)
+            timeout: Socket timeout in seconds; None blocks indefinitely
+        """
+        self.path = path or default_socket_path()
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+
+    def __enter__(self) -> "CryptoClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the connection; the next request reconnects."""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+    def _connect(self) -> socket.socket:
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                directory = os.path.dirname(os.path.abspath(self.path))
+                if directory == fallback_socket_directory():
+                    check_private_directory(directory)
+                check_socket_owner(self.path)
+                sock.connect(self.path)
+                uid = peer_uid(sock)
+                if uid is not None and uid != os.getuid():
+                    raise DaemonError(f"The process listening on {self.path} belongs to another user")
+            except DaemonError:
+                sock.close()
+                raise
+            except OSError as e:
+                sock.close()
+                raise DaemonError(f"Cannot connect to the daemon at {self.path}: {e}") from e
+            self._sock = sock
+        return self._sock
+
+    def request(self, op: int, password: str = "", payload: bytes = b"") -> bytes:
+        """
+        Send one request and return the response body.
+
+        Raises:
+            ValueError: If the password or payload does not fit in a request
+            DecryptionFailed: If the daemon could not decrypt the payload
+            DaemonError: On any other failure
+        """
+        secret = password.encode('utf-8')
+        if len(secret) > MAX_PASSWORD_SIZE:
+            raise ValueError("Password is too long")
+        if len(secret) + len(payload) > MAX_REQUEST_SIZE:
+            raise ValueError("Payload is too large for one request")
+        sock = self._connect()
+        try:
+            sock.sendall(REQUEST_HEADER.pack(len(secret) + len(payload), op, len(secret)) + secret)
+            sock.sendall(payload)
+            length, status = RESPONSE_HEADER.unpack(_recv_exactly(sock, RESPONSE_HEADER.size))
+            body = _recv_exactly(sock, length)
+        except (OSError, struct.error, DaemonError) as e:
+            # The stream position is unknown after a failure
+            self.close()
+            if isinstance(e, DaemonError):
+                raise
+            raise DaemonError(f"Request to the daemon failed: {e}") from e
+
+        if status == STATUS_OK:
+            return body
+        message = body.decode('utf-8', 'replace')
+        if status == STATUS_DECRYPTION_FAILED:
+            raise DecryptionFailed(message)
+        if status == STATUS_BAD_REQUEST:
+            self.close()
+        raise DaemonError(message)
+
+    def ping(self) -> bool:
+        """Return True if the daemon answers."""
+        try:
+            return self.request(OP_PING) == b"pong"
+        except DaemonError:
+            return False
+
+    def encrypt(self, plaintext: bytes, password: str) -> bytes:
+        """Encrypt like ``secure_crypto.aes_encrypt`` on the daemon."""
+        if not password:
+            raise ValueError("Password cannot be empty")
+        return self.request(OP_ENCRYPT, password, plaintext)
+
+    def decrypt(self, encrypted_data: bytes, password: str) -> bytes:
+        """
+        Decrypt like ``secure_crypto.aes_decrypt`` on the daemon.
+
+        Raises:
+            DecryptionFailed: If decryption fails
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        return self.request(OP_DECRYPT, password, encrypted_data)
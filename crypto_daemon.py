@@ -0,0 +1,266 @@
+"""
+GHHS-EC&DC - Local encryption daemon
+Serves encrypt/decrypt requests over a Unix domain socket.
+
+Usage:
+    python crypto_daemon.py [--socket PATH] [--ttl SECONDS] [--max-concurrency N] [--kdf SPEC]
+
+The daemon keeps ``cryptography`` loaded and derived keys warm, so clients
+(see crypto_client) pay only the cost of a socket round trip. Keys expire
+after ``--ttl`` seconds without use.
+
+Encryption reuses one salt per password for up to ``--ttl`` seconds or
+SALT_ROTATION messages, whichever comes first, so repeated requests hit
+the key cache. Every message still gets a fresh random nonce; the rotation
+limit keeps the number of messages per key far below the 2^32 bound for
+random 96-bit GCM nonces.
+
+The socket is created with mode 0600: only the owning user can connect.
+Without $XDG_RUNTIME_DIR it is placed in a private 0700 directory in /tmp.
+Connections from processes of other users are refused. POSIX only.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from async_crypto import AsyncEncryptor
+from crypto_client import (
+    OP_DECRYPT, OP_ENCRYPT, OP_PING, REQUEST_HEADER, RESPONSE_HEADER,
+    STATUS_BAD_REQUEST, STATUS_DECRYPTION_FAILED, STATUS_ERROR, STATUS_OK,
+    DaemonError, check_private_directory, default_socket_path, fallback_socket_directory, peer_uid
+)
+from secure_crypto import AESGCMEncryptor, DecryptionError, DerivedKeyCache, KDFParams
+
+
+log = logging.getLogger('crypto_daemon')
+
+DEFAULT_TTL = 300.0
+DEFAULT_MAX_FRAME = 64 * 1024 * 1024
+SALT_ROTATION = 2 ** 24
+
+
+class SaltPool:
+    """
+    Salt currently in use for each password.
+
+    Passwords are identified by an HMAC under a per-process secret, as in
+    DerivedKeyCache; the passwords themselves are not stored.
+    """
+
+    def __init__(self, ttl: Optional[float], max_uses: int = SALT_ROTATION):
+        self.ttl = ttl
+        self.max_uses = max_uses
+        self._secret = os.urandom(32)
+        self._entries: Dict[bytes, List] = {}
+
+    def salt_for(self, password: str) -> bytes:
+        """Return the current salt for ``password``, rotating it when expired or used up."""
+        now = time.monotonic()
+        digest = hmac.new(self._secret, password.encode('utf-8'), hashlib.sha256).digest()
+        entry = self._entries.get(digest)
+        if entry is None or entry[1] >= self.max_uses or (entry[2] is not None and entry[2] <= now):
+            entry = [os.urandom(AESGCMEncryptor.SALT_SIZE), 0, None]
+            self._entries[digest] = entry
+        entry[1] += 1
+        if self.ttl is not None:
+            entry[2] = now + self.ttl
+        return entry[0]
+
+    def expire(self) -> None:
+        """Forget salts that were not used within the TTL."""
+        now = time.monotonic()
+        for digest in [d for d, e in self._entries.items() if e[2] is not None and e[2] <= now]:
+            del self._entries[digest]
+
+
+class CryptoDaemon:
+    """asyncio Unix socket server around AESGCMEncryptor."""
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = DEFAULT_TTL,
+                 max_concurrency: Optional[int] = None, kdf: Optional[KDFParams] = None,
+                 max_frame: int = DEFAULT_MAX_FRAME, cache_size: int = 128):
+        """
+        Args:
+            path: Socket path (default: ``crypto_client.default_socket_path()``)
+            ttl: Seconds a derived key and an encryption salt stay warm; None keeps them
+            max_concurrency: Requests processed at once (default: CPU count)
+            kdf: Key derivation for new data; LEGACY_KDF when omitted
+            max_frame: Largest accepted request body in bytes
+            cache_size: Derived keys kept in memory
+        """
+        self.path = path or default_socket_path()
+        self.max_frame = max_frame
+        self.key_cache = DerivedKeyCache(max_entries=cache_size, ttl=ttl)
+        self.salts = SaltPool(ttl)
+        self.crypto = AsyncEncryptor(max_concurrency=max_concurrency, kdf=kdf, key_cache=self.key_cache)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def _remove_stale_socket(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.path)
+        except (ConnectionRefusedError, FileNotFoundError):
+            os.unlink(self.path)
+        else:
+            raise RuntimeError(f"A daemon is already listening on {self.path}")
+        finally:
+            probe.close()
+
+    async def start(self) -> None:
+        """Bind the socket and start accepting clients."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if directory == fallback_socket_directory():
+            try:
+                check_private_directory(directory, create=True)
+            except DaemonError as e:
+                raise RuntimeError(str(e)) from e
+        self._remove_stale_socket()
+        old_umask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(self._serve_client, path=self.path)
+        finally:
+            os.umask(old_umask)
+
+    async def close(self) -> None:
+        """Stop accepting clients, wait for running requests and remove the socket."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.crypto.aclose()
+        self.key_cache.clear()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    async def serve_forever(self) -> None:
+        """Serve until cancelled, SIGINT or SIGTERM; expired salts are dropped periodically."""
+        await self.start()
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, stop.set)
+        try:
+            while not stop.is_set():
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=self.salts.ttl or 60.0)
+                except asyncio.TimeoutError:
+                    self.salts.expire()
+        finally:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(signum)
+            await self.close()
+
+    async def handle(self, op: int, password: str, payload: bytes) -> Tuple[int, bytes]:
+        """Process one request and return (status, body)."""
+        encryptor = self.crypto._encryptor
+        if op == OP_PING:
+            return STATUS_OK, b"pong"
+        if not password:
+            return STATUS_BAD_REQUEST, b"Password cannot be empty"
+        if op == OP_ENCRYPT:
+            salt = self.salts.salt_for(password)
+            return STATUS_OK, await self.crypto.run(encryptor.aes_encrypt, payload, password, salt)
+        if op == OP_DECRYPT:
+            try:
+                return STATUS_OK, await self.crypto.run(encryptor.aes_decrypt, payload, password)
+            except DecryptionError as e:
+                return STATUS_DECRYPTION_FAILED, str(e).encode('utf-8')
+        return STATUS_BAD_REQUEST, f"Unknown operation {op}".encode('utf-8')
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            uid = peer_uid(writer.get_extra_info('socket'))
+            if uid is not None and uid != os.getuid():
+                return
+            while True:
+                try:
+                    head = await reader.readexactly(REQUEST_HEADER.size)
+                except asyncio.IncompleteReadError:
+                    break
+                length, op, password_length = REQUEST_HEADER.unpack(head)
+                if length > self.max_frame or password_length > length:
+                    # The rest of the frame is not read, so the stream cannot be resynchronised
+                    await self._respond(writer, STATUS_BAD_REQUEST, b"Request frame is too large or malformed")
+                    break
+                body = await reader.readexactly(length)
+                try:
+                    password = body[:password_length].decode('utf-8')
+                except UnicodeDecodeError:
+                    status, result = STATUS_BAD_REQUEST, b"Password is not valid UTF-8"
+                else:
+                    try:
+                        status, result = await self.handle(op, password, body[password_length:])
+                    except (ValueError, OSError) as e:
+                        status, result = STATUS_ERROR, str(e).encode('utf-8')
+                    except Exception as e:
+                        # Still answer, so the client does not wait on a dead handler
+                        log.exception("Request failed")
+                        status, result = STATUS_ERROR, f"Internal error: {e}".encode('utf-8')
+                    del password
+                del body
+                await self._respond(writer, status, result)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, body: bytes) -> None:
+        writer.write(RESPONSE_HEADER.pack(len(body), status))
+        writer.write(body)
+        await writer.drain()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Daemon entry point. Returns the process exit code."""
+    parser = argparse.ArgumentParser(description='GHHS-EC&DC local encryption daemon')
+    parser.add_argument('--socket', metavar='PATH', help=f'socket path (default: {default_socket_path()})')
+    parser.add_argument('--ttl', type=float, default=DEFAULT_TTL, metavar='SECONDS',
+                        help='keep derived keys warm this long after last use (0: no expiry)')
+    parser.add_argument('--max-concurrency', type=int, metavar='N',
+                        help='requests processed at once (default: CPU count)')
+    parser.add_argument('--kdf', metavar='SPEC', default='pbkdf2',
+                        help='key derivation for new data, e.g. argon2id or scrypt:n=131072,r=8,p=1')
+    parser.add_argument('--max-frame', type=int, default=DEFAULT_MAX_FRAME // (1024 * 1024), metavar='MB',
+                        help='largest accepted request')
+    parser.add_argument('--cache-size', type=int, default=128, help='derived keys kept in memory')
+    args = parser.parse_args(argv)
+    logging.basicConfig(format='%(asctime)s %(name)s: %(message)s')
+
+    if not hasattr(socket, 'AF_UNIX'):
+        print("error: Unix domain sockets are not supported on this platform", file=sys.stderr)
+        return 2
+    try:
+        kdf = KDFParams.parse(args.kdf)
+        daemon = CryptoDaemon(args.socket, args.ttl or None, args.max_concurrency, kdf,
+                              args.max_frame * 1024 * 1024, args.cache_size)
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        asyncio.run(daemon.serve_forever())
+    except (RuntimeError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
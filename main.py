@@ -1,50 +1,287 @@
 """
 GHHS-EC&DC - Secure Encryption/Decryption Tool
 Modern AES-256-GCM encryption with theme switching.
+
+Run with --startup-time to print the time to first paint and exit.
 """
 
+import time
+
+# Отсчёт для режима --startup-time начинается до импорта PyQt6
+STARTUP_BEGIN = time.perf_counter()
+
 import sys
 import os
+import threading
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, 
     QTextEdit, QPushButton, QLabel, QWidget, QFileDialog, 
     QMessageBox, QProgressBar, QGroupBox, QTabWidget,
-    QFrame, QSizePolicy
+    QFrame, QSizePolicy, QTableWidget, QTableWidgetItem, QHeaderView,
+    QAbstractItemView, QSpinBox
 )
-from PyQt6.QtCore import QThread, pyqtSignal, Qt
-from PyQt6.QtGui import QFont, QIcon, QPalette, QColor
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, QEvent, pyqtSignal
+from PyQt6.QtGui import QIcon
+
+from themes import THEME_STYLESHEET
+
+# secure_crypto (и backend cryptography) загружается при первом использовании
+# или в фоне после первой отрисовки окна, а не при запуске
 
-# Добавляем импорт функций шифрования
-from secure_crypto import aes_encrypt, aes_decrypt, DecryptionError
+STARTUP_IMPORTED = time.perf_counter()
 
 
-class CryptoThread(QThread):
-    """Thread for encryption/decryption operations."""
+class CryptoJobSignals(QObject):
+    """Signals of a CryptoJob (QRunnable is not a QObject and cannot emit)."""
     
+    started_signal = pyqtSignal()
     finished_signal = pyqtSignal(bytes, str)  # data, operation_type
+    file_finished_signal = pyqtSignal(str, 'qint64', float, float)  # destination, size, seconds, MB/s
     error_signal = pyqtSignal(str)
+    password_rejected_signal = pyqtSignal()
+    cancelled_signal = pyqtSignal()
     progress_signal = pyqtSignal(int)
+    transfer_signal = pyqtSignal('qint64', 'qint64', float, float)  # done, total, MB/s, ETA (s)
+    batch_finished_signal = pyqtSignal(int, list, 'qint64', float, float)  # files, failures, bytes, seconds, MB/s
+    verify_finished_signal = pyqtSignal(list, list, 'qint64', float, float)  # good, bad, bytes, seconds, MB/s
+
+
+class CryptoJob(QRunnable):
+    """Encryption/decryption job executed on a QThreadPool."""
     
-    def __init__(self, operation_type, data, password):
+    # Не чаще 10 обновлений в секунду, чтобы не перегружать очередь событий GUI
+    PROGRESS_INTERVAL = 0.1
+    
+    def __init__(self, operation_type, data, password, source_path=None, destination_path=None):
         super().__init__()
+        # Объект задания удаляет сам GUI, когда строка очереди убрана
+        self.setAutoDelete(False)
+        self.signals = CryptoJobSignals()
         self.operation_type = operation_type
         self.data = data
         self.password = password
+        # Файлы шифруются сегментами в рабочем потоке, а не читаются в GUI
+        self.source_path = source_path
+        self.destination_path = destination_path
+        self.cancel_event = threading.Event()
+        self.started_at = 0.0
+        self.last_report = 0.0
+    
+    def cancel(self):
+        """Request cancellation; checked before start and between segments."""
+        self.cancel_event.set()
     
     def run(self):
+        signals = self.signals
+        if self.cancel_event.is_set():
+            # Задание отменено, пока ждало свободный поток
+            self.password = None
+            signals.cancelled_signal.emit()
+            return
+        
+        signals.started_signal.emit()
+        self.started_at = time.monotonic()
+        from secure_crypto import InvalidPasswordError, OperationCancelled
         try:
-            self.progress_signal.emit(30)
+            if self.source_path:
+                self.process_path(self.source_path, self.destination_path, self.report_progress)
+                elapsed = max(time.monotonic() - self.started_at, 1e-6)
+                rate = os.path.getsize(self.source_path) / elapsed / (1024 * 1024)
+                signals.progress_signal.emit(100)
+                signals.file_finished_signal.emit(
+                    self.destination_path, os.path.getsize(self.destination_path), elapsed, rate)
+            else:
+                signals.progress_signal.emit(30)
+                result = self.process(self.data)
+                signals.progress_signal.emit(100)
+                signals.finished_signal.emit(result, self.operation_type)
             
+        except OperationCancelled:
+            signals.cancelled_signal.emit()
+        except InvalidPasswordError:
+            # Ключ проверен сразу после KDF, данные не читались
+            signals.password_rejected_signal.emit()
+        except Exception as e:
+            signals.error_signal.emit(str(e))
+        finally:
+            self.password = None
+    
+    def report_progress(self, done, total):
+        """Progress callback of the crypto core; throttled before reaching the GUI."""
+        now = time.monotonic()
+        if done < total and now - self.last_report < self.PROGRESS_INTERVAL:
+            return
+        self.last_report = now
+        
+        elapsed = max(now - self.started_at, 1e-6)
+        rate = done / elapsed
+        eta = (total - done) / rate if rate else 0.0
+        self.signals.progress_signal.emit(int(done * 100 / total) if total else 100)
+        self.signals.transfer_signal.emit(done, total, rate / (1024 * 1024), eta)
+    
+    def process_path(self, source, destination, progress):
+        """
+        Encrypt or decrypt one file.
+        
+        Files of at least CHECKPOINT_INTERVAL bytes go through a checkpoint
+        journal: if the application crashed or the machine rebooted during an
+        earlier run to the same destination, the job continues from the last
+        checkpoint. Smaller files take the memory-mapped path, which has no
+        journal to write and sync.
+        """
+        from secure_crypto import AESGCMEncryptor, CheckpointJournal, OperationCancelled
+        encryptor = AESGCMEncryptor()
+        if os.path.getsize(source) < encryptor.CHECKPOINT_INTERVAL:
             if self.operation_type == 'encrypt':
-                result = aes_encrypt(self.data, self.password)
+                encryptor.encrypt_file(source, destination, self.password,
+                                       progress=progress, cancel=self.cancel_event)
             else:
-                result = aes_decrypt(self.data, self.password)
+                encryptor.decrypt_file(source, destination, self.password,
+                                       progress=progress, cancel=self.cancel_event)
+            return
+        
+        try:
+            if self.operation_type == 'encrypt':
+                encryptor.encrypt_file_resumable(source, destination, self.password,
+                                                 progress=progress, cancel=self.cancel_event)
+            else:
+                encryptor.decrypt_file_resumable(source, destination, self.password,
+                                                 progress=progress, cancel=self.cancel_event)
+        except OperationCancelled:
+            # Отмена пользователем означает отказ от результата, а не паузу
+            CheckpointJournal.discard(destination)
+            raise
+    
+    def process(self, data):
+        """Encrypt or decrypt a bytes-like object."""
+        from secure_crypto import aes_encrypt, aes_decrypt
+        if self.operation_type == 'encrypt':
+            return aes_encrypt(data, self.password)
+        return aes_decrypt(data, self.password)
+
+
+class BatchJob(CryptoJob):
+    """
+    Job processing many files and directories as one queue entry.
+    
+    Inputs are expanded with crypto_cli.plan_jobs, so directory trees are
+    mirrored into the destination folder exactly like the command line does.
+    Files are streamed in parallel on a ParallelSegmentEngine; one file's
+    failure is recorded and does not stop the rest of the batch.
+    """
+    
+    def __init__(self, operation_type, inputs, password, destination_dir, workers):
+        super().__init__(operation_type, None, password, destination_path=destination_dir)
+        self.inputs = list(inputs)
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.done_bytes = 0.0
+        self.total_bytes = 0
+    
+    def run(self):
+        signals = self.signals
+        if self.cancel_event.is_set():
+            self.password = None
+            signals.cancelled_signal.emit()
+            return
+        
+        signals.started_signal.emit()
+        self.started_at = time.monotonic()
+        from crypto_cli import plan_jobs
+        from secure_crypto import ParallelSegmentEngine, OperationCancelled
+        try:
+            # Обход каталогов выполняется здесь, а не в потоке GUI
+            files = [(source, destination, os.path.getsize(source))
+                     for source, destination in plan_jobs(self.inputs, self.destination_path, self.operation_type)]
+            self.total_bytes = sum(size for _, _, size in files)
             
-            self.progress_signal.emit(100)
-            self.finished_signal.emit(result, self.operation_type)
+            failures = []
+            engine = ParallelSegmentEngine(self.workers)
+            for source, error in engine.map(self.process_file, files):
+                if error:
+                    failures.append(f"{source}: {error}")
+            if self.cancel_event.is_set():
+                raise OperationCancelled("Operation cancelled")
             
+            elapsed = max(time.monotonic() - self.started_at, 1e-6)
+            signals.progress_signal.emit(100)
+            signals.batch_finished_signal.emit(
+                len(files), failures, self.total_bytes, elapsed, self.total_bytes / elapsed / (1024 * 1024))
+        except OperationCancelled:
+            signals.cancelled_signal.emit()
         except Exception as e:
-            self.error_signal.emit(str(e))
+            signals.error_signal.emit(str(e))
+        finally:
+            self.password = None
+    
+    def process_file(self, source, destination, size):
+        """Encrypt or decrypt one file of the batch; returns (source, error or None)."""
+        if self.cancel_event.is_set():
+            return source, None
+        
+        from secure_crypto import OperationCancelled
+        reported = 0
+        
+        def progress(done, total):
+            nonlocal reported
+            with self.lock:
+                # Прогресс файла переводится в байты исходного файла
+                self.done_bytes += (done - reported) * size / total if total else 0
+                done_bytes = self.done_bytes
+            reported = done
+            self.report_progress(int(done_bytes), self.total_bytes)
+        
+        try:
+            if os.path.exists(destination):
+                raise FileExistsError(f"{destination} already exists")
+            os.makedirs(os.path.dirname(destination) or '.', exist_ok=True)
+            self.process_path(source, destination, progress)
+            return source, None
+        except OperationCancelled:
+            return source, None
+        except Exception as e:
+            return source, str(e)
+
+
+class VerifyJob(CryptoJob):
+    """
+    Job authenticating encrypted files without writing any plaintext.
+    
+    Directories are expanded like a batch decryption; every segment is
+    checked with constant memory and files are verified in parallel.
+    """
+    
+    def __init__(self, inputs, password, workers):
+        super().__init__('verify', None, password)
+        self.inputs = list(inputs)
+        self.workers = workers
+    
+    def run(self):
+        signals = self.signals
+        if self.cancel_event.is_set():
+            self.password = None
+            signals.cancelled_signal.emit()
+            return
+        
+        signals.started_signal.emit()
+        self.started_at = time.monotonic()
+        from crypto_cli import plan_jobs
+        from secure_crypto import OperationCancelled, verify_files
+        try:
+            files = [source for source, _ in plan_jobs(self.inputs, None, 'decrypt')]
+            report = verify_files(files, self.password, workers=self.workers,
+                                  progress=self.report_progress, cancel=self.cancel_event)
+            elapsed = max(report.elapsed, 1e-6)
+            signals.progress_signal.emit(100)
+            signals.verify_finished_signal.emit(
+                report.good, [f"{path}: {error}" for path, error in report.bad],
+                report.bytes, elapsed, report.bytes / elapsed / (1024 * 1024))
+        except OperationCancelled:
+            signals.cancelled_signal.emit()
+        except Exception as e:
+            signals.error_signal.emit(str(e))
+        finally:
+            self.password = None
 
 
 class Translation:
@@ -70,6 +307,7 @@ class Translation:
             'select_file_decrypt': 'Select Encrypted File',
             'encrypt_file': 'Encrypt File',
             'decrypt_file': 'Decrypt File',
+            'verify_files': 'Verify Integrity',
             'no_file_selected': 'No file selected',
             'file_selected': 'File selected: {}',
             'language': 'Language',
@@ -85,8 +323,39 @@ class Translation:
             'error_no_password': 'Please enter encryption key',
             'error_no_input': 'Please enter text to process',
             'error_invalid_hex': 'Invalid hex format',
+            'error_wrong_password': 'Wrong password. The data was not touched.',
             'error_no_file': 'Please select a file first',
-            'success_file_saved': 'File saved successfully! Size: {} bytes'
+            'success_file_saved': 'File saved successfully! Size: {} bytes',
+            'job_queue': 'Job Queue',
+            'job_column': 'Job',
+            'status_column': 'Status',
+            'progress_column': 'Progress',
+            'details_column': 'Details',
+            'concurrent_jobs': 'Concurrent jobs:',
+            'cancel_selected': 'Cancel Selected',
+            'clear_finished': 'Clear Finished',
+            'job_encrypt': 'Encrypt: {}',
+            'job_decrypt': 'Decrypt: {}',
+            'job_verify': 'Verify: {}',
+            'text_job': 'text ({} bytes)',
+            'status_queued': 'Queued',
+            'status_running': 'Running',
+            'status_done': 'Done',
+            'status_failed': 'Failed',
+            'status_cancelled': 'Cancelled',
+            'select_folder': 'Select Folder',
+            'select_destination': 'Select Destination Folder',
+            'items_selected': '{} items selected (files and folders)',
+            'drop_hint': 'No file selected - drop files or folders here',
+            'batch_job': '{} items',
+            'batch_summary': '{} files processed, {} failed\nDestination: {}\nData: {:.1f} MB in {:.2f} s ({:.1f} MB/s)',
+            'verify_summary': '{} files intact, {} damaged\nData: {:.1f} MB in {:.2f} s ({:.1f} MB/s)',
+            'verify_ok': 'OK: {}',
+            'verify_damaged': 'DAMAGED: {}',
+            'operation_cancelled': 'Operation cancelled. Partial output was removed.',
+            'progress_status': '{:.1f} / {:.1f} MB  |  {:.1f} MB/s  |  ETA {}',
+            'save_result_as': 'Save Result As',
+            'file_summary': 'Saved to: {}\nSize: {} bytes\nElapsed: {:.2f} s\nThroughput: {:.1f} MB/s'
         },
         'ru': {
             'app_title': 'GHHS-EC&DC - Программа Шифрования',
@@ -107,6 +376,7 @@ class Translation:
             'select_file_decrypt': 'Выбрать зашифрованный файл',
             'encrypt_file': 'Зашифровать файл',
             'decrypt_file': 'Расшифровать файл',
+            'verify_files': 'Проверить целостность',
             'no_file_selected': 'Файл не выбран',
             'file_selected': 'Выбран файл: {}',
             'language': 'Язык',
@@ -122,8 +392,39 @@ class Translation:
             'error_no_password': 'Пожалуйста, введите ключ шифрования',
             'error_no_input': 'Пожалуйста, введите текст для обработки',
             'error_invalid_hex': 'Неверный hex формат',
+            'error_wrong_password': 'Неверный ключ. Данные не затронуты.',
             'error_no_file': 'Пожалуйста, сначала выберите файл',
-            'success_file_saved': 'Файл сохранен успешно! Размер: {} байт'
+            'success_file_saved': 'Файл сохранен успешно! Размер: {} байт',
+            'job_queue': 'Очередь заданий',
+            'job_column': 'Задание',
+            'status_column': 'Статус',
+            'progress_column': 'Прогресс',
+            'details_column': 'Подробности',
+            'concurrent_jobs': 'Одновременно:',
+            'cancel_selected': 'Отменить выбранные',
+            'clear_finished': 'Убрать завершённые',
+            'job_encrypt': 'Шифрование: {}',
+            'job_decrypt': 'Дешифрование: {}',
+            'job_verify': 'Проверка: {}',
+            'text_job': 'текст ({} байт)',
+            'status_queued': 'В очереди',
+            'status_running': 'Выполняется',
+            'status_done': 'Готово',
+            'status_failed': 'Ошибка',
+            'status_cancelled': 'Отменено',
+            'select_folder': 'Выбрать папку',
+            'select_destination': 'Выбрать папку назначения',
+            'items_selected': 'Выбрано элементов: {} (файлы и папки)',
+            'drop_hint': 'Файл не выбран - перетащите сюда файлы или папки',
+            'batch_job': 'элементов: {}',
+            'batch_summary': 'Обработано файлов: {}, с ошибкой: {}\nНазначение: {}\nДанные: {:.1f} МБ за {:.2f} с ({:.1f} МБ/с)',
+            'verify_summary': 'Целых файлов: {}, повреждённых: {}\nДанные: {:.1f} МБ за {:.2f} с ({:.1f} МБ/с)',
+            'verify_ok': 'OK: {}',
+            'verify_damaged': 'ПОВРЕЖДЁН: {}',
+            'operation_cancelled': 'Операция отменена. Частичный результат удалён.',
+            'progress_status': '{:.1f} / {:.1f} МБ  |  {:.1f} МБ/с  |  осталось {}',
+            'save_result_as': 'Сохранить результат как',
+            'file_summary': 'Сохранено в: {}\nРазмер: {} байт\nВремя: {:.2f} с\nСкорость: {:.1f} МБ/с'
         }
     }
     
@@ -164,6 +465,8 @@ class SecureCryptoGUI(QMainWindow):
         
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
+        # Файлы и папки можно перетащить на любую вкладку
+        self.setAcceptDrops(True)
         
         # Main layout with consistent spacing
         main_layout = QVBoxLayout(central_widget)
@@ -215,323 +518,100 @@ class SecureCryptoGUI(QMainWindow):
         self.setup_encrypt_tab(encrypt_tab)
         self.tabs.addTab(encrypt_tab, self.translator.tr('encryption_tab'))
         
-        # Decryption tab
-        decrypt_tab = QWidget()
-        self.setup_decrypt_tab(decrypt_tab)
-        self.tabs.addTab(decrypt_tab, self.translator.tr('decryption_tab'))
+        # Decryption tab: содержимое строится при первом открытии вкладки
+        self.decrypt_tab = QWidget()
+        self.decrypt_tab_built = False
+        self.tabs.addTab(self.decrypt_tab, self.translator.tr('decryption_tab'))
+        self.tabs.currentChanged.connect(self.ensure_decrypt_tab)
         
         main_layout.addWidget(self.tabs)
         
+        # Job queue shared by both tabs
+        self.setup_job_queue(main_layout)
+        
+    def ensure_decrypt_tab(self, index=1):
+        """Build the decryption tab the first time it is shown."""
+        if index == 1 and not self.decrypt_tab_built:
+            self.decrypt_tab_built = True
+            self.setup_decrypt_tab(self.decrypt_tab)
+    
+    def preload_backends(self):
+        """Import the crypto backend in the background once the window is painted."""
+        threading.Thread(target=lambda: __import__('crypto_cli'), daemon=True).start()
+    
+    def showEvent(self, event):
+        """Schedule background preloading after the first show."""
+        super().showEvent(event)
+        if not getattr(self, 'backends_scheduled', False):
+            self.backends_scheduled = True
+            QTimer.singleShot(0, self.preload_backends)
+    
+    def setup_job_queue(self, layout):
+        """Setup the job queue panel."""
+        self.thread_pool = QThreadPool(self)
+        self.jobs = {}
+        self.next_job_id = 1
+        
+        self.jobs_group = QGroupBox(self.translator.tr('job_queue'))
+        jobs_layout = QVBoxLayout(self.jobs_group)
+        jobs_layout.setContentsMargins(15, 25, 15, 15)
+        jobs_layout.setSpacing(12)
+        
+        self.job_table = QTableWidget(0, 4)
+        self.job_table.verticalHeader().setVisible(False)
+        self.job_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.job_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        header = self.job_table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        self.job_table.setMaximumHeight(180)
+        self.update_job_headers()
+        jobs_layout.addWidget(self.job_table)
+        
+        controls_layout = QHBoxLayout()
+        controls_layout.setSpacing(12)
+        self.concurrency_label = QLabel(self.translator.tr('concurrent_jobs'))
+        self.concurrency_spin = QSpinBox()
+        self.concurrency_spin.setRange(1, max(2 * (os.cpu_count() or 1), 2))
+        self.concurrency_spin.setValue(self.thread_pool.maxThreadCount())
+        self.concurrency_spin.valueChanged.connect(self.thread_pool.setMaxThreadCount)
+        
+        self.cancel_jobs_btn = QPushButton(self.translator.tr('cancel_selected'))
+        self.cancel_jobs_btn.clicked.connect(self.cancel_selected_jobs)
+        self.clear_jobs_btn = QPushButton(self.translator.tr('clear_finished'))
+        self.clear_jobs_btn.clicked.connect(self.clear_finished_jobs)
+        
+        controls_layout.addWidget(self.concurrency_label)
+        controls_layout.addWidget(self.concurrency_spin)
+        controls_layout.addStretch()
+        controls_layout.addWidget(self.cancel_jobs_btn)
+        controls_layout.addWidget(self.clear_jobs_btn)
+        jobs_layout.addLayout(controls_layout)
+        
+        layout.addWidget(self.jobs_group)
+        
+    def update_job_headers(self):
+        """Set translated column titles of the job table."""
+        self.job_table.setHorizontalHeaderLabels([
+            self.translator.tr('job_column'), self.translator.tr('status_column'),
+            self.translator.tr('progress_column'), self.translator.tr('details_column')
+        ])
+        
     def apply_theme(self):
         """Apply the current theme (dark or light)."""
-        if self.dark_theme:
-            # High contrast dark theme - убираем неподдерживаемые свойства
-            self.setStyleSheet("""
-                QMainWindow {
-                    background-color: #0d1117;
-                    color: #ffffff;
-                }
-                QFrame#headerFrame {
-                    background-color: #161b22;
-                    border-radius: 12px;
-                    border: 2px solid #30363d;
-                }
-                QLabel#titleLabel {
-                    font-size: 28px;
-                    font-weight: 800;
-                    color: #58a6ff;
-                    padding: 0px;
-                }
-                QPushButton#themeButton, QPushButton#languageButton {
-                    background-color: #21262d;
-                    color: #c9d1d9;
-                    border: 2px solid #30363d;
-                    border-radius: 10px;
-                    font-weight: 600;
-                    font-size: 13px;
-                    padding: 8px 4px;  /* Добавляем внутренние отступы */
-                }
-                QPushButton#themeButton:hover, QPushButton#languageButton:hover {
-                    background-color: #30363d;
-                    border: 2px solid #58a6ff;
-                }
-                QPushButton#themeButton:pressed, QPushButton#languageButton:pressed {
-                    background-color: #0d1117;
-                    border: 2px solid #8e6cff;
-                }
-                QTabWidget#mainTabs::pane {
-                    border: 2px solid #30363d;
-                    border-radius: 12px;
-                    background-color: #161b22;
-                }
-                QTabBar::tab {
-                    background-color: #21262d;
-                    color: #8b949e;
-                    padding: 12px 24px;
-                    margin: 3px;
-                    border: 2px solid #30363d;
-                    border-radius: 10px;
-                    font-weight: 600;
-                    font-size: 13px;
-                }
-                QTabBar::tab:selected {
-                    background-color: #1f6feb;
-                    color: #ffffff;
-                    border: 2px solid #58a6ff;
-                }
-                QTabBar::tab:hover {
-                    background-color: #30363d;
-                    color: #c9d1d9;
-                }
-                QGroupBox {
-                    font-weight: 700;
-                    border: 2px solid #30363d;
-                    border-radius: 12px;
-                    margin-top: 15px;
-                    padding-top: 20px;
-                    color: #f0f6fc;
-                    background-color: #21262d;
-                    font-size: 14px;
-                }
-                QGroupBox::title {
-                    subcontrol-origin: margin;
-                    left: 15px;
-                    padding: 0 12px 0 12px;
-                    color: #58a6ff;
-                    background-color: #21262d;
-                    font-weight: 700;
-                }
-                QTextEdit {
-                    background-color: #0d1117;
-                    color: #f0f6fc;
-                    border: 2px solid #30363d;
-                    border-radius: 10px;
-                    padding: 12px;
-                    font-family: 'Segoe UI', system-ui, sans-serif;
-                    font-size: 13px;
-                    selection-background-color: #1f6feb;
-                    selection-color: #ffffff;
-                }
-                QTextEdit:focus {
-                    border: 2px solid #58a6ff;
-                    background-color: #161b22;
-                }
-                QPushButton {
-                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #1f6feb, stop:1 #8e6cff);
-                    color: #ffffff;
-                    border: none;
-                    padding: 12px 24px;
-                    border-radius: 10px;
-                    font-weight: 700;
-                    font-size: 13px;
-                    min-width: 120px;
-                }
-                QPushButton:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #58a6ff, stop:1 #a371f7);
-                }
-                QPushButton:pressed {
-                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0d419d, stop:1 #6e40c9);
-                }
-                QPushButton:disabled {
-                    background-color: #30363d;
-                    color: #8b949e;
-                }
-                QLabel {
-                    color: #f0f6fc;
-                    font-weight: 600;
-                    font-size: 13px;
-                    background-color: transparent;
-                }
-                QProgressBar {
-                    border: 2px solid #30363d;
-                    border-radius: 10px;
-                    text-align: center;
-                    color: #ffffff;
-                    font-weight: 600;
-                    background-color: #0d1117;
-                    font-size: 11px;
-                    height: 18px;
-                }
-                QProgressBar::chunk {
-                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #1f6feb, stop:1 #8e6cff);
-                    border-radius: 8px;
-                }
-                QMessageBox {
-                    background-color: #161b22;
-                    color: #ffffff;
-                    border: 2px solid #30363d;
-                    border-radius: 12px;
-                }
-                QMessageBox QLabel {
-                    color: #ffffff;
-                }
-                QMessageBox QPushButton {
-                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #1f6feb, stop:1 #8e6cff);
-                    color: #ffffff;
-                    border: none;
-                    padding: 8px 16px;
-                    border-radius: 8px;
-                    min-width: 70px;
-                    font-weight: 600;
-                }
-                QMessageBox QPushButton:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #58a6ff, stop:1 #a371f7);
-                }
-            """)
+        self.setProperty('theme', 'dark' if self.dark_theme else 'light')
+        if not self.styleSheet():
+            # Общая таблица стилей разбирается один раз, темы переключает свойство theme
+            self.setStyleSheet(THEME_STYLESHEET)
         else:
-            # High contrast light theme - убираем неподдерживаемые свойства
-            self.setStyleSheet("""
-                QMainWindow {
-                    background-color: #ffffff;
-                    color: #24292f;
-                }
-                QFrame#headerFrame {
-                    background-color: #f6f8fa;
-                    border-radius: 12px;
-                    border: 2px solid #d0d7de;
-                }
-                QLabel#titleLabel {
-                    font-size: 28px;
-                    font-weight: 800;
-                    color: #0969da;
-                    padding: 0px;
-                }
-                QPushButton#themeButton, QPushButton#languageButton {
-                    background-color: #ffffff;
-                    color: #24292f;
-                    border: 2px solid #d0d7de;
-                    border-radius: 10px;
-                    font-weight: 600;
-                    font-size: 13px;
-                    padding: 8px 4px;  /* Добавляем внутренние отступы */
-                }
-                QPushButton#themeButton:hover, QPushButton#languageButton:hover {
-                    background-color: #f6f8fa;
-                    border: 2px solid #0969da;
-                }
-                QPushButton#themeButton:pressed, QPushButton#languageButton:pressed {
-                    background-color: #eaeef2;
-                    border: 2px solid #8250df;
-                }
-                QTabWidget#mainTabs::pane {
-                    border: 2px solid #d0d7de;
-                    border-radius: 12px;
-                    background-color: #ffffff;
-                }
-                QTabBar::tab {
-                    background-color: #f6f8fa;
-                    color: #656d76;
-                    padding: 12px 24px;
-                    margin: 3px;
-                    border: 2px solid #d0d7de;
-                    border-radius: 10px;
-                    font-weight: 600;
-                    font-size: 13px;
-                }
-                QTabBar::tab:selected {
-                    background-color: #0969da;
-                    color: #ffffff;
-                    border: 2px solid #0969da;
-                }
-                QTabBar::tab:hover {
-                    background-color: #eaeef2;
-                    color: #24292f;
-                }
-                QGroupBox {
-                    font-weight: 700;
-                    border: 2px solid #d0d7de;
-                    border-radius: 12px;
-                    margin-top: 15px;
-                    padding-top: 20px;
-                    color: #24292f;
-                    background-color: #f6f8fa;
-                    font-size: 14px;
-                }
-                QGroupBox::title {
-                    subcontrol-origin: margin;
-                    left: 15px;
-                    padding: 0 12px 0 12px;
-                    color: #0969da;
-                    background-color: #f6f8fa;
-                    font-weight: 700;
-                }
-                QTextEdit {
-                    background-color: #ffffff;
-                    color: #24292f;
-                    border: 2px solid #d0d7de;
-                    border-radius: 10px;
-                    padding: 12px;
-                    font-family: 'Segoe UI', system-ui, sans-serif;
-                    font-size: 13px;
-                    selection-background-color: #0969da;
-                    selection-color: #ffffff;
-                }
-                QTextEdit:focus {
-                    border: 2px solid #0969da;
-                    background-color: #f6f8fa;
-                }
-                QPushButton {
-                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0969da, stop:1 #8250df);
-                    color: #ffffff;
-                    border: none;
-                    padding: 12px 24px;
-                    border-radius: 10px;
-                    font-weight: 700;
-                    font-size: 13px;
-                    min-width: 120px;
-                }
-                QPushButton:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #1a7de8, stop:1 #8a63e0);
-                }
-                QPushButton:pressed {
-                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0757b8, stop:1 #6b45b5);
-                }
-                QPushButton:disabled {
-                    background-color: #d0d7de;
-                    color: #8c959f;
-                }
-                QLabel {
-                    color: #24292f;
-                    font-weight: 600;
-                    font-size: 13px;
-                    background-color: transparent;
-                }
-                QProgressBar {
-                    border: 2px solid #d0d7de;
-                    border-radius: 10px;
-                    text-align: center;
-                    color: #24292f;
-                    font-weight: 600;
-                    background-color: #ffffff;
-                    font-size: 11px;
-                    height: 18px;
-                }
-                QProgressBar::chunk {
-                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0969da, stop:1 #8250df);
-                    border-radius: 8px;
-                }
-                QMessageBox {
-                    background-color: #ffffff;
-                    color: #24292f;
-                    border: 2px solid #d0d7de;
-                    border-radius: 12px;
-                }
-                QMessageBox QLabel {
-                    color: #24292f;
-                }
-                QMessageBox QPushButton {
-                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0969da, stop:1 #8250df);
-                    color: #ffffff;
-                    border: none;
-                    padding: 8px 16px;
-                    border-radius: 8px;
-                    min-width: 70px;
-                    font-weight: 600;
-                }
-                QMessageBox QPushButton:hover {
-                    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #1a7de8, stop:1 #8a63e0);
-                }
-            """)
+            for widget in [self] + self.findChildren(QWidget):
+                self.repolish(widget)
+    
+    def repolish(self, widget):
+        """Re-evaluate stylesheet rules of a widget after a dynamic property change."""
+        widget.style().unpolish(widget)
+        widget.style().polish(widget)
+        widget.update()
         
     def setup_encrypt_tab(self, tab):
         """Setup the encryption tab."""
@@ -575,11 +655,6 @@ class SecureCryptoGUI(QMainWindow):
         button_layout.addStretch()
         layout.addLayout(button_layout)
         
-        # Progress
-        self.encrypt_progress = QProgressBar()
-        self.encrypt_progress.setVisible(False)
-        layout.addWidget(self.encrypt_progress)
-        
         # Result
         self.result_group_encrypt = QGroupBox(self.translator.tr('result'))
         result_layout = QVBoxLayout(self.result_group_encrypt)
@@ -598,21 +673,22 @@ class SecureCryptoGUI(QMainWindow):
         file_layout.setContentsMargins(15, 25, 15, 15)
         file_layout.setSpacing(12)
         
-        self.encrypt_file_info = QLabel(self.translator.tr('no_file_selected'))
-        if self.dark_theme:
-            self.encrypt_file_info.setStyleSheet("color: #8b949e; font-style: italic; font-weight: 500;")
-        else:
-            self.encrypt_file_info.setStyleSheet("color: #656d76; font-style: italic; font-weight: 500;")
+        self.encrypt_file_info = QLabel(self.translator.tr('drop_hint'))
+        self.encrypt_file_info.setObjectName("fileInfo")
         
         file_btn_layout = QHBoxLayout()
         file_btn_layout.setSpacing(12)
         self.select_encrypt_file_btn = QPushButton(self.translator.tr('select_file_encrypt'))
         self.select_encrypt_file_btn.clicked.connect(self.select_file_for_encryption)
         
+        self.select_encrypt_folder_btn = QPushButton(self.translator.tr('select_folder'))
+        self.select_encrypt_folder_btn.clicked.connect(self.select_folder_for_encryption)
+        
         self.encrypt_file_btn = QPushButton(self.translator.tr('encrypt_file'))
         self.encrypt_file_btn.clicked.connect(self.encrypt_file)
         
         file_btn_layout.addWidget(self.select_encrypt_file_btn)
+        file_btn_layout.addWidget(self.select_encrypt_folder_btn)
         file_btn_layout.addWidget(self.encrypt_file_btn)
         
         file_layout.addWidget(self.encrypt_file_info)
@@ -620,7 +696,7 @@ class SecureCryptoGUI(QMainWindow):
         layout.addWidget(self.file_group_encrypt)
         
         layout.addStretch()
-        self.encrypt_file_path = None
+        self.encrypt_file_paths = []
         
     def setup_decrypt_tab(self, tab):
         """Setup the decryption tab."""
@@ -664,11 +740,6 @@ class SecureCryptoGUI(QMainWindow):
         button_layout.addStretch()
         layout.addLayout(button_layout)
         
-        # Progress
-        self.decrypt_progress = QProgressBar()
-        self.decrypt_progress.setVisible(False)
-        layout.addWidget(self.decrypt_progress)
-        
         # Result
         self.result_group_decrypt = QGroupBox(self.translator.tr('result'))
         result_layout = QVBoxLayout(self.result_group_decrypt)
@@ -687,35 +758,39 @@ class SecureCryptoGUI(QMainWindow):
         file_layout.setContentsMargins(15, 25, 15, 15)
         file_layout.setSpacing(12)
         
-        self.decrypt_file_info = QLabel(self.translator.tr('no_file_selected'))
-        if self.dark_theme:
-            self.decrypt_file_info.setStyleSheet("color: #8b949e; font-style: italic; font-weight: 500;")
-        else:
-            self.decrypt_file_info.setStyleSheet("color: #656d76; font-style: italic; font-weight: 500;")
+        self.decrypt_file_info = QLabel(self.translator.tr('drop_hint'))
+        self.decrypt_file_info.setObjectName("fileInfo")
         
         file_btn_layout = QHBoxLayout()
         file_btn_layout.setSpacing(12)
         self.select_decrypt_file_btn = QPushButton(self.translator.tr('select_file_decrypt'))
         self.select_decrypt_file_btn.clicked.connect(self.select_file_for_decryption)
         
+        self.select_decrypt_folder_btn = QPushButton(self.translator.tr('select_folder'))
+        self.select_decrypt_folder_btn.clicked.connect(self.select_folder_for_decryption)
+        
         self.decrypt_file_btn = QPushButton(self.translator.tr('decrypt_file'))
         self.decrypt_file_btn.clicked.connect(self.decrypt_file)
         
+        self.verify_file_btn = QPushButton(self.translator.tr('verify_files'))
+        self.verify_file_btn.clicked.connect(self.verify_files)
+        
         file_btn_layout.addWidget(self.select_decrypt_file_btn)
+        file_btn_layout.addWidget(self.select_decrypt_folder_btn)
         file_btn_layout.addWidget(self.decrypt_file_btn)
+        file_btn_layout.addWidget(self.verify_file_btn)
         
         file_layout.addWidget(self.decrypt_file_info)
         file_layout.addLayout(file_btn_layout)
         layout.addWidget(self.file_group_decrypt)
         
         layout.addStretch()
-        self.decrypt_file_path = None
+        self.decrypt_file_paths = []
         
     def switch_theme(self):
         """Switch between dark and light theme."""
         self.dark_theme = not self.dark_theme
         self.apply_theme()
-        self.update_dynamic_styles()
         
     def switch_language(self):
         """Switch between English and Russian."""
@@ -728,26 +803,15 @@ class SecureCryptoGUI(QMainWindow):
         self.retranslate_ui()
         
     def update_dynamic_styles(self):
-        """Update styles that need to be changed dynamically."""
-        if self.dark_theme:
-            style_selected = "color: #3fb950; font-weight: 600;"
-            style_placeholder = "color: #8b949e; font-style: italic; font-weight: 500;"
-        else:
-            style_selected = "color: #1a7f37; font-weight: 600;"
-            style_placeholder = "color: #656d76; font-style: italic; font-weight: 500;"
-            
-        # Update file info labels
-        if hasattr(self, 'encrypt_file_info'):
-            if self.encrypt_file_path:
-                self.encrypt_file_info.setStyleSheet(style_selected)
-            else:
-                self.encrypt_file_info.setStyleSheet(style_placeholder)
-                
-        if hasattr(self, 'decrypt_file_info'):
-            if self.decrypt_file_path:
-                self.decrypt_file_info.setStyleSheet(style_selected)
-            else:
-                self.decrypt_file_info.setStyleSheet(style_placeholder)
+        """Mark file info labels as selected or empty; colors come from the theme stylesheet."""
+        labels = [(self.encrypt_file_info, self.encrypt_file_paths)]
+        if self.decrypt_tab_built:
+            labels.append((self.decrypt_file_info, self.decrypt_file_paths))
+        for label, paths in labels:
+            selected = bool(paths)
+            if label.property('selected') != selected:
+                label.setProperty('selected', selected)
+                self.repolish(label)
         
     def retranslate_ui(self):
         """Update all UI texts with current language."""
@@ -770,6 +834,7 @@ class SecureCryptoGUI(QMainWindow):
         self.encrypt_btn.setText(self.translator.tr('encrypt_button'))
         self.clear_encrypt_btn.setText(self.translator.tr('clear_button'))
         self.select_encrypt_file_btn.setText(self.translator.tr('select_file_encrypt'))
+        self.select_encrypt_folder_btn.setText(self.translator.tr('select_folder'))
         self.encrypt_file_btn.setText(self.translator.tr('encrypt_file'))
         
         # Update placeholders
@@ -778,31 +843,37 @@ class SecureCryptoGUI(QMainWindow):
         self.encrypt_output.setPlaceholderText(self.translator.tr('output_placeholder'))
         
         # Decryption tab
-        self.key_group_decrypt.setTitle(self.translator.tr('decryption_key'))
-        self.input_group_decrypt.setTitle(self.translator.tr('encrypted_text'))
-        self.result_group_decrypt.setTitle(self.translator.tr('result'))
-        self.file_group_decrypt.setTitle(self.translator.tr('file_operations'))
-        
-        self.decrypt_btn.setText(self.translator.tr('decrypt_button'))
-        self.clear_decrypt_btn.setText(self.translator.tr('clear_button'))
-        self.select_decrypt_file_btn.setText(self.translator.tr('select_file_decrypt'))
-        self.decrypt_file_btn.setText(self.translator.tr('decrypt_file'))
-        
-        # Update placeholders
-        self.decrypt_password.setPlaceholderText(self.translator.tr('enter_password'))
-        self.decrypt_input.setPlaceholderText(self.translator.tr('enter_text_decrypt'))
-        self.decrypt_output.setPlaceholderText(self.translator.tr('output_placeholder'))
+        if self.decrypt_tab_built:
+            self.key_group_decrypt.setTitle(self.translator.tr('decryption_key'))
+            self.input_group_decrypt.setTitle(self.translator.tr('encrypted_text'))
+            self.result_group_decrypt.setTitle(self.translator.tr('result'))
+            self.file_group_decrypt.setTitle(self.translator.tr('file_operations'))
+            
+            self.decrypt_btn.setText(self.translator.tr('decrypt_button'))
+            self.clear_decrypt_btn.setText(self.translator.tr('clear_button'))
+            self.select_decrypt_file_btn.setText(self.translator.tr('select_file_decrypt'))
+            self.select_decrypt_folder_btn.setText(self.translator.tr('select_folder'))
+            self.decrypt_file_btn.setText(self.translator.tr('decrypt_file'))
+            self.verify_file_btn.setText(self.translator.tr('verify_files'))
+            
+            # Update placeholders
+            self.decrypt_password.setPlaceholderText(self.translator.tr('enter_password'))
+            self.decrypt_input.setPlaceholderText(self.translator.tr('enter_text_decrypt'))
+            self.decrypt_output.setPlaceholderText(self.translator.tr('output_placeholder'))
+            self.decrypt_file_info.setText(self.describe_selection(self.decrypt_file_paths))
         
         # Update file info labels
-        if self.encrypt_file_path:
-            self.encrypt_file_info.setText(self.translator.tr('file_selected').format(os.path.basename(self.encrypt_file_path)))
-        else:
-            self.encrypt_file_info.setText(self.translator.tr('no_file_selected'))
-            
-        if self.decrypt_file_path:
-            self.decrypt_file_info.setText(self.translator.tr('file_selected').format(os.path.basename(self.decrypt_file_path)))
-        else:
-            self.decrypt_file_info.setText(self.translator.tr('no_file_selected'))
+        self.encrypt_file_info.setText(self.describe_selection(self.encrypt_file_paths))
+        
+        # Job queue
+        self.jobs_group.setTitle(self.translator.tr('job_queue'))
+        self.update_job_headers()
+        self.concurrency_label.setText(self.translator.tr('concurrent_jobs'))
+        self.cancel_jobs_btn.setText(self.translator.tr('cancel_selected'))
+        self.clear_jobs_btn.setText(self.translator.tr('clear_finished'))
+        for record in self.jobs.values():
+            record['name_item'].setText(self.translator.tr('job_' + record['operation']).format(record['name']))
+            record['status_item'].setText(self.translator.tr('status_' + record['state']))
         
         self.update_dynamic_styles()
 
@@ -843,24 +914,64 @@ class SecureCryptoGUI(QMainWindow):
             QMessageBox.critical(self, "Error", self.translator.tr('error_invalid_hex'))
     
     def select_file_for_encryption(self):
-        """Select file for encryption."""
-        file_path, _ = QFileDialog.getOpenFileName(self, self.translator.tr('select_file_encrypt'))
-        if file_path:
-            self.encrypt_file_path = file_path
-            self.encrypt_file_info.setText(self.translator.tr('file_selected').format(os.path.basename(file_path)))
-            self.update_dynamic_styles()
+        """Select files for encryption."""
+        file_paths, _ = QFileDialog.getOpenFileNames(self, self.translator.tr('select_file_encrypt'))
+        if file_paths:
+            self.set_file_selection('encrypt', file_paths)
     
     def select_file_for_decryption(self):
-        """Select file for decryption."""
-        file_path, _ = QFileDialog.getOpenFileName(self, self.translator.tr('select_file_decrypt'))
-        if file_path:
-            self.decrypt_file_path = file_path
-            self.decrypt_file_info.setText(self.translator.tr('file_selected').format(os.path.basename(file_path)))
-            self.update_dynamic_styles()
+        """Select files for decryption."""
+        file_paths, _ = QFileDialog.getOpenFileNames(self, self.translator.tr('select_file_decrypt'))
+        if file_paths:
+            self.set_file_selection('decrypt', file_paths)
+    
+    def select_folder_for_encryption(self):
+        """Select a folder for encryption."""
+        folder = QFileDialog.getExistingDirectory(self, self.translator.tr('select_folder'))
+        if folder:
+            self.set_file_selection('encrypt', [folder])
+    
+    def select_folder_for_decryption(self):
+        """Select a folder for decryption."""
+        folder = QFileDialog.getExistingDirectory(self, self.translator.tr('select_folder'))
+        if folder:
+            self.set_file_selection('decrypt', [folder])
+    
+    def set_file_selection(self, tab_type, paths):
+        """Remember the selected files/folders of a tab and show them."""
+        if tab_type == 'encrypt':
+            self.encrypt_file_paths = list(paths)
+            self.encrypt_file_info.setText(self.describe_selection(self.encrypt_file_paths))
+        else:
+            self.decrypt_file_paths = list(paths)
+            self.decrypt_file_info.setText(self.describe_selection(self.decrypt_file_paths))
+        self.update_dynamic_styles()
+    
+    def describe_selection(self, paths):
+        """Text of the file info label for a selection."""
+        if not paths:
+            return self.translator.tr('drop_hint')
+        if len(paths) == 1:
+            return self.translator.tr('file_selected').format(os.path.basename(paths[0]))
+        return self.translator.tr('items_selected').format(len(paths))
+    
+    def dragEnterEvent(self, event):
+        """Accept local files and folders dragged onto the window."""
+        urls = event.mimeData().urls()
+        if urls and all(url.isLocalFile() for url in urls):
+            event.acceptProposedAction()
+    
+    def dropEvent(self, event):
+        """Select dropped files and folders on the current tab."""
+        paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+        if paths:
+            self.ensure_decrypt_tab(self.tabs.currentIndex())
+            self.set_file_selection('encrypt' if self.tabs.currentIndex() == 0 else 'decrypt', paths)
+            event.acceptProposedAction()
     
     def encrypt_file(self):
-        """Encrypt selected file."""
-        if not self.encrypt_file_path:
+        """Encrypt selected files and folders."""
+        if not self.encrypt_file_paths:
             QMessageBox.warning(self, "Error", self.translator.tr('error_no_file'))
             return
         
@@ -869,19 +980,11 @@ class SecureCryptoGUI(QMainWindow):
             QMessageBox.warning(self, "Error", self.translator.tr('error_no_password'))
             return
         
-        try:
-            with open(self.encrypt_file_path, 'rb') as f:
-                file_data = f.read()
-            
-            self.encrypt_progress.setVisible(True)
-            self.start_operation('encrypt', file_data, password, 'encrypt')
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to read file: {str(e)}")
+        self.queue_file_jobs('encrypt', self.encrypt_file_paths, password)
     
     def decrypt_file(self):
-        """Decrypt selected file."""
-        if not self.decrypt_file_path:
+        """Decrypt selected files and folders."""
+        if not self.decrypt_file_paths:
             QMessageBox.warning(self, "Error", self.translator.tr('error_no_file'))
             return
         
@@ -890,45 +993,192 @@ class SecureCryptoGUI(QMainWindow):
             QMessageBox.warning(self, "Error", self.translator.tr('error_no_password'))
             return
         
-        try:
-            with open(self.decrypt_file_path, 'rb') as f:
-                file_data = f.read()
-            
-            self.decrypt_progress.setVisible(True)
-            self.start_operation('decrypt', file_data, password, 'decrypt')
-            
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to read file: {str(e)}")
+        self.queue_file_jobs('decrypt', self.decrypt_file_paths, password)
     
-    def start_operation(self, operation_type, data, password, tab_type):
-        """Start encryption/decryption operation."""
-        if tab_type == 'encrypt':
-            progress_bar = self.encrypt_progress
-        else:
-            progress_bar = self.decrypt_progress
+    def verify_files(self):
+        """Check selected encrypted files and folders without decrypting them to disk."""
+        if not self.decrypt_file_paths:
+            QMessageBox.warning(self, "Error", self.translator.tr('error_no_file'))
+            return
         
-        progress_bar.setVisible(True)
+        password = self.decrypt_password.toPlainText().strip()
+        if not password:
+            QMessageBox.warning(self, "Error", self.translator.tr('error_no_password'))
+            return
         
-        self.thread = CryptoThread(operation_type, data, password)
-        self.thread.finished_signal.connect(
-            lambda result, op: self.operation_finished(result, op, tab_type))
-        self.thread.error_signal.connect(
-            lambda error: self.operation_error(error, tab_type))
-        self.thread.progress_signal.connect(progress_bar.setValue)
-        self.thread.start()
+        paths = self.decrypt_file_paths
+        if len(paths) == 1:
+            name = os.path.basename(paths[0])
+        else:
+            name = self.translator.tr('batch_job').format(len(paths))
+        job = VerifyJob(paths, password, self.concurrency_spin.value())
+        self.submit_job(job, name, 'decrypt')
+    
+    def queue_file_jobs(self, operation_type, paths, password):
+        """Queue a single-file job, or one batch job for several files/folders."""
+        from crypto_cli import default_output_name
+        if len(paths) == 1 and os.path.isfile(paths[0]):
+            # Результат пишется сразу в файл, без hex-представления в поле вывода
+            destination, _ = QFileDialog.getSaveFileName(
+                self, self.translator.tr('save_result_as'),
+                default_output_name(paths[0], operation_type))
+            if destination:
+                self.start_operation(operation_type, None, password, operation_type,
+                                     source_path=paths[0], destination_path=destination)
+            return
+        
+        # Дерево каталогов зеркалируется в выбранную папку назначения
+        destination_dir = QFileDialog.getExistingDirectory(self, self.translator.tr('select_destination'))
+        if destination_dir:
+            job = BatchJob(operation_type, paths, password, destination_dir, self.concurrency_spin.value())
+            self.submit_job(job, self.translator.tr('batch_job').format(len(paths)), operation_type)
+    
+    def start_operation(self, operation_type, data, password, tab_type,
+                        source_path=None, destination_path=None):
+        """Queue an encryption/decryption job; returns its id."""
+        if source_path:
+            name = os.path.basename(source_path)
+        else:
+            name = self.translator.tr('text_job').format(len(data))
         
-        self.set_buttons_enabled(False)
+        job = CryptoJob(operation_type, data, password, source_path, destination_path)
+        return self.submit_job(job, name, tab_type)
+    
+    def submit_job(self, job, name, tab_type):
+        """Add a job to the table and start it on the thread pool; returns its id."""
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        operation_type = job.operation_type
+        destination_path = job.destination_path
+        
+        row = self.job_table.rowCount()
+        self.job_table.insertRow(row)
+        record = {
+            'job': job,
+            'operation': operation_type,
+            'name': name,
+            'state': 'queued',
+            'name_item': QTableWidgetItem(self.translator.tr('job_' + operation_type).format(name)),
+            'status_item': QTableWidgetItem(self.translator.tr('status_queued')),
+            'details_item': QTableWidgetItem(destination_path or ''),
+            'progress': QProgressBar(),
+        }
+        record['progress'].setValue(0)
+        self.job_table.setItem(row, 0, record['name_item'])
+        self.job_table.setItem(row, 1, record['status_item'])
+        self.job_table.setCellWidget(row, 2, record['progress'])
+        self.job_table.setItem(row, 3, record['details_item'])
+        self.jobs[job_id] = record
+        
+        signals = job.signals
+        signals.started_signal.connect(
+            lambda: self.set_job_state(job_id, 'running'))
+        signals.finished_signal.connect(
+            lambda result, op: self.operation_finished(job_id, result, op, tab_type))
+        signals.file_finished_signal.connect(
+            lambda path, size, elapsed, rate: self.file_operation_finished(job_id, path, size, elapsed, rate, tab_type))
+        signals.batch_finished_signal.connect(
+            lambda files, failures, size, elapsed, rate: self.batch_operation_finished(
+                job_id, files, failures, size, elapsed, rate, tab_type))
+        signals.verify_finished_signal.connect(
+            lambda good, bad, size, elapsed, rate: self.verify_operation_finished(
+                job_id, good, bad, size, elapsed, rate))
+        signals.error_signal.connect(
+            lambda error: self.operation_error(job_id, error, tab_type))
+        signals.password_rejected_signal.connect(
+            lambda: self.password_rejected(job_id))
+        signals.cancelled_signal.connect(
+            lambda: self.operation_cancelled(job_id))
+        signals.progress_signal.connect(record['progress'].setValue)
+        signals.transfer_signal.connect(
+            lambda done, total, rate, eta: self.update_transfer_status(job_id, done, total, rate, eta))
+        
+        self.thread_pool.start(job)
+        return job_id
+    
+    def set_job_state(self, job_id, state, details=None):
+        """Update the status (and optionally the details) column of a job."""
+        record = self.jobs.get(job_id)
+        if record is None:
+            return
+        record['state'] = state
+        if state in ('done', 'failed', 'cancelled'):
+            # Входные данные и ключ завершённого задания больше не нужны
+            record['job'].data = None
+            record['job'].password = None
+        record['status_item'].setText(self.translator.tr('status_' + state))
+        if details is not None:
+            record['details_item'].setText(details)
+            record['details_item'].setToolTip(details)
+    
+    def update_transfer_status(self, job_id, done, total, rate, eta):
+        """Show processed size, throughput and ETA of a running job."""
+        mb = 1024 * 1024
+        eta_text = time.strftime('%H:%M:%S', time.gmtime(eta))
+        record = self.jobs.get(job_id)
+        if record is not None:
+            record['details_item'].setText(
+                self.translator.tr('progress_status').format(done / mb, total / mb, rate, eta_text))
+    
+    def cancel_selected_jobs(self):
+        """Cancel the selected queued or running jobs."""
+        rows = {index.row() for index in self.job_table.selectionModel().selectedRows()}
+        for job_id, record in self.jobs.items():
+            if record['state'] in ('queued', 'running') and self.job_table.row(record['name_item']) in rows:
+                self.cancel_job(job_id)
+    
+    def cancel_job(self, job_id):
+        """Cancel one job: drop it from the pool queue or stop it between segments."""
+        record = self.jobs[job_id]
+        record['job'].cancel()
+        if self.thread_pool.tryTake(record['job']):
+            # Ещё не запускалось: сигнала из рабочего потока не будет
+            self.operation_cancelled(job_id)
+    
+    def clear_finished_jobs(self):
+        """Remove finished, failed and cancelled jobs from the table."""
+        for job_id, record in list(self.jobs.items()):
+            if record['state'] in ('done', 'failed', 'cancelled'):
+                self.job_table.removeRow(self.job_table.row(record['name_item']))
+                del self.jobs[job_id]
     
-    def operation_finished(self, result, operation_type, tab_type):
-        """Handle completed operation."""
+    def operation_finished(self, job_id, result, operation_type, tab_type):
+        """Handle a completed text job."""
+        self.set_job_state(job_id, 'done', '')
         if tab_type == 'encrypt':
-            self.encrypt_progress.setVisible(False)
             self.handle_encrypt_result(result, operation_type)
         else:
-            self.decrypt_progress.setVisible(False)
             self.handle_decrypt_result(result, operation_type)
-        
-        self.set_buttons_enabled(True)
+    
+    def file_operation_finished(self, job_id, path, size, elapsed, rate, tab_type):
+        """Handle a completed file job written straight to disk."""
+        summary = self.translator.tr('file_summary').format(path, size, elapsed, rate)
+        self.set_job_state(job_id, 'done', summary.replace('\n', '  |  '))
+        output = self.encrypt_output if tab_type == 'encrypt' else self.decrypt_output
+        output.setPlainText(summary)
+    
+    def batch_operation_finished(self, job_id, files, failures, size, elapsed, rate, tab_type):
+        """Handle a completed batch job; failed files are listed in the output field."""
+        mb = 1024 * 1024
+        summary = self.translator.tr('batch_summary').format(
+            files, len(failures), self.jobs[job_id]['job'].destination_path, size / mb, elapsed, rate)
+        self.set_job_state(job_id, 'failed' if failures else 'done', summary.replace('\n', '  |  '))
+        output = self.encrypt_output if tab_type == 'encrypt' else self.decrypt_output
+        output.setPlainText('\n'.join([summary, ''] + failures) if failures else summary)
+    
+    def verify_operation_finished(self, job_id, good, bad, size, elapsed, rate):
+        """Handle a completed integrity check; every file is listed in the decrypt output field."""
+        mb = 1024 * 1024
+        summary = self.translator.tr('verify_summary').format(len(good), len(bad), size / mb, elapsed, rate)
+        self.set_job_state(job_id, 'failed' if bad else 'done', summary.replace('\n', '  |  '))
+        lines = [summary, '']
+        lines += [self.translator.tr('verify_damaged').format(entry) for entry in bad]
+        lines += [self.translator.tr('verify_ok').format(path) for path in good]
+        self.decrypt_output.setPlainText('\n'.join(lines))
+    
+    def operation_cancelled(self, job_id):
+        """Handle a cancelled job."""
+        self.set_job_state(job_id, 'cancelled', self.translator.tr('operation_cancelled'))
     
     def handle_encrypt_result(self, result, operation_type):
         """Handle encryption result."""
@@ -947,32 +1197,37 @@ class SecureCryptoGUI(QMainWindow):
         
         QMessageBox.information(self, "Success", self.translator.tr('decryption_success'))
     
-    def operation_error(self, error_message, tab_type):
-        """Handle operation error."""
-        if tab_type == 'encrypt':
-            self.encrypt_progress.setVisible(False)
-        else:
-            self.decrypt_progress.setVisible(False)
-        
-        QMessageBox.critical(self, "Error", f"Operation failed:\n{error_message}")
-        self.set_buttons_enabled(True)
+    def operation_error(self, job_id, error_message, tab_type):
+        """Handle a failed job."""
+        self.set_job_state(job_id, 'failed', error_message)
+        # Ошибки файловых заданий видны в очереди, без лавины диалогов
+        if self.jobs[job_id]['job'].destination_path is None:
+            QMessageBox.critical(self, "Error", f"Operation failed:\n{error_message}")
     
-    def set_buttons_enabled(self, enabled):
-        """Enable/disable all buttons."""
-        buttons = [
-            self.encrypt_btn, self.clear_encrypt_btn, self.select_encrypt_file_btn, self.encrypt_file_btn,
-            self.decrypt_btn, self.clear_decrypt_btn, self.select_decrypt_file_btn, self.decrypt_file_btn
-        ]
-        for btn in buttons:
-            btn.setEnabled(enabled)
+    def password_rejected(self, job_id):
+        """Handle a job whose password failed the key check."""
+        message = self.translator.tr('error_wrong_password')
+        self.set_job_state(job_id, 'failed', message)
+        QMessageBox.warning(self, "Error", message)
+        if self.decrypt_tab_built:
+            self.decrypt_password.setFocus()
+            self.decrypt_password.selectAll()
+    
+    def closeEvent(self, event):
+        """Cancel outstanding jobs before the window closes."""
+        for job_id, record in list(self.jobs.items()):
+            if record['state'] in ('queued', 'running'):
+                self.cancel_job(job_id)
+        self.thread_pool.waitForDone()
+        super().closeEvent(event)
     
     def clear_encrypt(self):
         """Clear encryption tab."""
         self.encrypt_password.clear()
         self.encrypt_input.clear()
         self.encrypt_output.clear()
-        self.encrypt_file_info.setText(self.translator.tr('no_file_selected'))
-        self.encrypt_file_path = None
+        self.encrypt_file_paths = []
+        self.encrypt_file_info.setText(self.describe_selection(self.encrypt_file_paths))
         self.update_dynamic_styles()
     
     def clear_decrypt(self):
@@ -980,18 +1235,49 @@ class SecureCryptoGUI(QMainWindow):
         self.decrypt_password.clear()
         self.decrypt_input.clear()
         self.decrypt_output.clear()
-        self.decrypt_file_info.setText(self.translator.tr('no_file_selected'))
-        self.decrypt_file_path = None
+        self.decrypt_file_paths = []
+        self.decrypt_file_info.setText(self.describe_selection(self.decrypt_file_paths))
         self.update_dynamic_styles()
 
 
+class StartupTimer(QObject):
+    """Reports the time to the first paint of the main window and quits (--startup-time)."""
+    
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+        self.window_built = time.perf_counter()
+    
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint and obj is self.window:
+            painted = time.perf_counter()
+            QApplication.instance().removeEventFilter(self)
+            
+            def ms(start, end):
+                return (end - start) * 1000
+            
+            print(f"imports:      {ms(STARTUP_BEGIN, STARTUP_IMPORTED):8.1f} ms\n"
+                  f"window built: {ms(STARTUP_IMPORTED, self.window_built):8.1f} ms\n"
+                  f"first paint:  {ms(STARTUP_BEGIN, painted):8.1f} ms (since main.py started)\n"
+                  f"crypto backend loaded: {'secure_crypto' in sys.modules}",
+                  file=sys.stderr)
+            QTimer.singleShot(0, QApplication.instance().quit)
+        return False
+
+
 def main():
     """Application entry point."""
+    measure_startup = '--startup-time' in sys.argv
+    if measure_startup:
+        sys.argv.remove('--startup-time')
+    
     app = QApplication(sys.argv)
     app.setApplicationName("GHHS-EC&DC")
     app.setApplicationVersion("1.0.0")
     
     window = SecureCryptoGUI()
+    if measure_startup:
+        app.installEventFilter(StartupTimer(window))
     window.show()
     
     sys.exit(app.exec())
@@ -1,126 +1,3213 @@
 """
 AES-256-GCM Encryption Module
-Secure encryption/decryption using PBKDF2 and AES-GCM.
+Secure encryption/decryption using AES-GCM with PBKDF2, scrypt or Argon2id
+key derivation.
 """
 
+import hashlib
+import hmac
+import io
+import itertools
+import mmap
 import os
+import stat
 import struct
-from typing import Tuple
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, List, Optional, Tuple, Union
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.hkdf import HKDFExpand
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.exceptions import InvalidTag
 
+try:
+    from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+except ImportError:
+    Scrypt = None
+
+try:
+    from cryptography.hazmat.primitives.kdf.argon2 import Argon2id
+except ImportError:  # cryptography < 44
+    Argon2id = None
+
+try:
+    import bz2
+except ImportError:  # Python built without libbz2
+    bz2 = None
+
+try:
+    import lzma
+except ImportError:  # Python built without liblzma
+    lzma = None
+
+try:
+    from compression import zstd
+except ImportError:  # Python < 3.14
+    zstd = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+BufferLike = Union[bytes, bytearray, memoryview]
+WritableBuffer = Union[bytearray, memoryview]
+ProgressCallback = Callable[[int, int], None]
+
+# AESGCM.encrypt_into/decrypt_into write straight into a caller buffer;
+# older cryptography releases only return new bytes objects.
+_AEAD_INTO_SUPPORTED = hasattr(AESGCM, "encrypt_into")
+
 
 class DecryptionError(Exception):
     """Custom exception for decryption failures."""
     pass
 
 
-class AESGCMEncryptor:
+class InvalidPasswordError(DecryptionError):
+    """The password does not match the key check value of the data."""
+    pass
+
+
+class OperationCancelled(Exception):
+    """Raised when an operation is stopped through its cancel event."""
+    pass
+
+
+class _Progress:
+    """Counts processed plaintext bytes and checks for cancellation between segments."""
+    
+    def __init__(self, total: int, callback: Optional[ProgressCallback] = None,
+                 cancel: Optional[threading.Event] = None):
+        self.total = total
+        self.done = 0
+        self.callback = callback
+        self.cancel = cancel
+    
+    def check(self) -> None:
+        """Raise OperationCancelled if cancellation was requested."""
+        if self.cancel is not None and self.cancel.is_set():
+            raise OperationCancelled("Operation cancelled")
+    
+    def advance(self, count: int) -> None:
+        """Record ``count`` processed bytes, report them and check for cancellation."""
+        self.done += count
+        if self.callback is not None:
+            self.callback(self.done, self.total)
+        self.check()
+
+
+class KDFParams:
+    """
+    Password key derivation algorithm and its cost parameters.
+    
+    Layout: [algorithm(1)][param1(4)][param2(4)][param3(4)]
+    
+    PBKDF2-HMAC-SHA256 stores (iterations, 0, 0), scrypt stores (n, r, p) and
+    Argon2id stores (iterations, memory_cost in KiB, lanes). The descriptor is
+    written into every container header, so data stays decryptable after the
+    configured defaults change.
+    """
+    
+    PBKDF2 = 1
+    SCRYPT = 2
+    ARGON2ID = 3
+    NAMES = {PBKDF2: 'pbkdf2', SCRYPT: 'scrypt', ARGON2ID: 'argon2id'}
+    FIELDS = {
+        PBKDF2: ('iterations',),
+        SCRYPT: ('n', 'r', 'p'),
+        ARGON2ID: ('iterations', 'memory_cost', 'lanes'),
+    }
+    # OWASP / RFC 9106 recommendations; PBKDF2 keeps the historical count
+    DEFAULTS = {
+        PBKDF2: (100000,),
+        SCRYPT: (2 ** 17, 8, 1),
+        ARGON2ID: (3, 64 * 1024, 4),
+    }
+    KEY_SIZE = 32
+    # Upper bounds checked before deriving, so a crafted header cannot make
+    # decryption allocate or compute without limit: about 100x the PBKDF2
+    # default, 8-16x the scrypt and Argon2id memory, and for those two at
+    # most MAX_WORK bytes of mixing (memory times p or passes, ~100x default)
+    MAX_ITERATIONS = 10000000
+    MAX_MEMORY = 1024 ** 3
+    MAX_WORK = 16 * 1024 ** 3
+    _STRUCT = struct.Struct(">BIII")
+    SIZE = _STRUCT.size
+    
+    def __init__(self, algorithm: int, *params: int):
+        """
+        Raises:
+            ValueError: If the algorithm is unknown or a parameter is out of range
+        """
+        if algorithm not in self.NAMES:
+            raise ValueError(f"Unknown key derivation algorithm: {algorithm}")
+        fields = self.FIELDS[algorithm]
+        if len(params) != len(fields):
+            raise ValueError(f"{self.NAMES[algorithm]} takes parameters {', '.join(fields)}")
+        self.algorithm = algorithm
+        self.params = tuple(int(p) for p in params)
+        self._validate()
+    
+    def _validate(self) -> None:
+        if any(p < 1 or p >= 2 ** 32 for p in self.params):
+            raise ValueError(f"Invalid {self.name} parameters: {self}")
+        if self.algorithm == self.PBKDF2:
+            iterations, = self.params
+            memory = passes = 0
+        elif self.algorithm == self.SCRYPT:
+            n, r, p = self.params
+            if n < 2 or n & (n - 1):
+                raise ValueError("scrypt n must be a power of two")
+            iterations, memory, passes = 0, 128 * r * n, p
+        else:
+            passes, memory_cost, lanes = self.params
+            if memory_cost < 8 * lanes:
+                raise ValueError("Argon2id memory_cost must be at least 8 KiB per lane")
+            iterations, memory = 0, memory_cost * 1024
+        if (iterations > self.MAX_ITERATIONS or memory > self.MAX_MEMORY
+                or memory * passes > self.MAX_WORK):
+            raise ValueError(f"{self.name} parameters exceed the supported cost: {self}")
+    
+    @property
+    def name(self) -> str:
+        return self.NAMES[self.algorithm]
+    
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, KDFParams) and (self.algorithm, self.params) == (other.algorithm, other.params)
+    
+    def __hash__(self) -> int:
+        return hash((self.algorithm, self.params))
+    
+    def __str__(self) -> str:
+        fields = self.FIELDS[self.algorithm]
+        return self.name + ':' + ','.join(f"{f}={p}" for f, p in zip(fields, self.params))
+    
+    def __repr__(self) -> str:
+        return f"KDFParams({self})"
+    
+    @classmethod
+    def default(cls, name: str = 'pbkdf2') -> "KDFParams":
+        """Recommended parameters for an algorithm name."""
+        algorithm = cls._algorithm(name)
+        return cls(algorithm, *cls.DEFAULTS[algorithm])
+    
+    @classmethod
+    def parse(cls, text: str) -> "KDFParams":
+        """
+        Parse ``name`` or ``name:field=value,...`` as printed by ``str()``.
+        
+        Fields that are left out keep their default value.
+        
+        Raises:
+            ValueError: If the specification is invalid
+        """
+        name, _, spec = text.strip().partition(':')
+        algorithm = cls._algorithm(name)
+        fields = cls.FIELDS[algorithm]
+        values = dict(zip(fields, cls.DEFAULTS[algorithm]))
+        for item in filter(None, spec.split(',')):
+            field, _, value = item.partition('=')
+            if field.strip() not in values:
+                raise ValueError(f"Unknown {name} parameter: {field}")
+            values[field.strip()] = int(value)
+        return cls(algorithm, *(values[f] for f in fields))
+    
+    @classmethod
+    def _algorithm(cls, name: str) -> int:
+        for algorithm, known in cls.NAMES.items():
+            if known == name.strip().lower():
+                return algorithm
+        raise ValueError(f"Unknown key derivation algorithm: {name} (expected {', '.join(cls.NAMES.values())})")
+    
+    @classmethod
+    def available(cls) -> list:
+        """Names of the algorithms the installed ``cryptography`` can derive with."""
+        names = []
+        for algorithm, name in cls.NAMES.items():
+            # Smallest valid parameters, only to probe the backend
+            probe = {cls.PBKDF2: (1,), cls.SCRYPT: (2, 1, 1), cls.ARGON2ID: (1, 8, 1)}[algorithm]
+            try:
+                cls(algorithm, *probe).derive("probe", bytes(16))
+            except Exception:
+                continue
+            names.append(name)
+        return names
+    
+    def pack(self) -> bytes:
+        """Serialize the descriptor."""
+        params = self.params + (0,) * (3 - len(self.params))
+        return self._STRUCT.pack(self.algorithm, *params)
+    
+    @classmethod
+    def unpack(cls, data: bytes) -> "KDFParams":
+        """
+        Parse a serialized descriptor.
+        
+        Raises:
+            DecryptionError: If the descriptor is truncated or invalid
+        """
+        if len(data) < cls.SIZE:
+            raise DecryptionError("Key derivation descriptor is truncated")
+        algorithm, *params = cls._STRUCT.unpack(data[:cls.SIZE])
+        try:
+            return cls(algorithm, *params[:len(cls.FIELDS.get(algorithm, ()))])
+        except ValueError as e:
+            raise DecryptionError(f"Invalid key derivation descriptor: {e}") from e
+    
+    def derive(self, password: str, salt: bytes) -> bytearray:
+        """
+        Derive a 256-bit key.
+        
+        Raises:
+            DecryptionError: If the installed ``cryptography`` lacks the algorithm
+        """
+        secret = password.encode('utf-8')
+        if self.algorithm == self.PBKDF2:
+            kdf = PBKDF2HMAC(algorithm=hashes.SHA256(), length=self.KEY_SIZE, salt=salt,
+                             iterations=self.params[0])
+        elif self.algorithm == self.SCRYPT:
+            if Scrypt is None:
+                raise DecryptionError("scrypt is not supported by the installed cryptography")
+            n, r, p = self.params
+            kdf = Scrypt(salt=salt, length=self.KEY_SIZE, n=n, r=r, p=p)
+        else:
+            if Argon2id is None:
+                raise DecryptionError("Argon2id requires cryptography 44 or newer")
+            iterations, memory_cost, lanes = self.params
+            kdf = Argon2id(salt=salt, length=self.KEY_SIZE, iterations=iterations,
+                           lanes=lanes, memory_cost=memory_cost)
+        return bytearray(kdf.derive(secret))
+
+
+# Key derivation of the single-shot format and of version 1 containers,
+# which do not record their parameters
+LEGACY_KDF = KDFParams(KDFParams.PBKDF2, 100000)
+
+
+def _time_derivation(kdf: KDFParams) -> float:
+    """Seconds taken by one derivation with ``kdf``."""
+    salt = os.urandom(16)
+    start = time.perf_counter()
+    kdf.derive("calibration", salt)
+    return time.perf_counter() - start
+
+
+def calibrate_kdf(name: str = 'pbkdf2', target_time: float = 0.5,
+                  max_memory: int = 256 * 1024 * 1024) -> KDFParams:
+    """
+    Pick parameters whose derivation takes about ``target_time`` seconds here.
+    
+    PBKDF2 scales its iteration count. scrypt doubles n (r=8, p=1) while
+    the time and ``max_memory`` allow. Argon2id uses ``max_memory`` with up
+    to 4 lanes and scales its iteration count. The result stays within the
+    KDFParams bounds and never drops below a floor: LEGACY_KDF iterations
+    for PBKDF2, n=2^14 for scrypt and one pass for Argon2id.
+    
+    Args:
+        name: 'pbkdf2', 'scrypt' or 'argon2id'
+        target_time: Desired derivation time in seconds
+        max_memory: Memory budget in bytes for scrypt and Argon2id
+        
+    Returns:
+        KDFParams: The calibrated parameters
+        
+    Raises:
+        ValueError: If the algorithm is unknown or the arguments are invalid
+    """
+    if target_time <= 0 or max_memory <= 0:
+        raise ValueError("Target time and memory budget must be positive")
+    algorithm = KDFParams._algorithm(name)
+    
+    if algorithm == KDFParams.PBKDF2:
+        probe = 20000
+        elapsed = _time_derivation(KDFParams(algorithm, probe))
+        iterations = int(probe * target_time / max(elapsed, 1e-6)) // 1000 * 1000
+        return KDFParams(algorithm, min(max(iterations, LEGACY_KDF.params[0]), KDFParams.MAX_ITERATIONS))
+    
+    max_memory = min(max_memory, KDFParams.MAX_MEMORY)
+    if algorithm == KDFParams.SCRYPT:
+        r, p = 8, 1
+        n = 2 ** 14
+        elapsed = _time_derivation(KDFParams(algorithm, n, r, p))
+        # Doubling n roughly doubles the time and the memory
+        while elapsed * 2 <= target_time and 128 * r * n * 2 <= max_memory:
+            n *= 2
+            elapsed = _time_derivation(KDFParams(algorithm, n, r, p))
+        return KDFParams(algorithm, n, r, p)
+    
+    lanes = min(4, os.cpu_count() or 1)
+    memory_cost = max(8 * lanes, max_memory // 1024)
+    elapsed = _time_derivation(KDFParams(algorithm, 1, memory_cost, lanes))
+    iterations = max(1, min(int(target_time / max(elapsed, 1e-6)),
+                            KDFParams.MAX_WORK // (memory_cost * 1024)))
+    return KDFParams(algorithm, iterations, memory_cost, lanes)
+
+
+class Compression:
+    """
+    Optional compression of segment plaintext before encryption.
+    
+    The codec id is stored in the header flags. Every segment is compressed
+    on its own and sealed as [stored(1)][data], where ``stored`` is 1 for
+    compressed data and 0 for a segment kept raw because it did not shrink.
+    """
+    
+    NONE = 0
+    ZLIB = 1
+    LZMA = 2
+    BZ2 = 3
+    ZSTD = 4
+    NAMES = {ZLIB: 'zlib', LZMA: 'lzma', BZ2: 'bz2', ZSTD: 'zstd'}
+    # A sample compressing worse than this ratio disables compression for the container
+    SAMPLE_RATIO = 0.9
+    SAMPLE_SIZE = 256 * 1024
+    
+    @classmethod
+    def available(cls) -> list:
+        """Codec names supported by this Python build."""
+        modules = {cls.ZLIB: zlib, cls.LZMA: lzma, cls.BZ2: bz2, cls.ZSTD: zstd or zstandard}
+        return [name for codec, name in cls.NAMES.items() if modules[codec] is not None]
+    
+    @classmethod
+    def codec_id(cls, name: str) -> int:
+        """
+        Codec id for ``name``.
+        
+        Raises:
+            ValueError: If the codec is unknown or not available
+        """
+        for codec, codec_name in cls.NAMES.items():
+            if codec_name == name:
+                if name not in cls.available():
+                    raise ValueError(f"Compression codec {name} is not available in this Python build")
+                return codec
+        raise ValueError(f"Unknown compression codec: {name}")
+    
+    @classmethod
+    def compress(cls, codec: int, data: BufferLike) -> bytes:
+        """Compress one segment."""
+        if codec == cls.ZLIB:
+            return zlib.compress(data, 6)
+        if codec == cls.LZMA:
+            return lzma.compress(data, preset=6)
+        if codec == cls.BZ2:
+            return bz2.compress(data, 9)
+        if zstd is not None:
+            return zstd.compress(data)
+        return zstandard.ZstdCompressor().compress(data)
+    
+    @classmethod
+    def decompress(cls, codec: int, data: BufferLike, max_size: int) -> bytes:
+        """
+        Decompress one segment of at most ``max_size`` bytes.
+        
+        Raises:
+            DecryptionError: If the data is invalid or expands beyond ``max_size``
+        """
+        try:
+            if codec == cls.ZSTD and zstd is None:
+                if zstandard is None:
+                    raise DecryptionError("zstd compression is not available in this Python build")
+                return zstandard.ZstdDecompressor().decompress(data, max_output_size=max_size)
+            factories = {cls.ZLIB: zlib.decompressobj, cls.LZMA: lzma and lzma.LZMADecompressor,
+                         cls.BZ2: bz2 and bz2.BZ2Decompressor, cls.ZSTD: zstd and zstd.ZstdDecompressor}
+            if not factories.get(codec):
+                raise DecryptionError(f"Compression codec {codec} is not available in this Python build")
+            decompressor = factories[codec]()
+            plaintext = decompressor.decompress(data, max_size)
+            if not decompressor.eof:
+                raise DecryptionError("Compressed segment is corrupted or too large")
+            return plaintext
+        except DecryptionError:
+            raise
+        except Exception as e:
+            raise DecryptionError(f"Compressed segment is corrupted: {e}") from e
+    
+    @classmethod
+    def worth_it(cls, codec: int, sample: BufferLike) -> bool:
+        """Whether ``sample`` shrinks enough to be worth compressing."""
+        sample = memoryview(sample)[:cls.SAMPLE_SIZE]
+        return sample.nbytes > 0 and len(cls.compress(codec, sample)) <= sample.nbytes * cls.SAMPLE_RATIO
+    
+    @classmethod
+    def pack_segment(cls, codec: int, chunk: BufferLike) -> bytes:
+        """Compress a segment, keeping it raw when that does not make it smaller."""
+        compressed = cls.compress(codec, chunk)
+        if len(compressed) < len(chunk):
+            return b"\x01" + compressed
+        return b"\x00" + bytes(chunk)
+    
+    @classmethod
+    def unpack_segment(cls, codec: int, data: BufferLike, segment_size: int, final: bool) -> bytes:
+        """
+        Restore an authenticated segment produced by ``pack_segment``.
+        
+        Raises:
+            DecryptionError: If the segment is malformed
+        """
+        if not data or data[0] > 1:
+            raise DecryptionError("Invalid compressed segment")
+        plaintext = cls.decompress(codec, data[1:], segment_size) if data[0] else bytes(data[1:])
+        if len(plaintext) > segment_size or (not final and len(plaintext) != segment_size):
+            raise DecryptionError("Invalid compressed segment size")
+        return plaintext
+
+
+class StreamHeader:
+    """
+    Header of the segmented streaming container.
+
+    Layout (version 2):
+    [magic(4)][version(1)][flags(1)][segment_size(4)][salt(16)][nonce_prefix(7)][kdf(13)]
+
+    Version 1 headers end after the nonce prefix and imply LEGACY_KDF.
+    The packed header is authenticated as associated data of every segment.
+    Segment nonces follow the STREAM construction:
+    [nonce_prefix(7)][segment_index(4)][final_flag(1)].
+    
+    Version 3 gives meaning to the flags:
+    - bits 0-2: Compression codec. Compressed segments vary in size, so each
+      one is framed as [sealed_length(4)][sealed].
+    - bit 3: an 8-byte key check value follows the kdf field. It is
+      HKDF-Expand(key, "key check") and lets a wrong password be rejected
+      right after key derivation, before any payload is read.
+    - bit 4: every segment has its own random nonce, stored in front of it
+      as [nonce(12)][ciphertext][tag] (inside the frame when compressed);
+      the segment index and final flag move from the nonce into the
+      associated data, [header][index(4)][final(1)]. Such segments can be
+      sealed again without reusing a nonce (see AESGCMEncryptor.update_file
+      and encrypt_file_resumable).
+    """
+    
+    MAGIC = b"GHSC"
+    VERSION = 3
+    CODEC_MASK = 0x07
+    FLAG_KEY_CHECK = 0x08
+    FLAG_RANDOM_NONCES = 0x10
+    KNOWN_FLAGS = CODEC_MASK | FLAG_KEY_CHECK | FLAG_RANDOM_NONCES
+    KEY_CHECK_SIZE = 8
+    NONCE_PREFIX_SIZE = 7
+    NONCE_SIZE = 12
+    TAG_SIZE = 16
+    MAX_SEGMENTS = 2 ** 32
+    FRAME = struct.Struct(">I")
+    SEGMENT_AAD = struct.Struct(">IB")
+    _STRUCT = struct.Struct(">4sBBI16s7s")
+    # Fixed part shared by all versions; enough to learn the full header size
+    PREFIX_SIZE = _STRUCT.size
+    SIZE = PREFIX_SIZE + KDFParams.SIZE
+    
+    def __init__(self, segment_size: int, salt: bytes, nonce_prefix: bytes, flags: int = 0,
+                 kdf: Optional[KDFParams] = None, version: int = VERSION,
+                 key_check: Optional[bytes] = None):
+        self.segment_size = segment_size
+        self.salt = salt
+        self.nonce_prefix = nonce_prefix
+        self.flags = flags
+        self.kdf = kdf or LEGACY_KDF
+        self.version = version
+        # Filled in once the key is derived for a new header
+        self.key_check = key_check
+    
+    @classmethod
+    def _size_for(cls, version: int, flags: int) -> int:
+        if version == 1:
+            return cls.PREFIX_SIZE
+        if version >= 3 and flags & cls.FLAG_KEY_CHECK:
+            return cls.SIZE + cls.KEY_CHECK_SIZE
+        return cls.SIZE
+    
+    @property
+    def size(self) -> int:
+        """Packed size of this header."""
+        return self._size_for(self.version, self.flags)
+    
+    @property
+    def has_key_check(self) -> bool:
+        """Whether the header carries a key check value."""
+        return self.version >= 3 and bool(self.flags & self.FLAG_KEY_CHECK)
+    
+    @property
+    def codec(self) -> int:
+        """Compression codec of the segments, Compression.NONE when uncompressed."""
+        return self.flags & self.CODEC_MASK if self.version >= 3 else Compression.NONE
+    
+    @property
+    def framed(self) -> bool:
+        """Whether segments are length-framed (compressed containers)."""
+        return self.codec != Compression.NONE
+    
+    @property
+    def random_nonces(self) -> bool:
+        """Whether every segment carries its own random nonce."""
+        return self.version >= 3 and bool(self.flags & self.FLAG_RANDOM_NONCES)
+    
+    @property
+    def segment_overhead(self) -> int:
+        """Bytes a sealed segment adds to its plaintext, not counting frames."""
+        return self.TAG_SIZE + (self.NONCE_SIZE if self.random_nonces else 0)
+    
+    @property
+    def sealed_size(self) -> int:
+        """Size of a full sealed segment of an uncompressed container."""
+        return self.segment_size + self.segment_overhead
+    
+    @property
+    def max_frame(self) -> int:
+        """Largest valid sealed segment of a framed container."""
+        return self.segment_size + 1 + self.segment_overhead
+    
+    @classmethod
+    def size_from_prefix(cls, prefix: bytes) -> int:
+        """
+        Full header size announced by the first PREFIX_SIZE bytes.
+        
+        Raises:
+            DecryptionError: If the prefix is not a supported stream header
+        """
+        if len(prefix) < cls.PREFIX_SIZE:
+            raise DecryptionError("Encrypted stream header is truncated")
+        if prefix[:4] != cls.MAGIC:
+            raise DecryptionError("Not an encrypted stream container")
+        version = prefix[4]
+        if version in (1, 2, 3):
+            return cls._size_for(version, prefix[5])
+        raise DecryptionError(f"Unsupported stream container version: {version}")
+    
+    def pack(self) -> bytes:
+        """Serialize the header."""
+        prefix = self._STRUCT.pack(
+            self.MAGIC, self.version, self.flags,
+            self.segment_size, self.salt, self.nonce_prefix,
+        )
+        if self.version == 1:
+            return prefix
+        if self.has_key_check:
+            if self.key_check is None:
+                raise ValueError("Key check value has not been computed")
+            return prefix + self.kdf.pack() + self.key_check
+        return prefix + self.kdf.pack()
+    
+    @classmethod
+    def unpack(cls, data: bytes) -> "StreamHeader":
+        """
+        Parse a serialized header.
+        
+        Raises:
+            DecryptionError: If the data is not a supported stream header
+        """
+        size = cls.size_from_prefix(data[:cls.PREFIX_SIZE])
+        if len(data) < size:
+            raise DecryptionError("Encrypted stream header is truncated")
+        magic, version, flags, segment_size, salt, nonce_prefix = cls._STRUCT.unpack(data[:cls.PREFIX_SIZE])
+        if segment_size == 0:
+            raise DecryptionError("Invalid segment size in stream header")
+        if version >= 3:
+            if flags & ~cls.KNOWN_FLAGS:
+                raise DecryptionError(f"Unsupported stream header flags: {flags:#04x}")
+            codec = flags & cls.CODEC_MASK
+            if codec and codec not in Compression.NAMES:
+                raise DecryptionError(f"Unsupported compression codec: {codec}")
+        if version == 1:
+            return cls(segment_size, bytes(salt), bytes(nonce_prefix), flags, LEGACY_KDF, version)
+        kdf_end = cls.PREFIX_SIZE + KDFParams.SIZE
+        kdf = KDFParams.unpack(bytes(data[cls.PREFIX_SIZE:kdf_end]))
+        key_check = bytes(data[kdf_end:size]) if size > kdf_end else None
+        return cls(segment_size, bytes(salt), bytes(nonce_prefix), flags, kdf, version, key_check)
+    
+    def segment_nonce(self, index: int, final: bool) -> bytes:
+        """Build the nonce for segment ``index``."""
+        if index >= self.MAX_SEGMENTS:
+            raise ValueError("Stream is too long for the configured segment size")
+        return self.nonce_prefix + self.SEGMENT_AAD.pack(index, 1 if final else 0)
+    
+    def sealing_params(self, index: int, final: bool, aad: bytes) -> Tuple[bytes, bytes]:
+        """
+        (nonce, associated data) for sealing segment ``index``.
+        
+        With random nonces the nonce is fresh on every call and must be
+        stored in front of the sealed segment.
+        """
+        if not self.random_nonces:
+            return self.segment_nonce(index, final), aad
+        if index >= self.MAX_SEGMENTS:
+            raise ValueError("Stream is too long for the configured segment size")
+        return os.urandom(self.NONCE_SIZE), aad + self.SEGMENT_AAD.pack(index, 1 if final else 0)
+    
+    def opening_params(self, index: int, sealed: BufferLike, final: bool,
+                       aad: bytes) -> Tuple[bytes, BufferLike, bytes]:
+        """
+        (nonce, ciphertext with tag, associated data) for opening a sealed segment.
+        
+        Raises:
+            DecryptionError: If the sealed segment is too short
+        """
+        if len(sealed) < self.segment_overhead:
+            raise DecryptionError("Encrypted stream is truncated")
+        if not self.random_nonces:
+            return self.segment_nonce(index, final), sealed, aad
+        return (bytes(sealed[:self.NONCE_SIZE]), sealed[self.NONCE_SIZE:],
+                aad + self.SEGMENT_AAD.pack(index, 1 if final else 0))
+    
+    def encrypted_size(self, plaintext_size: int) -> int:
+        """
+        Total container size for ``plaintext_size`` bytes of plaintext.
+        
+        For framed containers this is an upper bound, reached when no segment compresses.
+        """
+        segments = max(1, -(-plaintext_size // self.segment_size))
+        overhead = self.segment_overhead + (self.FRAME.size + 1 if self.framed else 0)
+        return self.size + plaintext_size + segments * overhead
+    
+    def layout(self, encrypted_size: int) -> Tuple[int, int]:
+        """
+        Compute (segment count, plaintext size) from the total container size.
+        
+        Only fixed-size (uncompressed) containers have a computable layout.
+        
+        Raises:
+            DecryptionError: If no valid container has this size
+        """
+        if self.framed:
+            raise DecryptionError("Compressed containers have no fixed layout")
+        body = encrypted_size - self.size
+        sealed = self.sealed_size
+        segments = max(1, -(-body // sealed))
+        if body - (segments - 1) * sealed < self.segment_overhead:
+            raise DecryptionError("Encrypted stream is truncated")
+        return segments, body - segments * self.segment_overhead
+
+
+@contextmanager
+def _map_file(f: BinaryIO, writable: bool = False) -> Iterator[memoryview]:
+    """Memory-map an open file; empty files yield an empty buffer."""
+    if os.fstat(f.fileno()).st_size == 0:
+        yield memoryview(bytearray() if writable else b"")
+        return
+    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    try:
+        yield view
+        if writable:
+            mapped.flush()
+    finally:
+        view.release()
+        try:
+            mapped.close()
+        except BufferError:
+            # A slice is still referenced (e.g. from a traceback); the map is
+            # closed when it is garbage collected.
+            pass
+
+
+@contextmanager
+def mapped_file(path: str) -> Iterator[memoryview]:
+    """Map a file read-only and yield a memoryview over its contents."""
+    with open(path, 'rb') as f, _map_file(f) as view:
+        yield view
+
+
+def _read_exact(src: BinaryIO, size: int) -> bytes:
+    """Read up to ``size`` bytes, retrying short reads from pipes and sockets."""
+    data = src.read(size)
+    if not data or len(data) == size:
+        return data or b""
+    parts = [data]
+    remaining = size - len(data)
+    while remaining:
+        chunk = src.read(remaining)
+        if not chunk:
+            break
+        parts.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(parts)
+
+
+def _iter_segments(src: BinaryIO, size: int) -> Iterator[Tuple[int, bytes, bool]]:
+    """
+    Split a stream into segments of ``size`` bytes.
+    
+    Yields:
+        (index, data, final) tuples; one segment of lookahead is kept so the
+        last segment can be flagged. An empty stream yields one empty final segment.
+    """
+    index = 0
+    current = _read_exact(src, size)
+    while True:
+        following = _read_exact(src, size) if len(current) == size else b""
+        final = not following
+        yield index, current, final
+        if final:
+            return
+        current = following
+        index += 1
+
+
+def _read_frame(src: BinaryIO, header: StreamHeader) -> Optional[bytes]:
+    """
+    Read one [length][sealed] frame; None at the end of the stream.
+    
+    Raises:
+        DecryptionError: If the frame is truncated or has an invalid length
+    """
+    prefix = _read_exact(src, header.FRAME.size)
+    if not prefix:
+        return None
+    if len(prefix) < header.FRAME.size:
+        raise DecryptionError("Encrypted stream is truncated")
+    (length,) = header.FRAME.unpack(prefix)
+    if not header.TAG_SIZE < length <= header.max_frame:
+        raise DecryptionError("Invalid segment length in encrypted stream")
+    sealed = _read_exact(src, length)
+    if len(sealed) < length:
+        raise DecryptionError("Encrypted stream is truncated")
+    return sealed
+
+
+def _iter_frames(src: BinaryIO, header: StreamHeader) -> Iterator[Tuple[int, bytes, bool]]:
+    """Like ``_iter_segments`` for the framed segments of a compressed container."""
+    current = _read_frame(src, header)
+    if current is None:
+        raise DecryptionError("Encrypted stream is truncated")
+    for index in itertools.count():
+        following = _read_frame(src, header)
+        yield index, current, following is None
+        if following is None:
+            return
+        current = following
+
+
+def _iter_sealed(src: BinaryIO, header: StreamHeader, start: int = 0) -> Iterator[Tuple[int, bytes, bool]]:
+    """Sealed segments of a container body, numbered from ``start``."""
+    if header.framed:
+        segments = _iter_frames(src, header)
+    else:
+        segments = _iter_segments(src, header.sealed_size)
+    return ((start + index, sealed, final) for index, sealed, final in segments)
+
+
+class DerivedKeyCache:
+    """
+    Bounded in-memory cache of derived keys with LRU eviction and a TTL.
+    
+    Entries are keyed by (password digest, salt). The digest is an HMAC of the
+    password under a random per-cache secret, so the cache never holds a value
+    that could be used as a fast offline password hash. Keys are kept in
+    ``bytearray`` buffers and zeroed when they are evicted, expire or the
+    cache is cleared.
+    """
+    
+    def __init__(self, max_entries: int = 128, ttl: Optional[float] = 300.0):
+        if max_entries < 1:
+            raise ValueError("Cache size must be positive")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._secret = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._entries)
+    
+    def _cache_key(self, password: str, salt: bytes) -> Tuple[bytes, bytes]:
+        digest = hmac.new(self._secret, password.encode('utf-8'), hashlib.sha256).digest()
+        return digest, bytes(salt)
+    
+    def _drop(self, cache_key: Tuple[bytes, bytes]) -> None:
+        key, _ = self._entries.pop(cache_key)
+        for i in range(len(key)):
+            key[i] = 0
+    
+    def _expire(self) -> None:
+        if self.ttl is None:
+            return
+        now = time.monotonic()
+        expired = [k for k, (_, expires) in self._entries.items() if expires <= now]
+        for cache_key in expired:
+            self._drop(cache_key)
+    
+    def get(self, password: str, salt: bytes) -> Optional[bytes]:
+        """Return a cached key, or None if it is missing or expired."""
+        cache_key = self._cache_key(password, salt)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is None:
+                return None
+            if self.ttl is not None and entry[1] <= time.monotonic():
+                self._drop(cache_key)
+                return None
+            self._entries.move_to_end(cache_key)
+            return bytearray(entry[0])
+    
+    def put(self, password: str, salt: bytes, key: bytes) -> None:
+        """Store a derived key, evicting the least recently used entries."""
+        cache_key = self._cache_key(password, salt)
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            if cache_key in self._entries:
+                self._drop(cache_key)
+            self._entries[cache_key] = (bytearray(key), expires)
+            self._expire()
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+    
+    def get_or_derive(self, password: str, salt: bytes, derive: Callable[[], bytes]) -> bytes:
+        """Return the cached key for (password, salt), calling ``derive`` on a miss."""
+        key = self.get(password, salt)
+        if key is None:
+            key = derive()
+            self.put(password, salt, key)
+        return key
+    
+    def clear(self) -> None:
+        """Zero and drop every cached key."""
+        with self._lock:
+            for cache_key in list(self._entries):
+                self._drop(cache_key)
+
+
+class ParallelSegmentEngine:
+    """
+    Runs per-segment AEAD work on a thread pool and yields results in order.
+    
+    The ``cryptography`` AEAD calls release the GIL, so threads scale across
+    cores without pickling segments to worker processes. At most
+    ``max_in_flight`` segments are queued or processed at any time, which
+    caps memory at roughly ``max_in_flight * segment_size * 2``.
+    """
+    
+    def __init__(self, workers: Optional[int] = None, max_in_flight: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or self.workers * 4
+        if self.workers < 1 or self.max_in_flight < 1:
+            raise ValueError("Worker count and in-flight window must be positive")
+    
+    def map(self, func: Callable[..., Any], items: Iterable[tuple]) -> Iterator[Any]:
+        """Apply ``func(*item)`` to every item concurrently, yielding results in input order."""
+        pending = deque()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                for item in items:
+                    pending.append(pool.submit(func, *item))
+                    if len(pending) >= self.max_in_flight:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+    
+    def encrypt_stream(self, src: BinaryIO, dst: BinaryIO, password: str,
+                       segment_size: int = 1024 * 1024) -> int:
+        """Encrypt a stream into the segmented container using all workers."""
+        return AESGCMEncryptor().encrypt_stream(src, dst, password, segment_size, engine=self)
+    
+    def decrypt_stream(self, src: BinaryIO, dst: BinaryIO, password: str) -> int:
+        """Decrypt a segmented container using all workers."""
+        return AESGCMEncryptor().decrypt_stream(src, dst, password, engine=self)
+
+
+def _is_stream_container(data: BufferLike) -> bool:
+    """Check whether ``data`` starts with a supported segmented container header."""
+    try:
+        StreamHeader.size_from_prefix(data[:StreamHeader.PREFIX_SIZE])
+    except DecryptionError:
+        return False
+    return True
+
+
+def _stream_size(src: BinaryIO) -> int:
+    """Bytes left in a regular file, or 0 when the size cannot be known (pipes)."""
+    try:
+        info = os.fstat(src.fileno())
+        if stat.S_ISREG(info.st_mode):
+            return max(0, info.st_size - src.tell())
+    except (AttributeError, OSError, ValueError):
+        pass
+    return 0
+
+
+class _Discard:
+    """Write-only sink that drops everything (verification keeps no plaintext)."""
+    
+    def write(self, data: bytes) -> int:
+        return len(data)
+
+
+def _remove_quietly(path: str) -> None:
+    """Remove a partially written output file, ignoring errors."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _map_segments(func: Callable[..., Any], segments: Iterable[tuple],
+                  engine: Optional[ParallelSegmentEngine]) -> Iterator[Any]:
+    """Apply ``func`` to segments inline, or on ``engine`` when one is given."""
+    if engine is None:
+        return (func(*segment) for segment in segments)
+    return engine.map(func, segments)
+
+
+def _sync_directory(path: str) -> None:
+    """Make a rename in the directory of ``path`` durable where the platform allows it."""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:  # Windows cannot open directories
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class CheckpointJournal:
+    """
+    Progress of a resumable file operation, kept next to its output.
+    
+    The operation writes to ``<destination>.part`` and records in
+    ``<destination>.journal`` how many segments are complete:
+        [magic GHCJ][version][operation][source size u64][source mtime ns u64]
+        [segments u64][source bytes consumed u64][bytes written u64]
+        [header length u16][container header]
+    The journal is replaced atomically and only after the data it describes
+    has been flushed to disk, so it never claims more than the .part file
+    holds. The container header is not secret (it starts every container)
+    and lets an encryption continue with the same salt and key.
+    """
+    
+    MAGIC = b"GHCJ"
+    VERSION = 1
+    ENCRYPT = 1
+    DECRYPT = 2
+    FIXED = struct.Struct('>4sBBQqQQQH')
+    PARTIAL_SUFFIX = '.part'
+    JOURNAL_SUFFIX = '.journal'
+    
+    def __init__(self, operation: int, source: os.stat_result, header: bytes,
+                 segments: int = 0, consumed: int = 0, written: int = 0):
+        self.operation = operation
+        self.source_size = source.st_size
+        self.source_mtime = source.st_mtime_ns
+        self.header = header
+        self.segments = segments
+        self.consumed = consumed
+        self.written = written
+    
+    @classmethod
+    def paths(cls, destination: str) -> Tuple[str, str]:
+        """(partial output, journal) paths of a destination file."""
+        return destination + cls.PARTIAL_SUFFIX, destination + cls.JOURNAL_SUFFIX
+    
+    def pack(self) -> bytes:
+        return self.FIXED.pack(self.MAGIC, self.VERSION, self.operation, self.source_size,
+                               self.source_mtime, self.segments, self.consumed, self.written,
+                               len(self.header)) + self.header
+    
+    @classmethod
+    def unpack(cls, data: bytes) -> Optional["CheckpointJournal"]:
+        """Parse a journal; None if it is damaged or from an unknown version."""
+        if len(data) < cls.FIXED.size:
+            return None
+        (magic, version, operation, size, mtime, segments, consumed, written,
+         header_size) = cls.FIXED.unpack_from(data)
+        if (magic != cls.MAGIC or version != cls.VERSION or operation not in (cls.ENCRYPT, cls.DECRYPT)
+                or len(data) != cls.FIXED.size + header_size):
+            return None
+        journal = cls.__new__(cls)
+        journal.operation = operation
+        journal.source_size = size
+        journal.source_mtime = mtime
+        journal.header = data[cls.FIXED.size:]
+        journal.segments = segments
+        journal.consumed = consumed
+        journal.written = written
+        return journal
+    
+    @classmethod
+    def load(cls, destination: str) -> Optional["CheckpointJournal"]:
+        """Journal of an interrupted operation on ``destination``, if one can be resumed."""
+        partial, path = cls.paths(destination)
+        try:
+            with open(path, 'rb') as f:
+                journal = cls.unpack(f.read())
+            if journal is None or os.path.getsize(partial) < journal.written:
+                return None
+            if journal.operation == cls.ENCRYPT:
+                # The partial container must start with the recorded header
+                with open(partial, 'rb') as f:
+                    if f.read(len(journal.header)) != journal.header:
+                        return None
+        except OSError:
+            return None
+        return journal
+    
+    def matches(self, operation: int, source: os.stat_result, header: Optional[bytes] = None) -> bool:
+        """Whether this journal belongs to the same operation on the same, unmodified source."""
+        return (self.operation == operation and self.source_size == source.st_size
+                and self.source_mtime == source.st_mtime_ns
+                and (header is None or self.header == header))
+    
+    def finished(self, source: os.stat_result) -> bool:
+        """
+        Whether the whole source was processed when the journal was saved.
+        
+        A run cancelled or killed after its last segment but before
+        ``complete()`` leaves such a journal; only the rename is left to do.
+        """
+        return self.segments > 0 and self.consumed == source.st_size
+    
+    def save(self, destination: str) -> None:
+        """Atomically replace the journal of ``destination``."""
+        _, path = self.paths(destination)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.pack())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    
+    def checkpoint(self, dst: BinaryIO, destination: str) -> None:
+        """Flush the partial output to disk, then record the progress."""
+        dst.flush()
+        os.fsync(dst.fileno())
+        self.save(destination)
+    
+    @classmethod
+    def discard(cls, destination: str) -> None:
+        """Remove the partial output and journal of ``destination``."""
+        for path in cls.paths(destination):
+            _remove_quietly(path)
+        _remove_quietly(destination + cls.JOURNAL_SUFFIX + '.tmp')
+    
+    @classmethod
+    def complete(cls, dst: BinaryIO, destination: str) -> None:
+        """Flush the finished partial output, rename it into place and drop the journal."""
+        partial, path = cls.paths(destination)
+        dst.flush()
+        os.fsync(dst.fileno())
+        dst.close()
+        os.replace(partial, destination)
+        _sync_directory(destination)
+        _remove_quietly(path)
+
+
+class SegmentManifest:
+    """
+    Keyed digests of the plaintext segments of an updatable container.
+    
+    ``AESGCMEncryptor.update_file`` keeps it in ``<container>.manifest``:
+        [magic GHMF][version][header length u16][plaintext size u64][segments u32]
+        [container header][digest(16) per segment]
+    A digest is BLAKE2b over the segment index and plaintext, keyed with a
+    subkey of the container key, so without the password the manifest
+    reveals no more than the container itself: the plaintext size and which
+    segments changed between updates. An all-zero digest marks a segment
+    that must be sealed again whatever its plaintext.
+    """
+    
+    MAGIC = b"GHMF"
+    VERSION = 1
+    DIGEST_SIZE = 16
+    FIXED = struct.Struct('>4sBHQI')
+    SUFFIX = '.manifest'
+    
+    def __init__(self, header: bytes, size: int, digests: bytearray):
+        self.header = header
+        self.size = size
+        self.digests = digests
+    
+    @property
+    def segments(self) -> int:
+        """Number of segments described."""
+        return len(self.digests) // self.DIGEST_SIZE
+    
+    def digest(self, index: int) -> bytes:
+        """Digest of segment ``index``."""
+        return bytes(self.digests[index * self.DIGEST_SIZE:(index + 1) * self.DIGEST_SIZE])
+    
+    def clear(self, index: int) -> None:
+        """Mark segment ``index`` for rewriting."""
+        self.digests[index * self.DIGEST_SIZE:(index + 1) * self.DIGEST_SIZE] = bytes(self.DIGEST_SIZE)
+    
+    def pack(self) -> bytes:
+        return self.FIXED.pack(self.MAGIC, self.VERSION, len(self.header), self.size,
+                               self.segments) + self.header + bytes(self.digests)
+    
+    @classmethod
+    def unpack(cls, data: bytes) -> Optional["SegmentManifest"]:
+        """Parse a manifest; None if it is damaged or from an unknown version."""
+        if len(data) < cls.FIXED.size:
+            return None
+        magic, version, header_size, size, segments = cls.FIXED.unpack_from(data)
+        if (magic != cls.MAGIC or version != cls.VERSION
+                or len(data) != cls.FIXED.size + header_size + segments * cls.DIGEST_SIZE):
+            return None
+        end = cls.FIXED.size + header_size
+        return cls(data[cls.FIXED.size:end], size, bytearray(data[end:]))
+    
+    @classmethod
+    def load(cls, destination: str) -> Optional["SegmentManifest"]:
+        """
+        Manifest of the updatable container ``destination``, if it can be trusted.
+        
+        The container must start with the recorded header and have the size
+        the manifest implies; otherwise it was replaced or damaged after the
+        manifest was written.
+        """
+        try:
+            with open(destination + cls.SUFFIX, 'rb') as f:
+                manifest = cls.unpack(f.read())
+            if manifest is None:
+                return None
+            header = StreamHeader.unpack(manifest.header)
+            with open(destination, 'rb') as f:
+                if f.read(len(manifest.header)) != manifest.header:
+                    return None
+                stored = f.seek(0, os.SEEK_END)
+        except (OSError, DecryptionError):
+            return None
+        segments = max(1, -(-manifest.size // header.segment_size))
+        if (not header.random_nonces or manifest.segments != segments
+                or stored != header.encrypted_size(manifest.size)):
+            return None
+        return manifest
+    
+    def save(self, destination: str) -> None:
+        """Atomically replace the manifest of ``destination``."""
+        path = destination + self.SUFFIX
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.pack())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+class PackedRecords:
+    """
+    Many byte records in one contiguous buffer.
+    
+    Record ``i`` is ``buffer[offsets[i]:offsets[i + 1]]``; ``offsets`` holds
+    one more entry than there are records and starts at 0.
+    """
+    
+    def __init__(self, offsets: array, buffer: bytearray):
+        self.offsets = offsets
+        self.buffer = buffer
+    
+    @classmethod
+    def from_records(cls, records: Iterable[BufferLike]) -> "PackedRecords":
+        """Pack an iterable of byte records."""
+        records = list(records)
+        offsets = array('Q', itertools.accumulate((len(r) for r in records), initial=0))
+        return cls(offsets, bytearray(b"".join(records)))
+    
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, index: int) -> memoryview:
+        """Zero-copy view of record ``index``."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("record index out of range")
+        return memoryview(self.buffer)[self.offsets[index]:self.offsets[index + 1]]
+    
+    def __iter__(self) -> Iterator[memoryview]:
+        view = memoryview(self.buffer)
+        offsets = self.offsets
+        return (view[offsets[i]:offsets[i + 1]] for i in range(len(self)))
+    
+    def to_list(self) -> list:
+        """Copy every record out as ``bytes``."""
+        return [bytes(record) for record in self]
+
+
+class RecordBatch(PackedRecords):
+    """
+    Records encrypted under one key by ``AESGCMEncryptor.encrypt_many``.
+    
+    Each record is sealed as [nonce(12)][ciphertext][auth_tag(16)] with the
+    batch header plus the 8-byte record index as associated data, so records
+    cannot be moved between positions or batches.
+    
+    Serialized layout:
+    [magic(4)][version(1)][salt(16)][kdf(13)][count(8)][offsets((count + 1) * 8)][records]
+    """
+    
+    MAGIC = b"GHRB"
+    VERSION = 1
+    # Random nonces: stay far below the 2^32 messages per key bound
+    MAX_RECORDS = 2 ** 28
+    NONCE_SIZE = 12
+    OVERHEAD = NONCE_SIZE + StreamHeader.TAG_SIZE
+    _STRUCT = struct.Struct(f">4sB16s{KDFParams.SIZE}s")
+    _COUNT = struct.Struct(">Q")
+    
+    def __init__(self, salt: bytes, kdf: KDFParams, offsets: array, buffer: bytearray):
+        super().__init__(offsets, buffer)
+        self.salt = salt
+        self.kdf = kdf
+    
+    def header(self) -> bytes:
+        """Packed batch header; authenticated with every record."""
+        return self._STRUCT.pack(self.MAGIC, self.VERSION, self.salt, self.kdf.pack())
+    
+    def pack(self) -> bytes:
+        """Serialize the batch."""
+        count = len(self)
+        return b"".join((self.header(), self._COUNT.pack(count),
+                         struct.pack(f">{count + 1}Q", *self.offsets), self.buffer))
+    
+    @classmethod
+    def unpack(cls, data: BufferLike) -> "RecordBatch":
+        """
+        Parse a serialized batch.
+        
+        Raises:
+            DecryptionError: If the data is not a valid record batch
+        """
+        data = memoryview(data).cast('B')
+        prefix_size = cls._STRUCT.size + cls._COUNT.size
+        if data.nbytes < prefix_size or bytes(data[:4]) != cls.MAGIC:
+            raise DecryptionError("Not an encrypted record batch")
+        _, version, salt, kdf = cls._STRUCT.unpack(data[:cls._STRUCT.size])
+        if version != cls.VERSION:
+            raise DecryptionError(f"Unsupported record batch version: {version}")
+        (count,) = cls._COUNT.unpack(data[cls._STRUCT.size:prefix_size])
+        body = prefix_size + (count + 1) * 8
+        if count > cls.MAX_RECORDS or data.nbytes < body:
+            raise DecryptionError("Encrypted record batch is truncated")
+        offsets = array('Q', struct.unpack_from(f">{count + 1}Q", data, prefix_size))
+        if (offsets[0] != 0 or offsets[-1] != data.nbytes - body
+                or any(b - a < cls.OVERHEAD for a, b in zip(offsets, offsets[1:]))):
+            raise DecryptionError("Invalid record offsets in encrypted record batch")
+        return cls(bytes(salt), KDFParams.unpack(kdf), offsets, bytearray(data[body:]))
+
+
+class AESGCMEncryptor:
+    """
+    AES-256-GCM encryptor with configurable password key derivation.
+    
+    New containers record the key derivation parameters in their header.
+    The single-shot [salt][nonce][ciphertext][auth_tag] layout has no room
+    for them and always means LEGACY_KDF, so with any other ``kdf`` or with
+    compression the single-shot methods produce a segmented container instead.
+    """
+    
+    # Constants
+    SALT_SIZE = 16
+    NONCE_SIZE = 12
+    AUTH_TAG_SIZE = 16
+    PBKDF2_ITERATIONS = LEGACY_KDF.params[0]
+    SEGMENT_SIZE = 64 * 1024
+    CHECKPOINT_INTERVAL = 64 * 1024 * 1024
+    KEY_CHECK_INFO = b"GHHS-EC&DC key check"
+    SEGMENT_DIGEST_INFO = b"GHHS-EC&DC segment digest"
+    
+    def __init__(self, key_cache: Optional[DerivedKeyCache] = None,
+                 kdf: Optional[KDFParams] = None,
+                 compression: Optional[str] = None):
+        """
+        Args:
+            key_cache: Optional cache of derived keys shared between calls
+            kdf: Key derivation for new data; LEGACY_KDF when omitted
+            compression: Codec compressing new data (see Compression.available());
+                skipped when a sample of the data does not compress
+        """
+        self.key_cache = key_cache
+        self.kdf = kdf or LEGACY_KDF
+        self.compression = compression
+        self._codec = Compression.codec_id(compression) if compression else Compression.NONE
+    
+    def _generate_salt(self) -> bytes:
+        """Generate cryptographically secure random salt."""
+        return os.urandom(self.SALT_SIZE)
+    
+    def _generate_nonce(self) -> bytes:
+        """Generate cryptographically secure random nonce."""
+        return os.urandom(self.NONCE_SIZE)
+    
+    def _derive_key(self, password: str, salt: bytes, kdf: Optional[KDFParams] = None) -> bytes:
+        """
+        Derive AES-256 key from password, consulting the key cache when configured.
+        
+        ``kdf`` defaults to LEGACY_KDF, the derivation of data without a descriptor.
+        """
+        kdf = kdf or LEGACY_KDF
+        if self.key_cache is not None:
+            # Parameters are part of the cache key: same salt, other cost, other key
+            return self.key_cache.get_or_derive(
+                password, bytes(salt) + kdf.pack(), lambda: kdf.derive(password, salt))
+        return kdf.derive(password, salt)
+    
+    def _new_header(self, segment_size: int, salt: Optional[bytes] = None,
+                    codec: int = Compression.NONE) -> StreamHeader:
+        """Header for a new container with a fresh nonce prefix and, unless given, a fresh salt."""
+        return StreamHeader(segment_size, salt or self._generate_salt(),
+                            os.urandom(StreamHeader.NONCE_PREFIX_SIZE),
+                            codec | StreamHeader.FLAG_KEY_CHECK, self.kdf)
+    
+    def _stream_key(self, password: str, header: StreamHeader) -> bytes:
+        """
+        Derive the key of a container.
+        
+        A new header gets its key check value filled in; an existing one is
+        checked against it, so a wrong password fails before any segment is read.
+        
+        Raises:
+            InvalidPasswordError: If the key check value does not match
+        """
+        key = self._derive_key(password, header.salt, header.kdf)
+        if header.has_key_check:
+            check = HKDFExpand(algorithm=hashes.SHA256(), length=StreamHeader.KEY_CHECK_SIZE,
+                               info=self.KEY_CHECK_INFO).derive(bytes(key))
+            if header.key_check is None:
+                header.key_check = check
+            elif not hmac.compare_digest(check, header.key_check):
+                self._secure_wipe(key)
+                raise InvalidPasswordError("Wrong password")
+        return key
+    
+    def _check_salt(self, salt: Optional[bytes]) -> None:
+        if salt is not None and len(salt) != self.SALT_SIZE:
+            raise ValueError(f"Salt must be {self.SALT_SIZE} bytes")
+    
+    def aes_encrypt(self, plaintext: bytes, password: str, salt: Optional[bytes] = None) -> bytes:
+        """
+        Encrypt plaintext using AES-256-GCM.
+        
+        Args:
+            plaintext: Data to encrypt
+            password: Password for key derivation
+            salt: Salt to reuse instead of a fresh random one. With a key cache
+                this skips key derivation; nonces stay random, so one salt must
+                not be used for more than 2^32 messages
+            
+        Returns:
+            bytes: Combined data [salt(16)][nonce(12)][ciphertext][auth_tag(16)],
+            or a segmented container when ``kdf`` is not LEGACY_KDF or
+            compression is enabled
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        self._check_salt(salt)
+        if self._codec:
+            sink = io.BytesIO()
+            self.encrypt_stream(io.BytesIO(plaintext), sink, password, salt=salt)
+            return sink.getvalue()
+        if self.kdf != LEGACY_KDF:
+            return bytes(self.aes_encrypt_into(plaintext, password, salt=salt))
+        
+        salt = salt or self._generate_salt()
+        nonce = self._generate_nonce()
+        
+        key = self._derive_key(password, salt)
+        
+        aesgcm = AESGCM(key)
+        ciphertext_with_tag = aesgcm.encrypt(nonce, plaintext, None)
+        
+        # ciphertext_with_tag is already [ciphertext][auth_tag]; prepend the
+        # header in a single concatenation instead of re-slicing the payload.
+        encrypted_data = salt + nonce + ciphertext_with_tag
+        
+        self._secure_wipe(key)
+        
+        return encrypted_data
+    
+    def aes_decrypt(self, encrypted_data: bytes, password: str) -> bytes:
+        """
+        Decrypt encrypted data using AES-256-GCM.
+        
+        Segmented stream containers held in memory are accepted as well.
+        
+        Args:
+            encrypted_data: Combined data [salt(16)][nonce(12)][ciphertext][auth_tag(16)]
+            password: Password for key derivation
+            
+        Returns:
+            bytes: Decrypted plaintext
+            
+        Raises:
+            DecryptionError: If decryption fails
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        
+        if _is_stream_container(encrypted_data):
+            return bytes(self.aes_decrypt_into(encrypted_data, password))
+        
+        if len(encrypted_data) < 44:  # salt(16) + nonce(12) + auth_tag(16)
+            raise DecryptionError("Encrypted data is too short")
+        
+        key = None
+        try:
+            view = memoryview(encrypted_data)
+            salt = bytes(view[:self.SALT_SIZE])
+            nonce = bytes(view[self.SALT_SIZE:self.SALT_SIZE + self.NONCE_SIZE])
+            ciphertext_with_tag = view[self.SALT_SIZE + self.NONCE_SIZE:]
+            
+            key = self._derive_key(password, salt, LEGACY_KDF)
+            aesgcm = AESGCM(key)
+            plaintext = aesgcm.decrypt(nonce, ciphertext_with_tag, None)
+            
+            self._secure_wipe(key)
+            return plaintext
+            
+        except InvalidTag as e:
+            self._secure_wipe(key)
+            raise DecryptionError("Decryption failed - wrong password or corrupted data") from e
+        except Exception as e:
+            self._secure_wipe(key)
+            raise DecryptionError(f"Decryption failed: {str(e)}") from e
+    
+    def encrypted_size(self, plaintext_size: int) -> int:
+        """
+        Size of the single-shot output for ``plaintext_size`` bytes of input.
+        
+        With compression enabled this is an upper bound.
+        """
+        if self._codec:
+            return self._new_header(self.SEGMENT_SIZE, codec=self._codec).encrypted_size(plaintext_size)
+        if self.kdf != LEGACY_KDF:
+            return self._new_header(self.SEGMENT_SIZE).encrypted_size(plaintext_size)
+        return self.SALT_SIZE + self.NONCE_SIZE + plaintext_size + self.AUTH_TAG_SIZE
+    
+    def aes_encrypt_into(self, plaintext: BufferLike, password: str,
+                         out: Optional[WritableBuffer] = None,
+                         salt: Optional[bytes] = None) -> memoryview:
+        """
+        Encrypt into a caller-provided buffer without intermediate payload copies.
+        
+        Produces the same layout as ``aes_encrypt``. The ciphertext is written
+        straight into ``out`` when the installed ``cryptography`` supports
+        ``encrypt_into``; otherwise it is copied into ``out`` once.
+        
+        Args:
+            plaintext: Data to encrypt (bytes, bytearray, memoryview, mmap...)
+            password: Password for key derivation
+            out: Writable buffer of at least ``encrypted_size(len(plaintext))``
+                bytes; a new bytearray is allocated when omitted
+            salt: Salt to reuse instead of a fresh random one, see ``aes_encrypt``
+            
+        Returns:
+            memoryview: The written region of the output buffer
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        self._check_salt(salt)
+        
+        plaintext = memoryview(plaintext).cast('B')
+        size = self.encrypted_size(plaintext.nbytes)
+        view = memoryview(out if out is not None else bytearray(size)).cast('B')
+        if view.readonly:
+            raise ValueError("Output buffer must be writable")
+        if view.nbytes < size:
+            raise ValueError(f"Output buffer is too small: {view.nbytes} < {size} bytes")
+        
+        if self._codec:
+            # Compressed size is only known afterwards; the container is built once and copied
+            container = self.aes_encrypt(plaintext, password, salt)
+            view[:len(container)] = container
+            return view[:len(container)]
+        
+        if self.kdf != LEGACY_KDF:
+            header = self._new_header(self.SEGMENT_SIZE, salt)
+            key = self._stream_key(password, header)
+            view[:header.size] = header.pack()
+            try:
+                self._seal_segments(AESGCM(key), header, plaintext, view, None, _Progress(plaintext.nbytes))
+            finally:
+                self._secure_wipe(key)
+            return view[:size]
+        
+        salt = salt or self._generate_salt()
+        nonce = self._generate_nonce()
+        header_size = self.SALT_SIZE + self.NONCE_SIZE
+        view[:self.SALT_SIZE] = salt
+        view[self.SALT_SIZE:header_size] = nonce
+        
+        key = self._derive_key(password, salt)
+        try:
+            aesgcm = AESGCM(key)
+            body = view[header_size:size]
+            if _AEAD_INTO_SUPPORTED:
+                aesgcm.encrypt_into(nonce, plaintext, None, body)
+            else:
+                body[:] = aesgcm.encrypt(nonce, plaintext, None)
+        finally:
+            self._secure_wipe(key)
+        return view[:size]
+    
+    def decrypted_size(self, encrypted_data: BufferLike) -> int:
+        """
+        Plaintext size of single-shot data or of a segmented container.
+        
+        For compressed containers this is an upper bound: every segment but
+        the last holds exactly ``segment_size`` bytes, and the size of the last
+        is only known after decryption.
+        
+        Raises:
+            DecryptionError: If the data is too short to be valid
+        """
+        data = memoryview(encrypted_data).cast('B')
+        if _is_stream_container(data):
+            header = StreamHeader.unpack(data)
+            if header.framed:
+                segments = sum(1 for _ in _iter_frames(io.BytesIO(data[header.size:]), header))
+                return segments * header.segment_size
+            return header.layout(data.nbytes)[1]
+        size = data.nbytes - self.SALT_SIZE - self.NONCE_SIZE - self.AUTH_TAG_SIZE
+        if size < 0:
+            raise DecryptionError("Encrypted data is too short")
+        return size
+    
+    def aes_decrypt_into(self, encrypted_data: BufferLike, password: str,
+                         out: Optional[WritableBuffer] = None,
+                         engine: Optional[ParallelSegmentEngine] = None,
+                         progress: Optional[ProgressCallback] = None,
+                         cancel: Optional[threading.Event] = None) -> memoryview:
+        """
+        Decrypt into a caller-provided buffer without slicing the input.
+        
+        Accepts single-shot data and segmented stream containers.
+        
+        Args:
+            encrypted_data: Single-shot data or a complete stream container
+            password: Password for key derivation
+            out: Writable buffer of at least ``decrypted_size(encrypted_data)``
+                bytes; a new bytearray is allocated when omitted
+            engine: Optional parallel engine for segmented containers
+            progress: Optional callback receiving (bytes_done, bytes_total)
+            cancel: Optional event checked between segments
+            
+        Returns:
+            memoryview: The plaintext region of the output buffer
+            
+        Raises:
+            DecryptionError: If decryption fails; ``out`` is zeroed in that case
+            OperationCancelled: If ``cancel`` was set; ``out`` is zeroed in that case
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        
+        data = memoryview(encrypted_data).cast('B')
+        size = self.decrypted_size(data)
+        view = memoryview(out if out is not None else bytearray(size)).cast('B')
+        if view.readonly:
+            raise ValueError("Output buffer must be writable")
+        if view.nbytes < size:
+            raise ValueError(f"Output buffer is too small: {view.nbytes} < {size} bytes")
+        
+        if _is_stream_container(data):
+            header = StreamHeader.unpack(data)
+            if header.framed:
+                sink = io.BytesIO()
+                self.decrypt_stream(io.BytesIO(data), sink, password, engine, progress, cancel)
+                plaintext = sink.getbuffer()
+                view[:plaintext.nbytes] = plaintext
+                return view[:plaintext.nbytes]
+        else:
+            header = None
+        
+        tracker = _Progress(size, progress, cancel)
+        if header is not None:
+            key = self._stream_key(password, header)
+        else:
+            key = self._derive_key(password, bytes(data[:self.SALT_SIZE]), LEGACY_KDF)
+        try:
+            tracker.check()
+            aesgcm = AESGCM(key)
+            if header is not None:
+                self._open_segments(aesgcm, header, data, view, engine, tracker)
+            else:
+                header_size = self.SALT_SIZE + self.NONCE_SIZE
+                nonce = bytes(data[self.SALT_SIZE:header_size])
+                if _AEAD_INTO_SUPPORTED:
+                    aesgcm.decrypt_into(nonce, data[header_size:], None, view[:size])
+                else:
+                    view[:size] = aesgcm.decrypt(nonce, data[header_size:], None)
+                tracker.advance(size)
+            return view[:size]
+        except InvalidTag as e:
+            view[:size] = bytes(size)
+            raise DecryptionError("Decryption failed - wrong password or corrupted data") from e
+        except OperationCancelled:
+            view[:size] = bytes(size)
+            raise
+        finally:
+            self._secure_wipe(key)
+    
+    def _seal_segments(self, aesgcm: AESGCM, header: StreamHeader, data: memoryview,
+                       out: memoryview, engine: Optional[ParallelSegmentEngine],
+                       tracker: _Progress) -> None:
+        """Seal every segment of ``data`` into its slot of the preallocated container ``out``."""
+        aad = bytes(out[:header.size])
+        segment_size = header.segment_size
+        count = max(1, -(-data.nbytes // segment_size))
+        
+        def seal(index: int, final: bool) -> int:
+            chunk = data[index * segment_size:(index + 1) * segment_size]
+            start = header.size + index * header.sealed_size
+            target = out[start:start + chunk.nbytes + header.segment_overhead]
+            nonce, segment_aad = header.sealing_params(index, final, aad)
+            if header.random_nonces:
+                target[:len(nonce)] = nonce
+                target = target[len(nonce):]
+            if _AEAD_INTO_SUPPORTED:
+                aesgcm.encrypt_into(nonce, chunk, segment_aad, target)
+            else:
+                target[:] = aesgcm.encrypt(nonce, chunk, segment_aad)
+            return chunk.nbytes
+        
+        for done in _map_segments(seal, ((i, i == count - 1) for i in range(count)), engine):
+            tracker.advance(done)
+    
+    def _open_segments(self, aesgcm: AESGCM, header: StreamHeader, data: memoryview,
+                       out: memoryview, engine: Optional[ParallelSegmentEngine],
+                       tracker: _Progress) -> None:
+        """Authenticate and decrypt every segment of the container ``data`` into ``out``."""
+        aad = bytes(data[:header.size])
+        segment_size = header.segment_size
+        sealed_size = header.sealed_size
+        count, _ = header.layout(data.nbytes)
+        
+        def open_segment(index: int, final: bool) -> int:
+            start = header.size + index * sealed_size
+            sealed = data[start:start + sealed_size]
+            offset = index * segment_size
+            target = out[offset:offset + sealed.nbytes - header.segment_overhead]
+            nonce, ciphertext, segment_aad = header.opening_params(index, sealed, final, aad)
+            if _AEAD_INTO_SUPPORTED:
+                aesgcm.decrypt_into(nonce, ciphertext, segment_aad, target)
+            else:
+                target[:] = aesgcm.decrypt(nonce, ciphertext, segment_aad)
+            return target.nbytes
+        
+        for done in _map_segments(open_segment, ((i, i == count - 1) for i in range(count)), engine):
+            tracker.advance(done)
+    
+    def encrypt_file(self, src_path: str, dst_path: str, password: str,
+                     segment_size: int = SEGMENT_SIZE,
+                     engine: Optional[ParallelSegmentEngine] = None,
+                     progress: Optional[ProgressCallback] = None,
+                     cancel: Optional[threading.Event] = None) -> int:
+        """
+        Encrypt a file into the segmented container through memory maps.
+        
+        The input is mapped read-only and the output file is preallocated and
+        mapped, so segments are sealed from one mapping straight into the
+        other without copying the file into Python objects. On failure or
+        cancellation the partial output file is removed.
+        
+        ``progress`` receives (bytes_done, bytes_total) of plaintext after every
+        segment; ``cancel`` is checked between segments.
+        
+        Returns:
+            int: Size of the written container
+            
+        Raises:
+            OperationCancelled: If ``cancel`` was set
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        if not 0 < segment_size < 2 ** 32:
+            raise ValueError("Segment size must be between 1 and 2^32 - 1 bytes")
+        
+        if self._codec:
+            # Compressed segments vary in size, so the output cannot be preallocated
+            try:
+                with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+                    return self.encrypt_stream(src, dst, password, segment_size, engine, progress, cancel)
+            except BaseException:
+                _remove_quietly(dst_path)
+                raise
+        
+        header = self._new_header(segment_size)
+        with open(src_path, 'rb') as src, _map_file(src) as data:
+            total = header.encrypted_size(data.nbytes)
+            tracker = _Progress(data.nbytes, progress, cancel)
+            key = self._stream_key(password, header)
+            try:
+                tracker.check()
+                with open(dst_path, 'w+b') as dst:
+                    dst.truncate(total)
+                    with _map_file(dst, writable=True) as out:
+                        out[:header.size] = header.pack()
+                        self._seal_segments(AESGCM(key), header, data, out, engine, tracker)
+            except BaseException:
+                _remove_quietly(dst_path)
+                raise
+            finally:
+                self._secure_wipe(key)
+        return total
+    
+    def decrypt_file(self, src_path: str, dst_path: str, password: str,
+                     engine: Optional[ParallelSegmentEngine] = None,
+                     progress: Optional[ProgressCallback] = None,
+                     cancel: Optional[threading.Event] = None) -> int:
+        """
+        Decrypt a segmented container or single-shot file through memory maps.
+        
+        On failure or cancellation the partial output file is removed.
+        
+        Returns:
+            int: Size of the written plaintext
+            
+        Raises:
+            DecryptionError: If decryption fails
+            OperationCancelled: If ``cancel`` was set
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        
+        with open(src_path, 'rb') as src, _map_file(src) as data:
+            if _is_stream_container(data) and StreamHeader.unpack(data).framed:
+                try:
+                    with open(dst_path, 'wb') as dst:
+                        return self.decrypt_stream(src, dst, password, engine, progress, cancel)
+                except BaseException:
+                    _remove_quietly(dst_path)
+                    raise
+            size = self.decrypted_size(data)
+            try:
+                with open(dst_path, 'w+b') as dst:
+                    dst.truncate(size)
+                    with _map_file(dst, writable=True) as out:
+                        self.aes_decrypt_into(data, password, out, engine, progress, cancel)
+            except BaseException:
+                _remove_quietly(dst_path)
+                raise
+        return size
+    
+    def _stream_sealer(self, aesgcm: AESGCM, header: StreamHeader,
+                       aad: bytes) -> Callable[[int, bytes, bool], Tuple[bytes, int]]:
+        """Segment sealing function of a container: (index, chunk, final) -> (sealed, plaintext size)."""
+        codec = header.codec
+        
+        def seal(index: int, chunk: bytes, final: bool) -> Tuple[bytes, int]:
+            nonce, segment_aad = header.sealing_params(index, final, aad)
+            payload = Compression.pack_segment(codec, chunk) if codec else chunk
+            sealed = aesgcm.encrypt(nonce, payload, segment_aad)
+            if header.random_nonces:
+                sealed = nonce + sealed
+            if codec:
+                sealed = header.FRAME.pack(len(sealed)) + sealed
+            return sealed, len(chunk)
+        
+        return seal
+    
+    def _stream_opener(self, aesgcm: AESGCM, header: StreamHeader,
+                       aad: bytes) -> Callable[[int, bytes, bool], Tuple[bytes, int]]:
+        """Segment opening function of a container: (index, sealed, final) -> (plaintext, bytes consumed)."""
+        
+        def open_segment(index: int, sealed: bytes, final: bool) -> Tuple[bytes, int]:
+            chunk = aesgcm.decrypt(*header.opening_params(index, sealed, final, aad))
+            if not header.framed:
+                return chunk, len(sealed)
+            chunk = Compression.unpack_segment(header.codec, chunk, header.segment_size, final)
+            return chunk, header.FRAME.size + len(sealed)
+        
+        return open_segment
+    
+    def encrypt_stream(self, src: BinaryIO, dst: BinaryIO, password: str,
+                       segment_size: int = SEGMENT_SIZE,
+                       engine: Optional[ParallelSegmentEngine] = None,
+                       progress: Optional[ProgressCallback] = None,
+                       cancel: Optional[threading.Event] = None,
+                       salt: Optional[bytes] = None) -> int:
+        """
+        Encrypt a binary stream into the segmented container in constant memory.
+        
+        With compression enabled the first segment is used as a sample: data
+        that does not compress is written as a plain container, and segments
+        that do not shrink are stored raw.
+        
+        Args:
+            src: Readable binary stream with the plaintext
+            dst: Writable binary stream for the container
+            password: Password for key derivation
+            segment_size: Plaintext bytes per authenticated segment
+            engine: Optional parallel engine; segments are sealed inline when omitted
+            progress: Optional callback receiving (bytes_done, bytes_total);
+                the total is 0 when ``src`` is not a regular file
+            cancel: Optional event checked between segments
+            salt: Salt to reuse instead of a fresh random one, see ``aes_encrypt``
+            
+        Returns:
+            int: Number of bytes written to ``dst``
+            
+        Raises:
+            OperationCancelled: If ``cancel`` was set
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        if not 0 < segment_size < 2 ** 32:
+            raise ValueError("Segment size must be between 1 and 2^32 - 1 bytes")
+        self._check_salt(salt)
+        
+        segments = _iter_segments(src, segment_size)
+        codec = Compression.NONE
+        if self._codec:
+            first = next(segments)
+            segments = itertools.chain([first], segments)
+            if Compression.worth_it(self._codec, first[1]):
+                codec = self._codec
+        header = self._new_header(segment_size, salt, codec)
+        tracker = _Progress(_stream_size(src), progress, cancel)
+        key = self._stream_key(password, header)
+        aad = header.pack()
+        try:
+            tracker.check()
+            seal = self._stream_sealer(AESGCM(key), header, aad)
+            dst.write(aad)
+            written = len(aad)
+            for sealed, size in _map_segments(seal, segments, engine):
+                dst.write(sealed)
+                written += len(sealed)
+                tracker.advance(size)
+        finally:
+            self._secure_wipe(key)
+        return written
+    
+    def decrypt_stream(self, src: BinaryIO, dst: BinaryIO, password: str,
+                       engine: Optional[ParallelSegmentEngine] = None,
+                       progress: Optional[ProgressCallback] = None,
+                       cancel: Optional[threading.Event] = None) -> int:
+        """
+        Decrypt a segmented container from ``src`` into ``dst`` in constant memory.
+        
+        Data in the single-shot [salt][nonce][ciphertext][auth_tag] format is
+        also accepted; it is a single GCM message and is decrypted in memory.
+        Segments are written as soon as they are authenticated, so on failure
+        ``dst`` may already hold a verified prefix of the plaintext.
+        
+        Args:
+            src: Readable binary stream with the encrypted data
+            dst: Writable binary stream for the plaintext
+            password: Password for key derivation
+            engine: Optional parallel engine; segments are opened inline when omitted
+            progress: Optional callback receiving (bytes_done, bytes_total) of
+                ciphertext; the total is 0 when ``src`` is not a regular file
+            cancel: Optional event checked between segments
+            
+        Returns:
+            int: Number of plaintext bytes written to ``dst``
+            
+        Raises:
+            DecryptionError: If decryption fails
+            OperationCancelled: If ``cancel`` was set
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        
+        tracker = _Progress(_stream_size(src), progress, cancel)
+        head = _read_exact(src, StreamHeader.PREFIX_SIZE)
+        if not head.startswith(StreamHeader.MAGIC):
+            plaintext = self.aes_decrypt(head + src.read(), password)
+            tracker.check()
+            dst.write(plaintext)
+            tracker.advance(tracker.total)
+            return len(plaintext)
+        
+        head += _read_exact(src, StreamHeader.size_from_prefix(head) - len(head))
+        header = StreamHeader.unpack(head)
+        key = self._stream_key(password, header)
+        try:
+            tracker.check()
+            open_segment = self._stream_opener(AESGCM(key), header, head)
+            written = 0
+            tracker.advance(len(head))
+            for chunk, consumed in _map_segments(open_segment, _iter_sealed(src, header), engine):
+                dst.write(chunk)
+                written += len(chunk)
+                tracker.advance(consumed)
+            return written
+        except InvalidTag as e:
+            raise DecryptionError("Decryption failed - wrong password or corrupted data") from e
+        finally:
+            self._secure_wipe(key)
+    
+    def _run_journaled(self, func: Callable[[int, bytes, bool], Tuple[bytes, int]],
+                       segments: Iterable[tuple], dst: BinaryIO, destination: str,
+                       journal: CheckpointJournal, engine: Optional[ParallelSegmentEngine],
+                       tracker: _Progress, checkpoint_interval: int) -> None:
+        """Write processed segments to the partial output, checkpointing every ``checkpoint_interval`` bytes."""
+        pending = 0
+        try:
+            for output, consumed in _map_segments(func, segments, engine):
+                dst.write(output)
+                journal.segments += 1
+                journal.consumed += consumed
+                journal.written += len(output)
+                pending += len(output)
+                if pending >= checkpoint_interval:
+                    journal.checkpoint(dst, destination)
+                    pending = 0
+                tracker.advance(consumed)
+        except (OperationCancelled, KeyboardInterrupt):
+            # Keep what is done so the next run continues from here
+            journal.checkpoint(dst, destination)
+            raise
+    
+    def encrypt_file_resumable(self, src_path: str, dst_path: str, password: str,
+                               segment_size: int = SEGMENT_SIZE,
+                               engine: Optional[ParallelSegmentEngine] = None,
+                               progress: Optional[ProgressCallback] = None,
+                               cancel: Optional[threading.Event] = None,
+                               checkpoint_interval: int = CHECKPOINT_INTERVAL) -> int:
+        """
+        Encrypt a file into the segmented container so that an interrupted run can resume.
+        
+        The container is written to ``dst_path + '.part'`` and progress is
+        recorded in a CheckpointJournal every ``checkpoint_interval`` bytes
+        and on cancellation. Calling the method again after a crash, reboot
+        or cancellation continues after the last checkpoint with the same
+        header, as long as the source size and modification time are
+        unchanged; otherwise it starts over. Every segment is sealed under
+        its own random nonce (StreamHeader bit 4), so segments after the
+        checkpoint that already reached the disk are sealed again under
+        fresh nonces. A source edited without changing its size and
+        modification time therefore never causes nonce reuse, although the
+        result then mixes old and new plaintext. The finished container is
+        renamed to ``dst_path`` atomically.
+        
+        Returns:
+            int: Size of the written container
+            
+        Raises:
+            InvalidPasswordError: If a resumed run gets a different password
+            OperationCancelled: If ``cancel`` was set; the journal is kept
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        if not 0 < segment_size < 2 ** 32:
+            raise ValueError("Segment size must be between 1 and 2^32 - 1 bytes")
+        if checkpoint_interval < 1:
+            raise ValueError("Checkpoint interval must be positive")
+        
+        partial, _ = CheckpointJournal.paths(dst_path)
+        with open(src_path, 'rb') as src:
+            source = os.fstat(src.fileno())
+            journal = CheckpointJournal.load(dst_path)
+            header = None
+            if journal is not None and journal.matches(CheckpointJournal.ENCRYPT, source):
+                header = StreamHeader.unpack(journal.header)
+            # A container with nonces derived from the segment index cannot
+            # be continued: its next segments may already have been sealed
+            if header is None or not header.random_nonces:
+                journal = None
+                codec = Compression.NONE
+                if self._codec and Compression.worth_it(self._codec, _read_exact(src, segment_size)):
+                    codec = self._codec
+                header = self._new_header(segment_size, codec=codec)
+                header.flags |= StreamHeader.FLAG_RANDOM_NONCES
+            
+            key = self._stream_key(password, header)
+            try:
+                aad = header.pack()
+                if journal is None:
+                    journal = CheckpointJournal(CheckpointJournal.ENCRYPT, source, aad, written=len(aad))
+                    dst = open(partial, 'w+b')
+                    dst.write(aad)
+                    journal.checkpoint(dst, dst_path)
+                else:
+                    dst = open(partial, 'r+b')
+                try:
+                    dst.truncate(journal.written)
+                    dst.seek(journal.written)
+                    src.seek(journal.consumed)
+                    tracker = _Progress(source.st_size, progress, cancel)
+                    tracker.advance(journal.consumed)
+                    if not journal.finished(source):
+                        start = journal.segments
+                        segments = ((start + index, chunk, final)
+                                    for index, chunk, final in _iter_segments(src, header.segment_size))
+                        self._run_journaled(self._stream_sealer(AESGCM(key), header, aad), segments,
+                                            dst, dst_path, journal, engine, tracker, checkpoint_interval)
+                    CheckpointJournal.complete(dst, dst_path)
+                finally:
+                    dst.close()
+            finally:
+                self._secure_wipe(key)
+        return journal.written
+    
+    def decrypt_file_resumable(self, src_path: str, dst_path: str, password: str,
+                               engine: Optional[ParallelSegmentEngine] = None,
+                               progress: Optional[ProgressCallback] = None,
+                               cancel: Optional[threading.Event] = None,
+                               checkpoint_interval: int = CHECKPOINT_INTERVAL) -> int:
+        """
+        Decrypt a segmented container so that an interrupted run can resume.
+        
+        Works like ``encrypt_file_resumable``: authenticated plaintext goes to
+        ``dst_path + '.part'``, a CheckpointJournal records how far it got,
+        and the finished file is renamed to ``dst_path``. A run resumes only
+        if the container header, size and modification time are unchanged.
+        If a segment fails authentication the partial output and journal are
+        removed. Single-shot files are one GCM message and have nothing to
+        resume; they are decrypted in memory.
+        
+        Returns:
+            int: Size of the written plaintext
+            
+        Raises:
+            DecryptionError: If decryption fails
+            OperationCancelled: If ``cancel`` was set; the journal is kept
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        if checkpoint_interval < 1:
+            raise ValueError("Checkpoint interval must be positive")
+        
+        partial, _ = CheckpointJournal.paths(dst_path)
+        with open(src_path, 'rb') as src:
+            source = os.fstat(src.fileno())
+            head = _read_exact(src, StreamHeader.PREFIX_SIZE)
+            if not head.startswith(StreamHeader.MAGIC):
+                plaintext = self.aes_decrypt(head + src.read(), password)
+                with open(partial, 'wb') as dst:
+                    dst.write(plaintext)
+                    CheckpointJournal.complete(dst, dst_path)
+                return len(plaintext)
+            
+            head += _read_exact(src, StreamHeader.size_from_prefix(head) - len(head))
+            header = StreamHeader.unpack(head)
+            journal = CheckpointJournal.load(dst_path)
+            resume = journal is not None and journal.matches(CheckpointJournal.DECRYPT, source, head)
+            key = self._stream_key(password, header)
+            try:
+                if resume:
+                    dst = open(partial, 'r+b')
+                else:
+                    journal = CheckpointJournal(CheckpointJournal.DECRYPT, source, head, consumed=len(head))
+                    dst = open(partial, 'w+b')
+                    journal.checkpoint(dst, dst_path)
+                try:
+                    dst.truncate(journal.written)
+                    dst.seek(journal.written)
+                    src.seek(journal.consumed)
+                    tracker = _Progress(source.st_size, progress, cancel)
+                    tracker.advance(journal.consumed)
+                    if not journal.finished(source):
+                        self._run_journaled(self._stream_opener(AESGCM(key), header, head),
+                                            _iter_sealed(src, header, journal.segments),
+                                            dst, dst_path, journal, engine, tracker, checkpoint_interval)
+                    CheckpointJournal.complete(dst, dst_path)
+                except (DecryptionError, InvalidTag) as e:
+                    dst.close()
+                    CheckpointJournal.discard(dst_path)
+                    if isinstance(e, DecryptionError):
+                        raise
+                    raise DecryptionError("Decryption failed - wrong password or corrupted data") from e
+                finally:
+                    dst.close()
+            finally:
+                self._secure_wipe(key)
+        return journal.written
+    
+    def update_file(self, src_path: str, dst_path: str, password: str,
+                    segment_size: int = SEGMENT_SIZE,
+                    engine: Optional[ParallelSegmentEngine] = None,
+                    progress: Optional[ProgressCallback] = None,
+                    cancel: Optional[threading.Event] = None) -> Tuple[int, int]:
+        """
+        Bring the encrypted copy of a file up to date, rewriting only the segments that changed.
+        
+        The container has random per-segment nonces (see StreamHeader), and
+        a SegmentManifest next to it holds a keyed digest of every plaintext
+        segment. Each call hashes the source segment by segment and seals
+        again, with fresh nonces and in place, only the segments whose digest
+        changed, plus the old and new last segment when the length changed.
+        Unchanged segments are neither encrypted nor written, so AES work and
+        writes scale with the amount of change; the source is still read
+        once to hash it.
+        
+        Without a manifest that matches ``dst_path`` (first run, or the
+        container was replaced) the file is encrypted into a new updatable
+        container, written next to ``dst_path`` and renamed into place;
+        ``segment_size`` only applies then. Compression is not used, since
+        compressed segments could not be rewritten in place.
+        
+        Before any segment is overwritten the manifest is saved with those
+        segments cleared, so an interrupted or cancelled update is completed
+        by the next call; until then the segments being rewritten may fail
+        authentication.
+        
+        ``progress`` receives (bytes_done, bytes_total) of plaintext hashed.
+        
+        Returns:
+            Tuple[int, int]: (segments rewritten, segments in the container)
+            
+        Raises:
+            InvalidPasswordError: If the existing container has another password
+            OperationCancelled: If ``cancel`` was set
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        if not 0 < segment_size < 2 ** 32:
+            raise ValueError("Segment size must be between 1 and 2^32 - 1 bytes")
+        
+        manifest = SegmentManifest.load(dst_path)
+        if manifest is not None:
+            header = StreamHeader.unpack(manifest.header)
+        else:
+            header = self._new_header(segment_size)
+            header.flags |= StreamHeader.FLAG_RANDOM_NONCES
+        segment_size = header.segment_size
+        
+        with open(src_path, 'rb') as src, _map_file(src) as data:
+            count = max(1, -(-data.nbytes // segment_size))
+            tracker = _Progress(data.nbytes, progress, cancel)
+            key = self._stream_key(password, header)
+            try:
+                tracker.check()
+                digest_key = HKDFExpand(algorithm=hashes.SHA256(), length=32,
+                                        info=self.SEGMENT_DIGEST_INFO).derive(bytes(key))
+                
+                def digest(index: int) -> Tuple[bytes, int]:
+                    chunk = data[index * segment_size:(index + 1) * segment_size]
+                    h = hashlib.blake2b(StreamHeader.SEGMENT_AAD.pack(index, 0),
+                                        digest_size=SegmentManifest.DIGEST_SIZE, key=digest_key)
+                    h.update(chunk)
+                    return h.digest(), chunk.nbytes
+                
+                aad = header.pack()
+                updated = SegmentManifest(aad, data.nbytes, bytearray())
+                for value, size in _map_segments(digest, ((i,) for i in range(count)), engine):
+                    updated.digests += value
+                    tracker.advance(size)
+                
+                if manifest is None:
+                    self._write_updatable(AESGCM(key), header, data, dst_path, engine, cancel)
+                    updated.save(dst_path)
+                    return count, count
+                
+                dirty = {i for i in range(count)
+                         if i >= manifest.segments or updated.digest(i) != manifest.digest(i)}
+                if count != manifest.segments:
+                    # The final flag is authenticated, so both last segments change
+                    dirty.update(i for i in (manifest.segments - 1, count - 1) if i < count)
+                dirty = sorted(dirty)
+                if dirty:
+                    pending = SegmentManifest(aad, data.nbytes, bytearray(updated.digests))
+                    for index in dirty:
+                        pending.clear(index)
+                    pending.save(dst_path)
+                    seal = self._stream_sealer(AESGCM(key), header, aad)
+                    
+                    def segments() -> Iterator[Tuple[int, memoryview, bool]]:
+                        for index in dirty:
+                            tracker.check()
+                            chunk = data[index * segment_size:(index + 1) * segment_size]
+                            yield index, chunk, index == count - 1
+                    
+                    with open(dst_path, 'r+b') as dst:
+                        dst.truncate(header.encrypted_size(data.nbytes))
+                        for index, (sealed, _) in zip(dirty, _map_segments(seal, segments(), engine)):
+                            dst.seek(header.size + index * header.sealed_size)
+                            dst.write(sealed)
+                        dst.flush()
+                        os.fsync(dst.fileno())
+                    updated.save(dst_path)
+                return len(dirty), count
+            finally:
+                self._secure_wipe(key)
+    
+    def _write_updatable(self, aesgcm: AESGCM, header: StreamHeader, data: memoryview,
+                         dst_path: str, engine: Optional[ParallelSegmentEngine],
+                         cancel: Optional[threading.Event]) -> None:
+        """Seal all of ``data`` into a new container and atomically replace ``dst_path`` with it."""
+        tmp_path = dst_path + '.tmp'
+        try:
+            with open(tmp_path, 'w+b') as dst:
+                dst.truncate(header.encrypted_size(data.nbytes))
+                with _map_file(dst, writable=True) as out:
+                    out[:header.size] = header.pack()
+                    self._seal_segments(aesgcm, header, data, out, engine, _Progress(data.nbytes, None, cancel))
+                os.fsync(dst.fileno())
+            os.replace(tmp_path, dst_path)
+            _sync_directory(dst_path)
+        except BaseException:
+            _remove_quietly(tmp_path)
+            raise
+    
+    def verify_file(self, path: str, password: str,
+                    engine: Optional[ParallelSegmentEngine] = None,
+                    progress: Optional[ProgressCallback] = None,
+                    cancel: Optional[threading.Event] = None) -> int:
+        """
+        Authenticate every segment of an encrypted file without keeping plaintext.
+        
+        Segments are read, authenticated and discarded one at a time, so
+        memory use does not depend on the file size. Single-shot files are one
+        GCM message and are checked in memory. Encrypted archives are checked
+        entry by entry after their index, see ``EncryptedArchive.verify``.
+        
+        Returns:
+            int: Plaintext size of the verified file
+            
+        Raises:
+            DecryptionError: If any segment fails authentication or the file is truncated
+            OperationCancelled: If ``cancel`` was set
+        """
+        with open(path, 'rb') as src:
+            if _read_exact(src, len(EncryptedArchive.MAGIC)) == EncryptedArchive.MAGIC:
+                with EncryptedArchive(src, password, self.key_cache) as archive:
+                    return archive.verify(progress, cancel)
+            src.seek(0)
+            return self.decrypt_stream(src, _Discard(), password, engine, progress, cancel)
+    
+    def open_seekable(self, source: Union[str, BinaryIO], password: str) -> "SeekableDecryptor":
+        """Open a segmented container for random-access reads, see SeekableDecryptor."""
+        return SeekableDecryptor(source, password, key_cache=self.key_cache)
+    
+    def pack_archive(self, sources: Iterable[Tuple[str, str]], dst_path: str, password: str,
+                     segment_size: int = SEGMENT_SIZE,
+                     engine: Optional[ParallelSegmentEngine] = None,
+                     progress: Optional[ProgressCallback] = None,
+                     cancel: Optional[threading.Event] = None) -> int:
+        """
+        Pack many files into one EncryptedArchive.
+        
+        The key is derived once for the whole archive and files are streamed
+        in segments into a single output file, so thousands of small files
+        cost one key derivation instead of one each. With an ``engine`` the
+        segments of all files are sealed in parallel and written in order.
+        With compression every segment is compressed if it shrinks.
+        On failure or cancellation the partial archive is removed.
+        
+        Args:
+            sources: (entry name, file path) pairs, see ``archive_sources``
+            dst_path: Path of the archive to write
+            password: Password for key derivation
+            segment_size: Plaintext bytes per authenticated segment
+            engine: Optional parallel engine; segments are sealed inline when omitted
+            progress: Optional callback receiving (bytes_done, bytes_total)
+            cancel: Optional event checked between segments
+            
+        Returns:
+            int: Size of the written archive
+            
+        Raises:
+            ValueError: If entry names are duplicated or unsafe
+            OperationCancelled: If ``cancel`` was set
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        if not 0 < segment_size < 2 ** 32:
+            raise ValueError("Segment size must be between 1 and 2^32 - 1 bytes")
+        sources = list(sources)
+        seen = set()
+        for name, _ in sources:
+            EncryptedArchive._target_path('', name)
+            if name in seen:
+                raise ValueError(f"Duplicate entry name: {name!r}")
+            if len(name.encode('utf-8')) > ArchiveEntry.MAX_NAME_SIZE:
+                raise ValueError(f"Entry name is too long: {name[:64]!r}...")
+            seen.add(name)
+        
+        header = self._new_header(segment_size, codec=self._codec)
+        tracker = _Progress(sum(os.path.getsize(path) for _, path in sources), progress, cancel)
+        key = self._stream_key(password, header)
+        head = EncryptedArchive._PREFIX.pack(EncryptedArchive.MAGIC, EncryptedArchive.VERSION) + header.pack()
+        entries = []
+        
+        def segments() -> Iterator[Tuple[int, int, bytes, bool]]:
+            index = 0
+            for name, path in sources:
+                with open(path, 'rb') as src:
+                    entries.append(ArchiveEntry(name, 0, os.fstat(src.fileno()).st_mtime_ns, first_segment=index))
+                    for _, chunk, final in _iter_segments(src, segment_size):
+                        if index >= EncryptedArchive.INDEX_SEGMENT:
+                            raise ValueError("Too many segments for one archive; use a larger segment size")
+                        yield len(entries) - 1, index, chunk, final
+                        index += 1
+        
+        try:
+            tracker.check()
+            aesgcm = AESGCM(key)
+            seal = self._stream_sealer(aesgcm, header, head)
+            
+            def seal_entry(number: int, index: int, chunk: bytes, final: bool) -> Tuple[int, bytes, int]:
+                return (number,) + seal(index, chunk, final)
+            
+            with open(dst_path, 'wb') as dst:
+                dst.write(head)
+                position = len(head)
+                for number, sealed, size in _map_segments(seal_entry, segments(), engine):
+                    entry = entries[number]
+                    if not entry.segments:
+                        entry.offset = position
+                    entry.segments += 1
+                    entry.size += size
+                    entry.stored_size += len(sealed)
+                    dst.write(sealed)
+                    position += len(sealed)
+                    tracker.advance(size)
+                
+                index = b"".join([EncryptedArchive._COUNT.pack(len(entries))] + [e.pack() for e in entries])
+                trailer = EncryptedArchive._TRAILER.pack(position, len(index) + header.TAG_SIZE,
+                                                         EncryptedArchive.END_MAGIC)
+                dst.write(aesgcm.encrypt(header.segment_nonce(EncryptedArchive.INDEX_SEGMENT, True),
+                                         index, head + trailer))
+                dst.write(trailer)
+                return dst.tell()
+        except BaseException:
+            _remove_quietly(dst_path)
+            raise
+        finally:
+            self._secure_wipe(key)
+    
+    def open_archive(self, source: Union[str, BinaryIO], password: str) -> "EncryptedArchive":
+        """Open an archive for listing and extraction, see EncryptedArchive."""
+        return EncryptedArchive(source, password, key_cache=self.key_cache)
+    
+    def encrypt_many(self, records: Iterable[BufferLike], password: str) -> RecordBatch:
+        """
+        Encrypt many small records with one key derivation.
+        
+        One key is derived for the batch, all nonces come from a single
+        ``os.urandom`` call, one AESGCM object seals every record, and the
+        output is written into one preallocated buffer.
+        
+        Args:
+            records: Byte records (bytes, bytearray, memoryview...)
+            password: Password for key derivation
+            
+        Returns:
+            RecordBatch: Sealed records; ``pack()`` serializes them
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        records = [memoryview(r).cast('B') for r in records]
+        count = len(records)
+        if count > RecordBatch.MAX_RECORDS:
+            raise ValueError(f"A batch holds at most {RecordBatch.MAX_RECORDS} records")
+        
+        nonce_size = RecordBatch.NONCE_SIZE
+        offsets = array('Q', itertools.accumulate(
+            (r.nbytes + RecordBatch.OVERHEAD for r in records), initial=0))
+        batch = RecordBatch(self._generate_salt(), self.kdf, offsets, bytearray(offsets[-1]))
+        out = memoryview(batch.buffer)
+        nonces = memoryview(os.urandom(nonce_size * count))
+        aad = bytearray(batch.header() + bytes(8))
+        index_at = len(aad) - 8
+        
+        key = self._derive_key(password, batch.salt, batch.kdf)
+        try:
+            aesgcm = AESGCM(key)
+        finally:
+            self._secure_wipe(key)
+        for i, record in enumerate(records):
+            start = offsets[i]
+            nonce = nonces[i * nonce_size:(i + 1) * nonce_size]
+            out[start:start + nonce_size] = nonce
+            struct.pack_into(">Q", aad, index_at, i)
+            target = out[start + nonce_size:offsets[i + 1]]
+            if _AEAD_INTO_SUPPORTED:
+                aesgcm.encrypt_into(nonce, record, aad, target)
+            else:
+                target[:] = aesgcm.encrypt(nonce, record, aad)
+        return batch
+    
+    def decrypt_many(self, batch: Union[RecordBatch, BufferLike], password: str) -> PackedRecords:
+        """
+        Decrypt every record of a batch from ``encrypt_many``.
+        
+        Args:
+            batch: A RecordBatch or its serialized form
+            password: Password for key derivation
+            
+        Returns:
+            PackedRecords: Plaintext records in one contiguous buffer
+            
+        Raises:
+            DecryptionError: If the batch is invalid or any record fails
+                authentication; no plaintext is returned in that case
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        if not isinstance(batch, RecordBatch):
+            batch = RecordBatch.unpack(batch)
+        
+        nonce_size = RecordBatch.NONCE_SIZE
+        overhead = RecordBatch.OVERHEAD
+        sealed_offsets = batch.offsets
+        offsets = array('Q', (offset - i * overhead for i, offset in enumerate(sealed_offsets)))
+        result = PackedRecords(offsets, bytearray(offsets[-1]))
+        sealed = memoryview(batch.buffer)
+        out = memoryview(result.buffer)
+        aad = bytearray(batch.header() + bytes(8))
+        index_at = len(aad) - 8
+        
+        key = self._derive_key(password, batch.salt, batch.kdf)
+        try:
+            aesgcm = AESGCM(key)
+        finally:
+            self._secure_wipe(key)
+        for i in range(len(batch)):
+            start = sealed_offsets[i]
+            nonce = sealed[start:start + nonce_size]
+            struct.pack_into(">Q", aad, index_at, i)
+            target = out[offsets[i]:offsets[i + 1]]
+            try:
+                if _AEAD_INTO_SUPPORTED:
+                    aesgcm.decrypt_into(nonce, sealed[start + nonce_size:sealed_offsets[i + 1]], aad, target)
+                else:
+                    target[:] = aesgcm.decrypt(bytes(nonce), sealed[start + nonce_size:sealed_offsets[i + 1]], aad)
+            except InvalidTag as e:
+                out[:] = bytes(out.nbytes)
+                raise DecryptionError(
+                    f"Decryption of record {i} failed - wrong password or corrupted data") from e
+        return result
+    
+    def _secure_wipe(self, data: bytes) -> None:
+        """Attempt to securely wipe sensitive data from memory."""
+        if isinstance(data, bytearray):
+            for i in range(len(data)):
+                data[i] = 0
+
+
+class EncryptionSession:
     """
-    AES-256-GCM encryptor using PBKDF2 for key derivation.
+    Encrypts many messages under one password with a single key derivation.
+    
+    The session key is derived once for a random session salt. Each message
+    is sealed with its own subkey, HKDF-Expand(session_key, counter), so no
+    key is ever used twice and the nonce can stay constant. Messages from
+    other sessions are decrypted too; their session keys are cached by salt.
+    
+    Message layout (version 2):
+    [version(1)][session_salt(16)][kdf(13)][counter(8)][ciphertext][auth_tag(16)]
+    
+    Version 1 messages have no kdf field and imply LEGACY_KDF.
     """
     
-    # Constants
-    SALT_SIZE = 16
-    NONCE_SIZE = 12
-    AUTH_TAG_SIZE = 16
-    PBKDF2_ITERATIONS = 100000
+    VERSION = 2
+    NONCE = bytes(AESGCMEncryptor.NONCE_SIZE)
+    MAX_MESSAGES = 2 ** 64
+    _HEADER_V1 = struct.Struct(">B16sQ")
+    _HEADER = struct.Struct(f">B16s{KDFParams.SIZE}sQ")
+    HEADER_SIZE = _HEADER.size
+    _INFO_PREFIX = b"GHHS-EC&DC session message"
     
-    def _generate_salt(self) -> bytes:
-        """Generate cryptographically secure random salt."""
-        return os.urandom(self.SALT_SIZE)
+    def __init__(self, password: str, cached_sessions: int = 16, kdf: Optional[KDFParams] = None):
+        """
+        Args:
+            password: Password for key derivation
+            cached_sessions: Number of session keys kept for decryption
+            kdf: Key derivation of the session key; LEGACY_KDF when omitted
+        """
+        if not password:
+            raise ValueError("Password cannot be empty")
+        self._password = password
+        self._keys = DerivedKeyCache(max_entries=cached_sessions, ttl=None)
+        self._encryptor = AESGCMEncryptor(key_cache=self._keys, kdf=kdf)
+        self.kdf = self._encryptor.kdf
+        self.salt = self._encryptor._generate_salt()
+        self._session_key = self._encryptor._derive_key(password, self.salt, self.kdf)
+        self._counter = 0
+        self._lock = threading.Lock()
     
-    def _generate_nonce(self) -> bytes:
-        """Generate cryptographically secure random nonce."""
-        return os.urandom(self.NONCE_SIZE)
+    def __enter__(self) -> "EncryptionSession":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
     
-    def _derive_key(self, password: str, salt: bytes) -> bytes:
-        """Derive AES-256 key from password using PBKDF2-HMAC-SHA256."""
-        kdf = PBKDF2HMAC(
+    def _message_key(self, session_key: bytes, counter: int) -> bytes:
+        hkdf = HKDFExpand(
             algorithm=hashes.SHA256(),
             length=32,
-            salt=salt,
-            iterations=self.PBKDF2_ITERATIONS,
+            info=self._INFO_PREFIX + struct.pack(">Q", counter),
         )
-        return kdf.derive(password.encode('utf-8'))
+        return hkdf.derive(session_key)
     
-    def aes_encrypt(self, plaintext: bytes, password: str) -> bytes:
+    def encrypt(self, plaintext: bytes, associated_data: Optional[bytes] = None) -> bytes:
         """
-        Encrypt plaintext using AES-256-GCM.
+        Encrypt one message with the next per-message subkey.
         
         Args:
             plaintext: Data to encrypt
-            password: Password for key derivation
+            associated_data: Optional data authenticated but not encrypted
             
         Returns:
-            bytes: Combined data [salt(16)][nonce(12)][ciphertext][auth_tag(16)]
+            bytes: [version(1)][session_salt(16)][kdf(13)][counter(8)][ciphertext][auth_tag(16)]
+        """
+        if self._session_key is None:
+            raise ValueError("Session is closed")
+        with self._lock:
+            counter = self._counter
+            if counter >= self.MAX_MESSAGES:
+                raise ValueError("Session message limit reached")
+            self._counter += 1
+        
+        header = self._HEADER.pack(self.VERSION, self.salt, self.kdf.pack(), counter)
+        aad = header if associated_data is None else header + associated_data
+        key = self._message_key(self._session_key, counter)
+        return header + AESGCM(key).encrypt(self.NONCE, plaintext, aad)
+    
+    def decrypt(self, message: bytes, associated_data: Optional[bytes] = None) -> bytes:
+        """
+        Decrypt a message produced by any session with the same password.
+        
+        Raises:
+            DecryptionError: If decryption fails
+        """
+        if self._session_key is None:
+            raise ValueError("Session is closed")
+        version = message[0] if message else None
+        if version == 1:
+            layout = self._HEADER_V1
+        elif version == self.VERSION:
+            layout = self._HEADER
+        else:
+            raise DecryptionError(f"Unsupported session message version: {version}")
+        if len(message) < layout.size + AESGCMEncryptor.AUTH_TAG_SIZE:
+            raise DecryptionError("Encrypted message is too short")
+        
+        if version == 1:
+            _, salt, counter = layout.unpack_from(message)
+            kdf = LEGACY_KDF
+        else:
+            _, salt, descriptor, counter = layout.unpack_from(message)
+            kdf = KDFParams.unpack(descriptor)
+        
+        header = message[:layout.size]
+        aad = header if associated_data is None else header + associated_data
+        session_key = self._session_key if (salt, kdf) == (self.salt, self.kdf) else \
+            self._encryptor._derive_key(self._password, salt, kdf)
+        try:
+            key = self._message_key(session_key, counter)
+            return AESGCM(key).decrypt(self.NONCE, message[layout.size:], aad)
+        except InvalidTag as e:
+            raise DecryptionError("Decryption failed - wrong password or corrupted data") from e
+    
+    def close(self) -> None:
+        """Forget the password and zero every cached session key."""
+        self._keys.clear()
+        self._session_key = None
+        self._password = None
+
+
+class SeekableDecryptor(io.RawIOBase):
+    """
+    Read-only, seekable file object over a segmented container.
+    
+    Segments have a fixed size, so the header doubles as the segment index:
+    segment ``i`` starts at ``header.size + i * header.sealed_size``.
+    A read fetches and authenticates only the segments it touches; the last
+    decrypted segment is kept for sequential small reads. The final segment
+    is authenticated on open, so truncated or extended containers are
+    rejected before the first read and ``size`` can be trusted.
+    
+    Compressed containers have variable-size segments; their index is built
+    on open by walking the frame lengths, without decrypting anything else.
+    
+    Single-shot data is one GCM message and cannot be read randomly.
+    """
+    
+    def __init__(self, source: Union[str, BinaryIO], password: str,
+                 key_cache: Optional[DerivedKeyCache] = None):
+        """
+        Args:
+            source: Path of the container, or a seekable binary file object
+                (left open on close)
+            password: Password for key derivation
+            key_cache: Optional cache of derived keys
+            
+        Raises:
+            DecryptionError: If the data is not a valid segmented container
+                or the password is wrong
         """
+        super().__init__()
+        self._owns_source = False
         if not password:
             raise ValueError("Password cannot be empty")
+        self._src = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+        self._owns_source = self._src is not source
+        try:
+            self._src.seek(0)
+            head = _read_exact(self._src, StreamHeader.PREFIX_SIZE)
+            if not head.startswith(StreamHeader.MAGIC):
+                raise DecryptionError("Data is not a segmented container and cannot be read randomly")
+            head += _read_exact(self._src, StreamHeader.size_from_prefix(head) - len(head))
+            header = StreamHeader.unpack(head)
+            if header.framed:
+                self._frames = self._index_frames(header)
+                self._segments = len(self._frames)
+            else:
+                self._segments, self.size = header.layout(self._src.seek(0, os.SEEK_END))
+            encryptor = AESGCMEncryptor(key_cache=key_cache)
+            key = encryptor._stream_key(password, header)
+            try:
+                self._aesgcm = AESGCM(key)
+            finally:
+                encryptor._secure_wipe(key)
+            self._header = header
+            self._aad = head
+            self._position = 0
+            self._cached_index = -1
+            self._cached = b""
+            final = self._segment(self._segments - 1)
+            if header.framed:
+                self.size = (self._segments - 1) * header.segment_size + len(final)
+        except BaseException:
+            self.close()
+            raise
+    
+    def _index_frames(self, header: StreamHeader) -> list:
+        """(offset, length) of every sealed segment of a framed container."""
+        frames = []
+        offset = header.size
+        end = self._src.seek(0, os.SEEK_END)
+        while offset < end:
+            self._src.seek(offset)
+            prefix = _read_exact(self._src, header.FRAME.size)
+            (length,) = header.FRAME.unpack(prefix) if len(prefix) == header.FRAME.size else (0,)
+            offset += header.FRAME.size
+            if not header.TAG_SIZE < length <= header.max_frame or offset + length > end:
+                raise DecryptionError("Encrypted stream is truncated or has an invalid segment length")
+            frames.append((offset, length))
+            offset += length
+        if not frames:
+            raise DecryptionError("Encrypted stream is truncated")
+        return frames
+    
+    def _segment(self, index: int) -> bytes:
+        """Authenticate and decrypt segment ``index``."""
+        if index != self._cached_index:
+            header = self._header
+            final = index == self._segments - 1
+            if header.framed:
+                start, sealed_size = self._frames[index]
+            else:
+                sealed_size = header.sealed_size
+                start = header.size + index * sealed_size
+            self._src.seek(start)
+            sealed = _read_exact(self._src, sealed_size)
+            try:
+                plaintext = self._aesgcm.decrypt(*header.opening_params(index, sealed, final, self._aad))
+            except InvalidTag as e:
+                raise DecryptionError("Decryption failed - wrong password or corrupted data") from e
+            if header.framed:
+                plaintext = Compression.unpack_segment(header.codec, plaintext, header.segment_size, final)
+            self._cached = plaintext
+            self._cached_index = index
+        return self._cached
+    
+    def _check_open(self) -> None:
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+    
+    def readable(self) -> bool:
+        return True
+    
+    def seekable(self) -> bool:
+        return True
+    
+    def tell(self) -> int:
+        self._check_open()
+        return self._position
+    
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Move to a plaintext offset; positions past the end read as EOF."""
+        self._check_open()
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        elif whence != io.SEEK_SET:
+            raise ValueError(f"Invalid whence ({whence})")
+        if offset < 0:
+            raise ValueError(f"Negative seek position {offset}")
+        self._position = offset
+        return offset
+    
+    def readinto(self, buffer: WritableBuffer) -> int:
+        """
+        Decrypt plaintext from the current position into ``buffer``.
         
-        salt = self._generate_salt()
-        nonce = self._generate_nonce()
-        
-        key = self._derive_key(password, salt)
+        Raises:
+            DecryptionError: If a touched segment fails authentication
+        """
+        self._check_open()
+        view = memoryview(buffer).cast('B')
+        segment_size = self._header.segment_size
+        done = 0
+        while done < view.nbytes and self._position < self.size:
+            index, offset = divmod(self._position, segment_size)
+            chunk = self._segment(index)[offset:offset + view.nbytes - done]
+            view[done:done + len(chunk)] = chunk
+            done += len(chunk)
+            self._position += len(chunk)
+        return done
+    
+    def close(self) -> None:
+        """Drop the key and the cached plaintext; close the source if it was opened here."""
+        if not self.closed:
+            self._aesgcm = None
+            self._cached = b""
+            self._cached_index = -1
+            if self._owns_source:
+                self._src.close()
+        super().close()
+
+
+def archive_sources(paths: Iterable[str]) -> Iterator[Tuple[str, str]]:
+    """
+    (entry name, file path) pairs for files and directory trees.
+    
+    A file is stored under its base name, a file below a directory under
+    the directory's base name and its relative path, with "/" as separator.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            root = os.path.abspath(path)
+            base = os.path.basename(root)
+            for dirpath, dirnames, filenames in os.walk(root):
+                dirnames.sort()
+                for filename in sorted(filenames):
+                    source = os.path.join(dirpath, filename)
+                    yield f"{base}/{os.path.relpath(source, root).replace(os.sep, '/')}", source
+        else:
+            yield os.path.basename(path), path
+
+
+class ArchiveEntry:
+    """One file of an EncryptedArchive, as recorded in its encrypted index."""
+    
+    # size, mtime (ns), offset, stored size, first segment, segment count, name length
+    _STRUCT = struct.Struct(">QqQQIIH")
+    MAX_NAME_SIZE = 0xFFFF
+    
+    def __init__(self, name: str, size: int, mtime: int, offset: int = 0, stored_size: int = 0,
+                 first_segment: int = 0, segments: int = 0):
+        self.name = name
+        self.size = size
+        self.mtime = mtime
+        self.offset = offset
+        self.stored_size = stored_size
+        self.first_segment = first_segment
+        self.segments = segments
+    
+    def __repr__(self) -> str:
+        return f"ArchiveEntry({self.name!r}, size={self.size})"
+    
+    def pack(self) -> bytes:
+        """Serialize the index record."""
+        name = self.name.encode('utf-8')
+        return self._STRUCT.pack(self.size, self.mtime, self.offset, self.stored_size,
+                                 self.first_segment, self.segments, len(name)) + name
+
+
+class EncryptedArchive:
+    """
+    Reader of many files packed into one encrypted archive.
+    
+    Layout:
+    [magic(4)][version(1)][stream header][entry segments][sealed index]
+    [index_offset(8)][index_size(8)][end_magic(4)]
+    
+    The embedded stream header (version 3, with key check) holds the salt,
+    key derivation, segment size and codec, so the key is derived once for
+    the whole archive. The segments of all entries are numbered
+    consecutively and sealed like those of a segmented container, with
+    everything up to the end of the stream header as associated data; the
+    last segment of every entry carries the final flag.
+    
+    The index holds name, size, modification time, offset and segment
+    range of every entry. It is sealed under the reserved segment number
+    INDEX_SEGMENT with the trailer as additional associated data, so it is
+    found and authenticated from the end of the file without reading any
+    entry, and an entry is extracted by seeking straight to its segments.
+    """
+    
+    MAGIC = b"GHAR"
+    END_MAGIC = b"GHAE"
+    VERSION = 1
+    INDEX_SEGMENT = StreamHeader.MAX_SEGMENTS - 1
+    _PREFIX = struct.Struct(">4sB")
+    _TRAILER = struct.Struct(">QQ4s")
+    _COUNT = struct.Struct(">I")
+    
+    def __init__(self, source: Union[str, BinaryIO], password: str,
+                 key_cache: Optional[DerivedKeyCache] = None):
+        """
+        Args:
+            source: Path of the archive, or a seekable binary file object
+                (left open on close)
+            password: Password for key derivation
+            key_cache: Optional cache of derived keys
+            
+        Raises:
+            DecryptionError: If the data is not a valid archive or the password is wrong
+        """
+        self._owns_source = False
+        self._open_segment = None
+        if not password:
+            raise ValueError("Password cannot be empty")
+        self._src = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+        self._owns_source = self._src is not source
+        self._lock = threading.Lock()
+        try:
+            head = self._read_at(0, self._PREFIX.size + StreamHeader.PREFIX_SIZE)
+            if len(head) < self._PREFIX.size or head[:4] != self.MAGIC:
+                raise DecryptionError("Not an encrypted archive")
+            version = head[4]
+            if version != self.VERSION:
+                raise DecryptionError(f"Unsupported archive version: {version}")
+            stream_size = StreamHeader.size_from_prefix(head[self._PREFIX.size:])
+            head += self._read_at(len(head), self._PREFIX.size + stream_size - len(head))
+            header = StreamHeader.unpack(head[self._PREFIX.size:])
+            
+            encryptor = AESGCMEncryptor(key_cache=key_cache)
+            key = encryptor._stream_key(password, header)
+            try:
+                aesgcm = AESGCM(key)
+            finally:
+                encryptor._secure_wipe(key)
+            self._header = header
+            self._open_segment = encryptor._stream_opener(aesgcm, header, head)
+            
+            end = self._src.seek(0, os.SEEK_END)
+            trailer = self._read_at(end - self._TRAILER.size, self._TRAILER.size) if end >= len(head) + self._TRAILER.size else b""
+            if len(trailer) < self._TRAILER.size:
+                raise DecryptionError("Encrypted archive is truncated")
+            index_offset, index_size, end_magic = self._TRAILER.unpack(trailer)
+            if (end_magic != self.END_MAGIC or index_offset < len(head)
+                    or index_offset + index_size + self._TRAILER.size != end):
+                raise DecryptionError("Encrypted archive is truncated or its trailer is damaged")
+            try:
+                index = aesgcm.decrypt(header.segment_nonce(self.INDEX_SEGMENT, True),
+                                       self._read_at(index_offset, index_size), head + trailer)
+            except InvalidTag as e:
+                raise DecryptionError("Decryption failed - wrong password or corrupted data") from e
+            self.entries = self._parse_index(index, index_offset)
+            self._by_name = {entry.name: entry for entry in self.entries}
+        except BaseException:
+            self.close()
+            raise
+    
+    @classmethod
+    def _parse_index(cls, data: bytes, limit: int) -> List[ArchiveEntry]:
+        entries = []
+        try:
+            (count,) = cls._COUNT.unpack_from(data)
+            position = cls._COUNT.size
+            for _ in range(count):
+                fields = ArchiveEntry._STRUCT.unpack_from(data, position)
+                position += ArchiveEntry._STRUCT.size
+                name = data[position:position + fields[-1]].decode('utf-8')
+                position += fields[-1]
+                entry = ArchiveEntry(name, *fields[:-1])
+                if entry.offset + entry.stored_size > limit or entry.segments < 1:
+                    raise DecryptionError("Invalid entry in encrypted archive index")
+                entries.append(entry)
+        except (struct.error, UnicodeDecodeError) as e:
+            raise DecryptionError("Invalid encrypted archive index") from e
+        if position != len(data):
+            raise DecryptionError("Invalid encrypted archive index")
+        return entries
+    
+    @staticmethod
+    def _target_path(directory: str, name: str) -> str:
+        """
+        Extraction path of entry ``name`` below ``directory``.
         
-        aesgcm = AESGCM(key)
-        ciphertext_with_tag = aesgcm.encrypt(nonce, plaintext, None)
+        Raises:
+            ValueError: If the name is absolute or leaves the directory
+        """
+        parts = name.split('/')
+        if (not name or '\\' in name or os.path.isabs(name) or os.path.splitdrive(name)[0]
+                or any(part in ('', '.', '..') for part in parts)):
+            raise ValueError(f"Unsafe entry name: {name!r}")
+        return os.path.join(directory, *parts)
+    
+    def __enter__(self) -> "EncryptedArchive":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def __len__(self) -> int:
+        return len(self.entries)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._by_name
+    
+    def names(self) -> List[str]:
+        """Entry names in archive order."""
+        return [entry.name for entry in self.entries]
+    
+    def getentry(self, name: str) -> ArchiveEntry:
+        """
+        Raises:
+            KeyError: If the archive has no entry ``name``
+        """
+        try:
+            return self._by_name[name]
+        except KeyError:
+            raise KeyError(f"No entry named {name!r} in the archive") from None
+    
+    def _read_at(self, offset: int, size: int) -> bytes:
+        # One file object is shared by all extraction threads
+        with self._lock:
+            self._src.seek(offset)
+            return _read_exact(self._src, size)
+    
+    def _sealed_segments(self, entry: ArchiveEntry) -> Iterator[Tuple[int, bytes, bool]]:
+        header = self._header
+        position = entry.offset
+        end = entry.offset + entry.stored_size
+        for number in range(entry.segments):
+            if header.framed:
+                prefix = self._read_at(position, header.FRAME.size)
+                (length,) = header.FRAME.unpack(prefix) if len(prefix) == header.FRAME.size else (0,)
+                if not header.TAG_SIZE < length <= header.max_frame:
+                    raise DecryptionError("Invalid segment length in encrypted archive")
+                position += header.FRAME.size
+            else:
+                length = min(header.sealed_size, end - position)
+            sealed = self._read_at(position, length)
+            position += length
+            yield entry.first_segment + number, sealed, number == entry.segments - 1
+        if position != end:
+            raise DecryptionError("Invalid entry layout in encrypted archive")
+    
+    def iter_chunks(self, name: str) -> Iterator[bytes]:
+        """
+        Yield the plaintext of an entry one authenticated segment at a time.
         
-        ciphertext = ciphertext_with_tag[:-self.AUTH_TAG_SIZE]
-        auth_tag = ciphertext_with_tag[-self.AUTH_TAG_SIZE:]
+        Only the segments of this entry are read.
         
-        encrypted_data = salt + nonce + ciphertext + auth_tag
+        Raises:
+            KeyError: If the archive has no entry ``name``
+            DecryptionError: If a segment fails authentication
+        """
+        if self._open_segment is None:
+            raise ValueError("I/O operation on closed archive")
+        entry = self.getentry(name)
+        open_segment = self._open_segment
+        size = 0
+        try:
+            for index, sealed, final in self._sealed_segments(entry):
+                chunk, _ = open_segment(index, sealed, final)
+                size += len(chunk)
+                yield chunk
+        except InvalidTag as e:
+            raise DecryptionError("Decryption failed - wrong password or corrupted data") from e
+        if size != entry.size:
+            raise DecryptionError("Encrypted archive entry does not match its index")
+    
+    def read(self, name: str) -> bytes:
+        """Decrypt one entry into memory."""
+        return b"".join(self.iter_chunks(name))
+    
+    def extract(self, name: str, dst_path: str,
+                progress: Optional[ProgressCallback] = None,
+                cancel: Optional[threading.Event] = None) -> int:
+        """
+        Decrypt one entry into ``dst_path`` and restore its modification time.
         
-        self._secure_wipe(key)
+        On failure or cancellation the partial output file is removed.
         
-        return encrypted_data
+        Returns:
+            int: Size of the written plaintext
+        """
+        entry = self.getentry(name)
+        tracker = _Progress(entry.size, progress, cancel)
+        try:
+            tracker.check()
+            with open(dst_path, 'wb') as dst:
+                for chunk in self.iter_chunks(name):
+                    dst.write(chunk)
+                    tracker.advance(len(chunk))
+            os.utime(dst_path, ns=(entry.mtime, entry.mtime))
+        except BaseException:
+            _remove_quietly(dst_path)
+            raise
+        return entry.size
     
-    def aes_decrypt(self, encrypted_data: bytes, password: str) -> bytes:
+    def extract_all(self, directory: str, names: Optional[Iterable[str]] = None,
+                    workers: Optional[int] = None, overwrite: bool = False,
+                    progress: Optional[ProgressCallback] = None,
+                    cancel: Optional[threading.Event] = None) -> int:
         """
-        Decrypt encrypted data using AES-256-GCM.
+        Extract entries below ``directory``, several entries at a time.
         
         Args:
-            encrypted_data: Combined data [salt(16)][nonce(12)][ciphertext][auth_tag(16)]
-            password: Password for key derivation
+            directory: Destination; entry names become relative paths below it
+            names: Entries to extract (default: all)
+            workers: Entries extracted at once (default: CPU count)
+            overwrite: Replace existing files instead of failing
+            progress: Optional callback receiving (bytes_done, bytes_total)
+            cancel: Optional event checked between segments
             
         Returns:
-            bytes: Decrypted plaintext
+            int: Total size of the written plaintext
             
         Raises:
-            DecryptionError: If decryption fails
+            FileExistsError: If a target exists and ``overwrite`` is False
+            ValueError: If an entry name would leave ``directory``
         """
-        if not password:
-            raise ValueError("Password cannot be empty")
-        
-        if len(encrypted_data) < 44:  # salt(16) + nonce(12) + auth_tag(16)
-            raise DecryptionError("Encrypted data is too short")
+        entries = self.entries if names is None else [self.getentry(name) for name in names]
+        targets = [(entry, self._target_path(directory, entry.name)) for entry in entries]
+        if not overwrite:
+            for _, target in targets:
+                if os.path.exists(target):
+                    raise FileExistsError(f"{target} already exists")
+        total = sum(entry.size for entry in entries)
+        done = 0
+        lock = threading.Lock()
         
-        try:
-            salt = encrypted_data[:self.SALT_SIZE]
-            nonce = encrypted_data[self.SALT_SIZE:self.SALT_SIZE + self.NONCE_SIZE]
-            ciphertext_with_tag = encrypted_data[self.SALT_SIZE + self.NONCE_SIZE:]
+        def extract_one(entry: ArchiveEntry, target: str) -> int:
+            reported = 0
             
-            key = self._derive_key(password, salt)
-            aesgcm = AESGCM(key)
-            plaintext = aesgcm.decrypt(nonce, ciphertext_with_tag, None)
+            def advance(entry_done: int, _entry_total: int) -> None:
+                nonlocal done, reported
+                with lock:
+                    done += entry_done - reported
+                    current = done
+                reported = entry_done
+                if progress is not None:
+                    progress(current, total)
             
-            self._secure_wipe(key)
-            return plaintext
+            os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+            return self.extract(entry.name, target, advance, cancel)
+        
+        return sum(ParallelSegmentEngine(workers).map(extract_one, targets))
+    
+    def verify(self, progress: Optional[ProgressCallback] = None,
+               cancel: Optional[threading.Event] = None) -> int:
+        """
+        Authenticate every segment of every entry without keeping plaintext.
+        
+        The index was already authenticated on open.
+        
+        Returns:
+            int: Total plaintext size of the entries
             
-        except InvalidTag as e:
-            self._secure_wipe(key)
-            raise DecryptionError("Decryption failed - wrong password or corrupted data") from e
-        except Exception as e:
-            self._secure_wipe(key)
-            raise DecryptionError(f"Decryption failed: {str(e)}") from e
+        Raises:
+            DecryptionError: If a segment fails authentication or an entry
+                does not match the index
+            OperationCancelled: If ``cancel`` was set
+        """
+        tracker = _Progress(sum(entry.size for entry in self.entries), progress, cancel)
+        tracker.check()
+        for entry in self.entries:
+            for chunk in self.iter_chunks(entry.name):
+                tracker.advance(len(chunk))
+        return tracker.done
     
-    def _secure_wipe(self, data: bytes) -> None:
-        """Attempt to securely wipe sensitive data from memory."""
-        if isinstance(data, bytearray):
-            for i in range(len(data)):
-                data[i] = 0
+    def close(self) -> None:
+        """Drop the key; close the source if it was opened here."""
+        self._open_segment = None
+        if self._owns_source:
+            self._src.close()
+            self._owns_source = False
+
+
+class VerifyReport:
+    """Outcome of ``verify_files``."""
+    
+    def __init__(self):
+        self.good: List[str] = []
+        self.bad: List[Tuple[str, str]] = []  # (path, error)
+        self.bytes = 0
+        self.elapsed = 0.0
+    
+    @property
+    def ok(self) -> bool:
+        """True if every file authenticated."""
+        return not self.bad
+
+
+def verify_files(paths: Iterable[str], password: str, workers: Optional[int] = None,
+                 progress: Optional[ProgressCallback] = None,
+                 cancel: Optional[threading.Event] = None,
+                 key_cache: Optional[DerivedKeyCache] = None) -> VerifyReport:
+    """
+    Verify many encrypted files in parallel, one file per worker.
+    
+    Damaged, truncated or unreadable files and wrong passwords are recorded
+    in the report instead of stopping the scan.
+    
+    Args:
+        paths: Encrypted files to check
+        password: Password for key derivation
+        workers: Files checked at once (default: CPU count)
+        progress: Optional callback receiving (bytes_done, bytes_total) of
+            encrypted data over all files
+        cancel: Optional event checked between segments
+        key_cache: Optional cache of derived keys
+        
+    Returns:
+        VerifyReport: Good and bad files in input order
+        
+    Raises:
+        OperationCancelled: If ``cancel`` was set
+    """
+    paths = list(paths)
+    sizes = {}
+    for path in paths:
+        try:
+            sizes[path] = os.path.getsize(path)
+        except OSError:
+            sizes[path] = 0
+    total = sum(sizes.values())
+    done = 0
+    lock = threading.Lock()
+    encryptor = AESGCMEncryptor(key_cache=key_cache)
+    
+    def check(path: str) -> Tuple[str, Optional[str], int]:
+        reported = 0
+        
+        def advance(file_done: int, _file_total: int) -> None:
+            nonlocal done, reported
+            with lock:
+                done += file_done - reported
+                current = done
+            reported = file_done
+            if progress is not None:
+                progress(current, total)
+        
+        try:
+            encryptor.verify_file(path, password, progress=advance, cancel=cancel)
+            error = None
+        except (DecryptionError, OSError) as e:
+            error = str(e)
+        # Count the whole file, also when it failed early
+        advance(sizes[path], sizes[path])
+        return path, error, sizes[path]
+    
+    report = VerifyReport()
+    started = time.monotonic()
+    for path, error, size in ParallelSegmentEngine(workers).map(check, ((p,) for p in paths)):
+        if error is None:
+            report.good.append(path)
+        else:
+            report.bad.append((path, error))
+        report.bytes += size
+    report.elapsed = time.monotonic() - started
+    if cancel is not None and cancel.is_set():
+        raise OperationCancelled("Operation cancelled")
+    return report
 
 
 # Convenience functions
@@ -133,4 +3220,74 @@ def aes_encrypt(plaintext: bytes, password: str) -> bytes:
 def aes_decrypt(encrypted_data: bytes, password: str) -> bytes:
     """Decrypt encrypted data using AES-256-GCM."""
     encryptor = AESGCMEncryptor()
-    return encryptor.aes_decrypt(encrypted_data, password)
\ No newline at end of file
+    return encryptor.aes_decrypt(encrypted_data, password)
+
+
+def encrypt_file(src_path: str, dst_path: str, password: str) -> int:
+    """Encrypt a file into the segmented AES-256-GCM container using memory maps."""
+    encryptor = AESGCMEncryptor()
+    return encryptor.encrypt_file(src_path, dst_path, password)
+
+
+def decrypt_file(src_path: str, dst_path: str, password: str) -> int:
+    """Decrypt a segmented container or single-shot file using memory maps."""
+    encryptor = AESGCMEncryptor()
+    return encryptor.decrypt_file(src_path, dst_path, password)
+
+
+def encrypt_file_resumable(src_path: str, dst_path: str, password: str) -> int:
+    """Encrypt a file through a checkpoint journal, continuing an interrupted run."""
+    encryptor = AESGCMEncryptor()
+    return encryptor.encrypt_file_resumable(src_path, dst_path, password)
+
+
+def decrypt_file_resumable(src_path: str, dst_path: str, password: str) -> int:
+    """Decrypt a file through a checkpoint journal, continuing an interrupted run."""
+    encryptor = AESGCMEncryptor()
+    return encryptor.decrypt_file_resumable(src_path, dst_path, password)
+
+
+def update_file(src_path: str, dst_path: str, password: str) -> Tuple[int, int]:
+    """Update an encrypted copy of a file, rewriting only the segments that changed."""
+    encryptor = AESGCMEncryptor()
+    return encryptor.update_file(src_path, dst_path, password)
+
+
+def encrypt_stream(src: BinaryIO, dst: BinaryIO, password: str) -> int:
+    """Encrypt a binary stream into the segmented AES-256-GCM container."""
+    encryptor = AESGCMEncryptor()
+    return encryptor.encrypt_stream(src, dst, password)
+
+
+def decrypt_stream(src: BinaryIO, dst: BinaryIO, password: str) -> int:
+    """Decrypt a segmented AES-256-GCM container (or single-shot data) from a stream."""
+    encryptor = AESGCMEncryptor()
+    return encryptor.decrypt_stream(src, dst, password)
+
+
+def encrypt_many(records: Iterable[BufferLike], password: str) -> RecordBatch:
+    """Encrypt many small records with one key derivation."""
+    encryptor = AESGCMEncryptor()
+    return encryptor.encrypt_many(records, password)
+
+
+def decrypt_many(batch: Union[RecordBatch, BufferLike], password: str) -> PackedRecords:
+    """Decrypt every record of a batch from ``encrypt_many``."""
+    encryptor = AESGCMEncryptor()
+    return encryptor.decrypt_many(batch, password)
+
+
+def pack_archive(paths: Iterable[str], dst_path: str, password: str) -> int:
+    """Pack files and directory trees into one encrypted archive."""
+    encryptor = AESGCMEncryptor()
+    return encryptor.pack_archive(archive_sources(paths), dst_path, password)
+
+
+def open_archive(source: Union[str, BinaryIO], password: str) -> EncryptedArchive:
+    """Open an encrypted archive for listing and extraction."""
+    return EncryptedArchive(source, password)
+
+
+def open_encrypted(source: Union[str, BinaryIO], password: str) -> SeekableDecryptor:
+    """Open a segmented container as a seekable, read-only plaintext file object."""
+    return SeekableDecryptor(source, password)
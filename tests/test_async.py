@@ -0,0 +1,69 @@
+"""The asyncio interface against the synchronous container format."""
+
+import asyncio
+import io
+import os
+
+import pytest
+
+from async_crypto import AsyncEncryptor
+from secure_crypto import AESGCMEncryptor, Compression, StreamHeader
+
+
+PASSWORD = 'async-test'
+SEGMENT_SIZE = 4096
+
+
+class BufferWriter:
+    """Minimal asyncio.StreamWriter collecting everything written."""
+
+    def __init__(self):
+        self.buffer = io.BytesIO()
+
+    def write(self, data):
+        self.buffer.write(data)
+
+    async def drain(self):
+        pass
+
+
+def write_container(plaintext, compression=None):
+    async def scenario():
+        async with AsyncEncryptor(max_concurrency=2, compression=compression) as crypto:
+            sink = BufferWriter()
+            stream = await crypto.open_writer(sink, PASSWORD, SEGMENT_SIZE)
+            for offset in range(0, len(plaintext), 1000):
+                await stream.write(plaintext[offset:offset + 1000])
+            await stream.close()
+            return sink.buffer.getvalue()
+
+    return asyncio.run(scenario())
+
+
+def read_container(container):
+    async def scenario():
+        reader = asyncio.StreamReader()
+        reader.feed_data(container)
+        reader.feed_eof()
+        async with AsyncEncryptor(max_concurrency=2) as crypto:
+            stream = await crypto.open_reader(reader, PASSWORD)
+            return await stream.read()
+
+    return asyncio.run(scenario())
+
+
+@pytest.mark.parametrize('compression', [None, 'zlib'])
+def test_writer_output_decrypts_synchronously(compression):
+    plaintext = b'async writer ' * 2000 + os.urandom(3 * SEGMENT_SIZE)
+    container = write_container(plaintext, compression)
+    header = StreamHeader.unpack(container)
+    assert header.codec == (Compression.codec_id(compression) if compression else Compression.NONE)
+    sink = io.BytesIO()
+    AESGCMEncryptor().decrypt_stream(io.BytesIO(container), sink, PASSWORD)
+    assert sink.getvalue() == plaintext
+    assert read_container(container) == plaintext
+
+
+def test_writer_compresses():
+    plaintext = b'compressible ' * 5000
+    assert len(write_container(plaintext, 'zlib')) < len(plaintext) // 4
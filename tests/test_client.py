@@ -0,0 +1,111 @@
+"""The daemon client: checks before it sends a password, and failure reporting."""
+
+import asyncio
+import os
+import socket
+import threading
+
+import pytest
+
+import crypto_client
+from crypto_client import (
+    CryptoClient, DaemonError, OP_ENCRYPT, OP_PING, check_private_directory, check_socket_owner, peer_uid
+)
+from crypto_daemon import CryptoDaemon
+
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason='Unix domain sockets only')
+
+
+def test_private_directory_is_created_with_mode_0700(tmp_path):
+    directory = str(tmp_path / 'run')
+    check_private_directory(directory, create=True)
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+
+
+def test_shared_directory_is_rejected(tmp_path):
+    directory = tmp_path / 'shared'
+    directory.mkdir()
+    directory.chmod(0o777)
+    with pytest.raises(DaemonError):
+        check_private_directory(str(directory))
+
+
+def test_symlinked_directory_is_rejected(tmp_path):
+    target = tmp_path / 'target'
+    target.mkdir(mode=0o700)
+    link = tmp_path / 'link'
+    link.symlink_to(target)
+    with pytest.raises(DaemonError):
+        check_private_directory(str(link))
+
+
+def test_regular_file_is_not_accepted_as_socket(tmp_path):
+    path = tmp_path / 'fake.sock'
+    path.write_bytes(b"")
+    with pytest.raises(DaemonError):
+        check_socket_owner(str(path))
+    with pytest.raises(DaemonError):
+        CryptoClient(str(path)).request(OP_PING)
+
+
+def test_peer_uid_of_own_socket(tmp_path):
+    path = str(tmp_path / 'own.sock')
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        check_socket_owner(path)
+        client.connect(path)
+        assert peer_uid(client) in (None, os.getuid())
+    finally:
+        client.close()
+        server.close()
+
+
+def test_oversized_payload_is_rejected_before_sending(tmp_path, monkeypatch):
+    monkeypatch.setattr(crypto_client, 'MAX_REQUEST_SIZE', 16)
+    client = CryptoClient(str(tmp_path / 'unused.sock'))
+    with pytest.raises(ValueError):
+        client.request(OP_ENCRYPT, 'password', bytes(32))
+
+
+def test_daemon_dying_mid_request_raises_daemon_error(tmp_path):
+    path = str(tmp_path / 'dying.sock')
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(1)
+
+    def accept_and_close():
+        conn, _ = server.accept()
+        conn.recv(16)
+        conn.close()
+
+    thread = threading.Thread(target=accept_and_close)
+    thread.start()
+    try:
+        with pytest.raises(DaemonError):
+            CryptoClient(path, timeout=10).request(OP_ENCRYPT, 'password', bytes(8 * 1024 * 1024))
+    finally:
+        thread.join()
+        server.close()
+
+
+def test_daemon_answers_unexpected_errors(tmp_path):
+    async def failing_handle(op, password, payload):
+        raise RuntimeError("boom")
+
+    async def scenario():
+        daemon = CryptoDaemon(str(tmp_path / 'daemon.sock'))
+        daemon.handle = failing_handle
+        await daemon.start()
+        try:
+            loop = asyncio.get_running_loop()
+            with CryptoClient(daemon.path, timeout=10) as client:
+                with pytest.raises(DaemonError, match="boom"):
+                    await loop.run_in_executor(None, client.request, OP_ENCRYPT, 'password', b'data')
+        finally:
+            await daemon.close()
+
+    asyncio.run(scenario())
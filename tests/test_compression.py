@@ -0,0 +1,86 @@
+"""Per-segment compression of the streaming container."""
+
+import io
+import os
+import zlib
+
+import pytest
+
+from secure_crypto import (
+    AESGCMEncryptor, Compression, DecryptionError, DerivedKeyCache, StreamHeader, open_encrypted
+)
+
+
+PASSWORD = 'compression-test'
+SEGMENT_SIZE = 4096
+KEY_CACHE = DerivedKeyCache()
+TEXT = b'segment compression test line\n' * 600
+
+
+def encrypt(plaintext, compression):
+    sink = io.BytesIO()
+    AESGCMEncryptor(key_cache=KEY_CACHE, compression=compression).encrypt_stream(
+        io.BytesIO(plaintext), sink, PASSWORD, SEGMENT_SIZE)
+    return sink.getvalue()
+
+
+def decrypt(container):
+    sink = io.BytesIO()
+    AESGCMEncryptor(key_cache=KEY_CACHE).decrypt_stream(io.BytesIO(container), sink, PASSWORD)
+    return sink.getvalue()
+
+
+@pytest.mark.parametrize('name', Compression.available())
+def test_codec_round_trip(name):
+    container = encrypt(TEXT, name)
+    assert StreamHeader.unpack(container).codec == Compression.codec_id(name)
+    assert len(container) < len(TEXT) // 2
+    assert decrypt(container) == TEXT
+
+
+def test_incompressible_segment_is_stored_raw():
+    # The compressible first segment enables compression; the random one does not shrink
+    plaintext = TEXT[:SEGMENT_SIZE] + os.urandom(SEGMENT_SIZE) + TEXT[:SEGMENT_SIZE]
+    container = encrypt(plaintext, 'zlib')
+    header = StreamHeader.unpack(container)
+    assert header.framed
+    lengths, position = [], header.size
+    while position < len(container):
+        (length,) = header.FRAME.unpack_from(container, position)
+        lengths.append(length)
+        position += header.FRAME.size + length
+    assert lengths[0] < SEGMENT_SIZE // 2
+    assert lengths[1] == 1 + SEGMENT_SIZE + header.TAG_SIZE
+    assert decrypt(container) == plaintext
+
+
+def test_incompressible_data_is_written_uncompressed():
+    container = encrypt(os.urandom(3 * SEGMENT_SIZE), 'zlib')
+    assert StreamHeader.unpack(container).codec == Compression.NONE
+
+
+def test_random_access_into_compressed_container(tmp_path):
+    path = tmp_path / 'text.enc'
+    path.write_bytes(encrypt(TEXT, 'zlib'))
+    with open_encrypted(str(path), PASSWORD) as f:
+        f.seek(3 * SEGMENT_SIZE - 10)
+        assert f.read(50) == TEXT[3 * SEGMENT_SIZE - 10:3 * SEGMENT_SIZE + 40]
+
+
+def test_segment_expanding_beyond_its_size_is_rejected():
+    bomb = b'\x01' + zlib.compress(bytes(SEGMENT_SIZE + 1))
+    with pytest.raises(DecryptionError):
+        Compression.unpack_segment(Compression.ZLIB, bomb, SEGMENT_SIZE, True)
+    with pytest.raises(DecryptionError):
+        Compression.unpack_segment(Compression.ZLIB, b'\x01garbage', SEGMENT_SIZE, True)
+
+
+def test_short_non_final_segment_is_rejected():
+    packed = Compression.pack_segment(Compression.ZLIB, TEXT[:SEGMENT_SIZE - 1])
+    with pytest.raises(DecryptionError):
+        Compression.unpack_segment(Compression.ZLIB, packed, SEGMENT_SIZE, False)
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        AESGCMEncryptor(compression='rar')
@@ -0,0 +1,54 @@
+"""Key derivation parameters and their bounds."""
+
+import time
+
+import pytest
+
+from secure_crypto import AESGCMEncryptor, DecryptionError, KDFParams, calibrate_kdf
+
+
+PASSWORD = 'kdf-test'
+
+
+@pytest.mark.parametrize('name', sorted(KDFParams.NAMES.values()))
+def test_defaults_within_bounds(name):
+    algorithm = KDFParams.parse(name).algorithm
+    for factor in (2, 8):
+        params = list(KDFParams.DEFAULTS[algorithm])
+        params[0] *= factor
+        KDFParams(algorithm, *params)
+
+
+@pytest.mark.parametrize('spec', [
+    'pbkdf2:iterations=4000000000',
+    'scrypt:n=4194304',
+    'scrypt:p=1000',
+    'argon2id:memory_cost=4194304',
+    'argon2id:iterations=1000',
+])
+def test_excessive_cost_rejected(spec):
+    with pytest.raises(ValueError):
+        KDFParams.parse(spec)
+
+
+def test_crafted_header_fails_fast(tmp_path):
+    src, enc, out = (str(tmp_path / name) for name in ('plain', 'enc', 'out'))
+    with open(src, 'wb') as f:
+        f.write(b'payload')
+    AESGCMEncryptor(kdf=KDFParams.default('pbkdf2')).encrypt_file(src, enc, PASSWORD)
+    with open(enc, 'rb') as f:
+        data = f.read()
+    kdf = KDFParams.default('pbkdf2').pack()
+    assert data.count(kdf) == 1
+    crafted = KDFParams._STRUCT.pack(KDFParams.PBKDF2, 2 ** 32 - 1, 0, 0)
+    with open(enc, 'wb') as f:
+        f.write(data.replace(kdf, crafted))
+    start = time.perf_counter()
+    with pytest.raises(DecryptionError):
+        AESGCMEncryptor().decrypt_file(enc, out, PASSWORD)
+    assert time.perf_counter() - start < 1
+
+
+def test_calibration_stays_within_bounds():
+    kdf = calibrate_kdf('scrypt', target_time=0.05, max_memory=8 * 1024 ** 3)
+    assert 128 * kdf.params[0] * kdf.params[1] <= KDFParams.MAX_MEMORY
@@ -0,0 +1,91 @@
+"""DerivedKeyCache: LRU eviction, expiry and zeroing."""
+
+import time
+
+import pytest
+
+from secure_crypto import AESGCMEncryptor, DerivedKeyCache
+
+
+SALT = bytes(16)
+
+
+def stored_key(cache, password, salt=SALT):
+    """The buffer the cache holds for (password, salt)."""
+    return cache._entries[cache._cache_key(password, salt)][0]
+
+
+def test_get_returns_a_copy():
+    cache = DerivedKeyCache()
+    cache.put('a', SALT, b'k' * 32)
+    key = cache.get('a', SALT)
+    key[:] = bytes(32)
+    assert cache.get('a', SALT) == b'k' * 32
+
+
+def test_least_recently_used_is_evicted():
+    cache = DerivedKeyCache(max_entries=2, ttl=None)
+    cache.put('a', SALT, b'a' * 32)
+    cache.put('b', SALT, b'b' * 32)
+    assert cache.get('a', SALT) is not None
+    cache.put('c', SALT, b'c' * 32)
+    assert len(cache) == 2
+    assert cache.get('b', SALT) is None
+    assert cache.get('a', SALT) == b'a' * 32
+    assert cache.get('c', SALT) == b'c' * 32
+
+
+def test_salt_is_part_of_the_key():
+    cache = DerivedKeyCache()
+    cache.put('a', SALT, b'a' * 32)
+    assert cache.get('a', bytes(range(16))) is None
+    assert cache.get('b', SALT) is None
+
+
+def test_entries_expire():
+    cache = DerivedKeyCache(ttl=0.05)
+    cache.put('a', SALT, b'a' * 32)
+    buffer = stored_key(cache, 'a')
+    time.sleep(0.1)
+    assert cache.get('a', SALT) is None
+    assert len(cache) == 0
+    assert buffer == bytes(32)
+
+
+def test_evicted_and_cleared_keys_are_zeroed():
+    cache = DerivedKeyCache(max_entries=1)
+    cache.put('a', SALT, b'a' * 32)
+    evicted = stored_key(cache, 'a')
+    cache.put('b', SALT, b'b' * 32)
+    assert evicted == bytes(32)
+    cleared = stored_key(cache, 'b')
+    cache.clear()
+    assert cleared == bytes(32)
+    assert len(cache) == 0
+
+
+def test_invalid_size():
+    with pytest.raises(ValueError):
+        DerivedKeyCache(max_entries=0)
+
+
+def test_get_or_derive_derives_once():
+    cache = DerivedKeyCache()
+    calls = []
+
+    def derive():
+        calls.append(1)
+        return b'd' * 32
+
+    assert cache.get_or_derive('a', SALT, derive) == b'd' * 32
+    assert cache.get_or_derive('a', SALT, derive) == b'd' * 32
+    assert len(calls) == 1
+
+
+def test_encryptor_reuses_cached_key():
+    cache = DerivedKeyCache()
+    encryptor = AESGCMEncryptor(key_cache=cache)
+    token = encryptor.aes_encrypt(b'data', 'password')
+    assert len(cache) == 1
+    assert encryptor.aes_decrypt(token, 'password') == b'data'
+    assert len(cache) == 1
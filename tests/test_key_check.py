@@ -0,0 +1,68 @@
+"""Wrong passwords are rejected by the header key check before any segment is read."""
+
+import io
+import os
+
+import pytest
+
+from secure_crypto import AESGCMEncryptor, InvalidPasswordError, StreamHeader, open_encrypted
+
+
+PASSWORD = 'key-check-test'
+SEGMENT_SIZE = 1024
+
+
+class TrackingReader(io.BytesIO):
+    """BytesIO that remembers how far it was read."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.furthest = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.furthest = max(self.furthest, self.tell())
+        return data
+
+    def readinto(self, buffer):
+        n = super().readinto(buffer)
+        self.furthest = max(self.furthest, self.tell())
+        return n
+
+
+@pytest.fixture(scope='module')
+def container():
+    sink = io.BytesIO()
+    AESGCMEncryptor().encrypt_stream(io.BytesIO(os.urandom(4 * SEGMENT_SIZE)), sink, PASSWORD, SEGMENT_SIZE)
+    return sink.getvalue()
+
+
+def test_header_carries_key_check(container):
+    header = StreamHeader.unpack(container)
+    assert header.has_key_check and len(header.key_check) == StreamHeader.KEY_CHECK_SIZE
+
+
+def test_wrong_password_fails_before_segments_are_read(container):
+    src, sink = TrackingReader(container), io.BytesIO()
+    with pytest.raises(InvalidPasswordError):
+        AESGCMEncryptor().decrypt_stream(src, sink, 'wrong password')
+    assert src.furthest == StreamHeader.unpack(container).size
+    assert sink.getvalue() == b''
+
+
+def test_wrong_password_leaves_no_output_file(tmp_path, container):
+    encrypted, target = tmp_path / 'data.enc', tmp_path / 'data'
+    encrypted.write_bytes(container)
+    with pytest.raises(InvalidPasswordError):
+        AESGCMEncryptor().decrypt_file(str(encrypted), str(target), 'wrong password')
+    assert not target.exists()
+    with pytest.raises(InvalidPasswordError):
+        open_encrypted(str(encrypted), 'wrong password')
+
+
+def test_damaged_key_check_is_reported_as_wrong_password(container):
+    header = StreamHeader.unpack(container)
+    damaged = bytearray(container)
+    damaged[header.size - 1] ^= 1
+    with pytest.raises(InvalidPasswordError):
+        AESGCMEncryptor().decrypt_stream(io.BytesIO(bytes(damaged)), io.BytesIO(), PASSWORD)
@@ -0,0 +1,107 @@
+"""ParallelSegmentEngine against the single-threaded path."""
+
+import io
+import os
+import random
+import threading
+import time
+
+import pytest
+
+from secure_crypto import (
+    AESGCMEncryptor, DerivedKeyCache, LEGACY_KDF, ParallelSegmentEngine, StreamHeader
+)
+
+
+PASSWORD = 'parallel-test'
+SALT = bytes(range(16))
+NONCE_PREFIX = bytes(range(7))
+SEGMENT_SIZE = 64 * 1024
+
+
+@pytest.fixture
+def fixed_header(monkeypatch):
+    """Give every new container the same salt and nonce prefix, so outputs are comparable."""
+    def new_header(self, segment_size, salt=None, codec=0):
+        return StreamHeader(segment_size, salt or SALT, NONCE_PREFIX,
+                            codec | StreamHeader.FLAG_KEY_CHECK, LEGACY_KDF)
+
+    monkeypatch.setattr(AESGCMEncryptor, '_new_header', new_header)
+
+
+@pytest.fixture
+def encryptor():
+    return AESGCMEncryptor(key_cache=DerivedKeyCache())
+
+
+def test_map_yields_results_in_input_order():
+    def work(index):
+        time.sleep(random.random() / 500)
+        return index
+
+    engine = ParallelSegmentEngine(workers=8, max_in_flight=5)
+    assert list(engine.map(work, ((i,) for i in range(200)))) == list(range(200))
+
+
+def test_map_bounds_the_in_flight_window():
+    lock = threading.Lock()
+    running = peak = 0
+
+    def work(index):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.001)
+        with lock:
+            running -= 1
+        return index
+
+    consumed = 0
+
+    def items():
+        nonlocal consumed
+        for i in range(100):
+            consumed += 1
+            yield (i,)
+
+    engine = ParallelSegmentEngine(workers=4, max_in_flight=6)
+    for done, _ in enumerate(engine.map(work, items()), 1):
+        assert consumed - done <= engine.max_in_flight
+    assert peak <= engine.workers
+
+
+def test_map_propagates_worker_errors():
+    def work(index):
+        if index == 7:
+            raise ValueError("segment 7")
+        return index
+
+    with pytest.raises(ValueError, match="segment 7"):
+        list(ParallelSegmentEngine(workers=4).map(work, ((i,) for i in range(20))))
+
+
+@pytest.mark.parametrize('size', [0, 1, SEGMENT_SIZE, 10 * SEGMENT_SIZE + 123])
+def test_stream_output_matches_single_threaded(fixed_header, encryptor, size):
+    plaintext = os.urandom(size)
+    engine = ParallelSegmentEngine(workers=4, max_in_flight=3)
+    single, parallel = io.BytesIO(), io.BytesIO()
+    encryptor.encrypt_stream(io.BytesIO(plaintext), single, PASSWORD, SEGMENT_SIZE)
+    encryptor.encrypt_stream(io.BytesIO(plaintext), parallel, PASSWORD, SEGMENT_SIZE, engine=engine)
+    assert parallel.getvalue() == single.getvalue()
+
+    decrypted = io.BytesIO()
+    encryptor.decrypt_stream(io.BytesIO(parallel.getvalue()), decrypted, PASSWORD, engine=engine)
+    assert decrypted.getvalue() == plaintext
+
+
+def test_file_output_matches_single_threaded(tmp_path, fixed_header, encryptor):
+    source = tmp_path / 'plain'
+    source.write_bytes(os.urandom(7 * SEGMENT_SIZE + 5))
+    engine = ParallelSegmentEngine(workers=4)
+    encryptor.encrypt_file(str(source), str(tmp_path / 'single.enc'), PASSWORD, SEGMENT_SIZE)
+    encryptor.encrypt_file(str(source), str(tmp_path / 'parallel.enc'), PASSWORD, SEGMENT_SIZE, engine=engine)
+    assert (tmp_path / 'parallel.enc').read_bytes() == (tmp_path / 'single.enc').read_bytes()
+
+    encryptor.decrypt_file(str(tmp_path / 'parallel.enc'), str(tmp_path / 'plain.dec'), PASSWORD, engine=engine)
+    assert (tmp_path / 'plain.dec').read_bytes() == source.read_bytes()
@@ -0,0 +1,29 @@
+"""Record batches sealed under one key."""
+
+import pytest
+
+import secure_crypto
+from secure_crypto import AESGCMEncryptor, DecryptionError, RecordBatch
+
+
+PASSWORD = 'records-test'
+
+
+def test_round_trip():
+    records = [b'', b'a', bytes(range(256)) * 40]
+    batch = AESGCMEncryptor().encrypt_many(records, PASSWORD)
+    restored = AESGCMEncryptor().decrypt_many(batch.pack(), PASSWORD)
+    assert [bytes(r) for r in restored] == records
+
+
+def test_record_limit_below_nonce_bound():
+    assert RecordBatch.MAX_RECORDS * 16 <= 2 ** 32
+
+
+def test_record_limit_enforced(monkeypatch):
+    packed = AESGCMEncryptor().encrypt_many([b'x'] * 4, PASSWORD).pack()
+    monkeypatch.setattr(secure_crypto.RecordBatch, 'MAX_RECORDS', 3)
+    with pytest.raises(ValueError):
+        AESGCMEncryptor().encrypt_many([b'x'] * 4, PASSWORD)
+    with pytest.raises(DecryptionError):
+        RecordBatch.unpack(packed)
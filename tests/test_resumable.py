@@ -0,0 +1,205 @@
+"""Resumable encryption and decryption through checkpoint journals."""
+
+import os
+import threading
+
+import pytest
+
+from secure_crypto import (
+    AESGCMEncryptor, CheckpointJournal, OperationCancelled, StreamHeader, open_encrypted
+)
+
+
+PASSWORD = 'resume-test'
+SEGMENT_SIZE = 4096
+
+
+@pytest.fixture
+def encryptor():
+    return AESGCMEncryptor()
+
+
+@pytest.fixture
+def plaintext():
+    # Not a multiple of the segment size, so the last segment is short
+    return os.urandom(3 * SEGMENT_SIZE + 157)
+
+
+def cancel_at_end():
+    """(progress, cancel) pair that cancels once progress reaches the total."""
+    cancel = threading.Event()
+
+    def progress(done, total):
+        if done >= total:
+            cancel.set()
+
+    return progress, cancel
+
+
+def crash_before_complete(monkeypatch):
+    """Make the next CheckpointJournal.complete fail like a killed process."""
+    def crash(cls, dst, destination):
+        dst.close()
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(CheckpointJournal, 'complete', classmethod(crash))
+
+
+def assert_finished(path):
+    partial, journal = CheckpointJournal.paths(path)
+    assert os.path.exists(path)
+    assert not os.path.exists(partial)
+    assert not os.path.exists(journal)
+
+
+def test_encrypt_resumes_after_cancel_at_end(tmp_path, encryptor, plaintext):
+    source, target = tmp_path / 'plain', str(tmp_path / 'plain.enc')
+    source.write_bytes(plaintext)
+    progress, cancel = cancel_at_end()
+    with pytest.raises(OperationCancelled):
+        encryptor.encrypt_file_resumable(str(source), target, PASSWORD, SEGMENT_SIZE,
+                                         progress=progress, cancel=cancel)
+    assert CheckpointJournal.load(target) is not None
+
+    written = encryptor.encrypt_file_resumable(str(source), target, PASSWORD, SEGMENT_SIZE)
+    assert_finished(target)
+    with open(target, 'rb') as f:
+        container = f.read()
+    header = StreamHeader.unpack(container)
+    assert header.random_nonces
+    assert written == len(container) == header.encrypted_size(len(plaintext))
+    assert encryptor.aes_decrypt(container, PASSWORD) == plaintext
+
+
+def test_decrypt_resumes_after_cancel_at_end(tmp_path, encryptor, plaintext):
+    source, target = tmp_path / 'plain', str(tmp_path / 'plain.dec')
+    source.write_bytes(plaintext)
+    encrypted = str(tmp_path / 'plain.enc')
+    encryptor.encrypt_file(str(source), encrypted, PASSWORD, SEGMENT_SIZE)
+    progress, cancel = cancel_at_end()
+    with pytest.raises(OperationCancelled):
+        encryptor.decrypt_file_resumable(encrypted, target, PASSWORD, progress=progress, cancel=cancel)
+    assert CheckpointJournal.load(target) is not None
+
+    assert encryptor.decrypt_file_resumable(encrypted, target, PASSWORD) == len(plaintext)
+    assert_finished(target)
+    with open(target, 'rb') as f:
+        assert f.read() == plaintext
+
+
+def test_encrypt_resumes_after_crash_before_complete(tmp_path, monkeypatch, encryptor, plaintext):
+    source, target = tmp_path / 'plain', str(tmp_path / 'plain.enc')
+    source.write_bytes(plaintext)
+    with monkeypatch.context() as patch:
+        crash_before_complete(patch)
+        with pytest.raises(KeyboardInterrupt):
+            encryptor.encrypt_file_resumable(str(source), target, PASSWORD, SEGMENT_SIZE,
+                                             checkpoint_interval=1)
+
+    encryptor.encrypt_file_resumable(str(source), target, PASSWORD, SEGMENT_SIZE)
+    assert_finished(target)
+    with open(target, 'rb') as f:
+        assert encryptor.aes_decrypt(f.read(), PASSWORD) == plaintext
+
+
+def test_decrypt_resumes_after_crash_before_complete(tmp_path, monkeypatch, encryptor, plaintext):
+    source, target = tmp_path / 'plain', str(tmp_path / 'plain.dec')
+    source.write_bytes(plaintext)
+    encrypted = str(tmp_path / 'plain.enc')
+    encryptor.encrypt_file(str(source), encrypted, PASSWORD, SEGMENT_SIZE)
+    with monkeypatch.context() as patch:
+        crash_before_complete(patch)
+        with pytest.raises(KeyboardInterrupt):
+            encryptor.decrypt_file_resumable(encrypted, target, PASSWORD, checkpoint_interval=1)
+
+    assert encryptor.decrypt_file_resumable(encrypted, target, PASSWORD) == len(plaintext)
+    assert_finished(target)
+    with open(target, 'rb') as f:
+        assert f.read() == plaintext
+
+
+def test_resume_continues_from_checkpoint(tmp_path, encryptor, plaintext):
+    source, target = tmp_path / 'plain', str(tmp_path / 'plain.enc')
+    source.write_bytes(plaintext)
+    cancel = threading.Event()
+
+    def progress(done, total):
+        if done >= SEGMENT_SIZE:
+            cancel.set()
+
+    with pytest.raises(OperationCancelled):
+        encryptor.encrypt_file_resumable(str(source), target, PASSWORD, SEGMENT_SIZE,
+                                         progress=progress, cancel=cancel)
+    journal = CheckpointJournal.load(target)
+    assert journal is not None and not journal.finished(os.stat(source))
+
+    encryptor.encrypt_file_resumable(str(source), target, PASSWORD, SEGMENT_SIZE)
+    assert_finished(target)
+    with open(target, 'rb') as f:
+        assert encryptor.aes_decrypt(f.read(), PASSWORD) == plaintext
+
+
+def segment_nonces(container):
+    """Nonces stored in front of the segments of an uncompressed random-nonce container."""
+    header = StreamHeader.unpack(container)
+    body = container[header.size:]
+    return [body[offset:offset + StreamHeader.NONCE_SIZE]
+            for offset in range(0, len(body), header.sealed_size)]
+
+
+def test_resume_after_silent_source_change_reuses_no_nonce(tmp_path, monkeypatch, encryptor, plaintext):
+    source, target = tmp_path / 'plain', str(tmp_path / 'plain.enc')
+    source.write_bytes(plaintext)
+    # Only the header is checkpointed; every segment still reaches the .part file
+    with monkeypatch.context() as patch:
+        crash_before_complete(patch)
+        with pytest.raises(KeyboardInterrupt):
+            encryptor.encrypt_file_resumable(str(source), target, PASSWORD, SEGMENT_SIZE,
+                                             checkpoint_interval=len(plaintext) * 2)
+    partial, _ = CheckpointJournal.paths(target)
+    with open(partial, 'rb') as f:
+        first = f.read()
+    assert len(segment_nonces(first)) == 4
+
+    # Same size and modification time, different content
+    stat = os.stat(source)
+    changed = os.urandom(len(plaintext))
+    source.write_bytes(changed)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert CheckpointJournal.load(target).matches(CheckpointJournal.ENCRYPT, os.stat(source))
+
+    encryptor.encrypt_file_resumable(str(source), target, PASSWORD, SEGMENT_SIZE)
+    assert_finished(target)
+    with open(target, 'rb') as f:
+        resumed = f.read()
+    header = StreamHeader.unpack(first)
+    assert header.random_nonces
+    assert resumed[:header.size] == first[:header.size]
+    assert not set(segment_nonces(first)) & set(segment_nonces(resumed))
+    assert encryptor.aes_decrypt(resumed, PASSWORD) == changed
+
+
+def test_resume_compressed(tmp_path):
+    encryptor = AESGCMEncryptor(compression='zlib')
+    plaintext = b'compressible ' * 3000
+    source, target = tmp_path / 'plain', str(tmp_path / 'plain.enc')
+    source.write_bytes(plaintext)
+    cancel = threading.Event()
+
+    def progress(done, total):
+        if done >= SEGMENT_SIZE:
+            cancel.set()
+
+    with pytest.raises(OperationCancelled):
+        encryptor.encrypt_file_resumable(str(source), target, PASSWORD, SEGMENT_SIZE,
+                                         progress=progress, cancel=cancel)
+    encryptor.encrypt_file_resumable(str(source), target, PASSWORD, SEGMENT_SIZE)
+    with open(target, 'rb') as f:
+        container = f.read()
+    header = StreamHeader.unpack(container)
+    assert header.framed and header.random_nonces
+    assert len(container) < len(plaintext)
+    assert encryptor.aes_decrypt(container, PASSWORD) == plaintext
+    with open_encrypted(target, PASSWORD) as f:
+        f.seek(2 * SEGMENT_SIZE + 5)
+        assert f.read(100) == plaintext[2 * SEGMENT_SIZE + 5:2 * SEGMENT_SIZE + 105]
@@ -0,0 +1,104 @@
+"""SeekableDecryptor: random access into segmented containers."""
+
+import io
+import os
+import random
+
+import pytest
+
+from secure_crypto import AESGCMEncryptor, DecryptionError, DerivedKeyCache, SeekableDecryptor, StreamHeader
+
+
+PASSWORD = 'seek-test'
+SEGMENT_SIZE = 1024
+PLAINTEXT = os.urandom(5 * SEGMENT_SIZE + 123)
+KEY_CACHE = DerivedKeyCache()
+
+
+@pytest.fixture(scope='module')
+def container():
+    sink = io.BytesIO()
+    AESGCMEncryptor().encrypt_stream(io.BytesIO(PLAINTEXT), sink, PASSWORD, SEGMENT_SIZE)
+    return sink.getvalue()
+
+
+def open_container(data):
+    return SeekableDecryptor(io.BytesIO(data), PASSWORD, KEY_CACHE)
+
+
+def test_size_and_full_read(container):
+    with open_container(container) as f:
+        assert f.size == len(PLAINTEXT)
+        assert f.read() == PLAINTEXT
+        assert f.read() == b''
+
+
+@pytest.mark.parametrize('offset, length', [
+    (SEGMENT_SIZE - 10, 20),
+    (SEGMENT_SIZE - 1, 2 * SEGMENT_SIZE + 2),
+    (2 * SEGMENT_SIZE, SEGMENT_SIZE),
+    (len(PLAINTEXT) - 50, 50),
+], ids=['one boundary', 'several boundaries', 'whole segment', 'final segment'])
+def test_reads_across_segment_boundaries(container, offset, length):
+    with open_container(container) as f:
+        f.seek(offset)
+        assert f.read(length) == PLAINTEXT[offset:offset + length]
+        assert f.tell() == offset + length
+
+
+def test_reads_at_and_past_eof(container):
+    with open_container(container) as f:
+        assert f.seek(-10, io.SEEK_END) == len(PLAINTEXT) - 10
+        assert f.read(100) == PLAINTEXT[-10:]
+        assert f.read(1) == b''
+        f.seek(len(PLAINTEXT) + 1000)
+        assert f.read(10) == b''
+        with pytest.raises(ValueError):
+            f.seek(-1)
+
+
+def test_random_reads(container):
+    rng = random.Random(18)
+    with open_container(container) as f:
+        for _ in range(200):
+            offset = rng.randrange(len(PLAINTEXT))
+            length = rng.randrange(1, 3000)
+            f.seek(offset)
+            assert f.read(length) == PLAINTEXT[offset:offset + length]
+
+
+def test_buffered_reader(container):
+    with io.BufferedReader(open_container(container), buffer_size=300) as f:
+        f.seek(SEGMENT_SIZE + 7)
+        assert f.read(SEGMENT_SIZE) == PLAINTEXT[SEGMENT_SIZE + 7:2 * SEGMENT_SIZE + 7]
+
+
+def test_truncated_container_is_rejected_on_open(container):
+    header = StreamHeader.unpack(container)
+    with pytest.raises(DecryptionError):
+        open_container(container[:header.size + 3 * header.sealed_size])
+    with pytest.raises(DecryptionError):
+        open_container(container + bytes(10))
+
+
+def test_damaged_segment_fails_only_when_read(container):
+    header = StreamHeader.unpack(container)
+    damaged = bytearray(container)
+    damaged[header.size + 2 * header.sealed_size + 5] ^= 1
+    with open_container(bytes(damaged)) as f:
+        assert f.read(SEGMENT_SIZE) == PLAINTEXT[:SEGMENT_SIZE]
+        f.seek(2 * SEGMENT_SIZE)
+        with pytest.raises(DecryptionError):
+            f.read(1)
+
+
+def test_single_shot_data_is_rejected():
+    with pytest.raises(DecryptionError):
+        open_container(AESGCMEncryptor().aes_encrypt(b'single shot', PASSWORD))
+
+
+def test_closed_reader(container):
+    f = open_container(container)
+    f.close()
+    with pytest.raises(ValueError):
+        f.read(1)
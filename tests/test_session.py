@@ -0,0 +1,68 @@
+"""EncryptionSession: one key derivation, a subkey per message."""
+
+import pytest
+
+from secure_crypto import DecryptionError, EncryptionSession
+
+
+PASSWORD = 'session-test'
+
+
+@pytest.fixture
+def session():
+    with EncryptionSession(PASSWORD) as session:
+        yield session
+
+
+def test_round_trip_with_associated_data(session):
+    message = session.encrypt(b'payload', b'context')
+    assert session.decrypt(message, b'context') == b'payload'
+    with pytest.raises(DecryptionError):
+        session.decrypt(message, b'other context')
+    with pytest.raises(DecryptionError):
+        session.decrypt(message)
+
+
+def test_every_message_gets_its_own_subkey(session):
+    first, second = session.encrypt(b'same'), session.encrypt(b'same')
+    header = EncryptionSession.HEADER_SIZE
+    counter = slice(header - 8, header)
+    assert first[counter] != second[counter]
+    # Constant nonce: equal plaintext under distinct subkeys still differs
+    assert first[header:] != second[header:]
+    # A body moved under another counter fails authentication
+    with pytest.raises(DecryptionError):
+        session.decrypt(second[:header] + first[header:])
+
+
+def test_other_session_with_same_password_decrypts(session):
+    message = session.encrypt(b'payload')
+    with EncryptionSession(PASSWORD) as other:
+        assert other.salt != session.salt
+        assert other.decrypt(message) == b'payload'
+    with EncryptionSession('wrong') as wrong:
+        with pytest.raises(DecryptionError):
+            wrong.decrypt(message)
+
+
+def test_message_limit(session):
+    session._counter = EncryptionSession.MAX_MESSAGES - 1
+    session.encrypt(b'last')
+    with pytest.raises(ValueError):
+        session.encrypt(b'one too many')
+
+
+def test_closed_session_refuses_work(session):
+    message = session.encrypt(b'payload')
+    session.close()
+    with pytest.raises(ValueError):
+        session.encrypt(b'payload')
+    with pytest.raises(ValueError):
+        session.decrypt(message)
+
+
+def test_truncated_and_unknown_messages(session):
+    with pytest.raises(DecryptionError):
+        session.decrypt(session.encrypt(b'payload')[:EncryptionSession.HEADER_SIZE])
+    with pytest.raises(DecryptionError):
+        session.decrypt(b'\x09' + bytes(64))
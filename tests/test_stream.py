@@ -0,0 +1,82 @@
+"""The segmented streaming container: round trips and tampering."""
+
+import io
+import os
+
+import pytest
+
+from secure_crypto import AESGCMEncryptor, DecryptionError, DerivedKeyCache, StreamHeader
+
+
+PASSWORD = 'stream-test'
+SEGMENT_SIZE = 1024
+
+
+@pytest.fixture(scope='module')
+def encryptor():
+    # Decrypting the same container many times only derives its key once
+    return AESGCMEncryptor(key_cache=DerivedKeyCache())
+
+
+def encrypt(encryptor, plaintext):
+    sink = io.BytesIO()
+    encryptor.encrypt_stream(io.BytesIO(plaintext), sink, PASSWORD, SEGMENT_SIZE)
+    return sink.getvalue()
+
+
+def decrypt(encryptor, container):
+    sink = io.BytesIO()
+    encryptor.decrypt_stream(io.BytesIO(container), sink, PASSWORD)
+    return sink.getvalue()
+
+
+def split(container):
+    """(header bytes, list of sealed segments) of an uncompressed container."""
+    header = StreamHeader.unpack(container)
+    body = container[header.size:]
+    return container[:header.size], [body[i:i + header.sealed_size]
+                                     for i in range(0, len(body), header.sealed_size)]
+
+
+@pytest.mark.parametrize('size', [0, 1, SEGMENT_SIZE - 1, SEGMENT_SIZE, SEGMENT_SIZE + 1, 3 * SEGMENT_SIZE])
+def test_round_trip(encryptor, size):
+    plaintext = os.urandom(size)
+    container = encrypt(encryptor, plaintext)
+    assert len(container) == StreamHeader.unpack(container).encrypted_size(size)
+    assert decrypt(encryptor, container) == plaintext
+
+
+def test_truncated_after_last_full_segment(encryptor):
+    head, segments = split(encrypt(encryptor, os.urandom(3 * SEGMENT_SIZE + 100)))
+    assert len(segments) == 4
+    with pytest.raises(DecryptionError):
+        decrypt(encryptor, head + b''.join(segments[:3]))
+
+
+def test_dropped_final_segment(encryptor):
+    head, segments = split(encrypt(encryptor, os.urandom(3 * SEGMENT_SIZE)))
+    assert len(segments) == 3
+    with pytest.raises(DecryptionError):
+        decrypt(encryptor, head + b''.join(segments[:2]))
+
+
+def test_reordered_segments(encryptor):
+    head, segments = split(encrypt(encryptor, os.urandom(3 * SEGMENT_SIZE + 100)))
+    segments[0], segments[1] = segments[1], segments[0]
+    with pytest.raises(DecryptionError):
+        decrypt(encryptor, head + b''.join(segments))
+
+
+def test_trailing_data(encryptor):
+    container = encrypt(encryptor, os.urandom(2 * SEGMENT_SIZE))
+    with pytest.raises(DecryptionError):
+        decrypt(encryptor, container + bytes(20))
+
+
+def test_header_bit_flips(encryptor):
+    container = encrypt(encryptor, os.urandom(2 * SEGMENT_SIZE + 10))
+    for position in range(StreamHeader.unpack(container).size):
+        damaged = bytearray(container)
+        damaged[position] ^= 0x01
+        with pytest.raises(DecryptionError):
+            decrypt(encryptor, bytes(damaged))
@@ -0,0 +1,111 @@
+"""update_file: incremental re-encryption of changed segments."""
+
+import os
+
+import pytest
+
+from secure_crypto import (
+    AESGCMEncryptor, DerivedKeyCache, InvalidPasswordError, SegmentManifest, StreamHeader
+)
+
+
+PASSWORD = 'update-test'
+SEGMENT_SIZE = 1024
+SEGMENTS = 6
+
+
+@pytest.fixture
+def encryptor():
+    return AESGCMEncryptor(key_cache=DerivedKeyCache())
+
+
+@pytest.fixture
+def paths(tmp_path, encryptor):
+    """(source, container) with the container already encrypted once."""
+    source, target = tmp_path / 'disk.img', tmp_path / 'disk.img.enc'
+    source.write_bytes(os.urandom(SEGMENTS * SEGMENT_SIZE - 100))
+    assert encryptor.update_file(str(source), str(target), PASSWORD, SEGMENT_SIZE) == (SEGMENTS, SEGMENTS)
+    return source, target
+
+
+def changed_segments(before, after):
+    header = StreamHeader.unpack(before)
+    size = header.sealed_size
+    return [i for i in range(-(-(len(after) - header.size) // size))
+            if before[header.size + i * size:header.size + (i + 1) * size]
+            != after[header.size + i * size:header.size + (i + 1) * size]]
+
+
+def assert_decrypts(encryptor, source, target):
+    assert encryptor.aes_decrypt(target.read_bytes(), PASSWORD) == source.read_bytes()
+
+
+def test_unchanged_source_rewrites_nothing(encryptor, paths):
+    source, target = paths
+    before = target.read_bytes()
+    assert encryptor.update_file(str(source), str(target), PASSWORD) == (0, SEGMENTS)
+    assert target.read_bytes() == before
+
+
+def test_one_byte_change_rewrites_one_segment(encryptor, paths):
+    source, target = paths
+    before = target.read_bytes()
+    data = bytearray(source.read_bytes())
+    data[2 * SEGMENT_SIZE + 17] ^= 1
+    source.write_bytes(data)
+    assert encryptor.update_file(str(source), str(target), PASSWORD) == (1, SEGMENTS)
+    after = target.read_bytes()
+    assert changed_segments(before, after) == [2]
+    assert_decrypts(encryptor, source, target)
+
+
+@pytest.mark.parametrize('delta, rewritten', [(3 * SEGMENT_SIZE, 4), (-2 * SEGMENT_SIZE, 1)],
+                         ids=['grow', 'shrink'])
+def test_size_change_rewrites_the_tail(encryptor, paths, delta, rewritten):
+    source, target = paths
+    data = source.read_bytes()
+    source.write_bytes(data + os.urandom(delta) if delta > 0 else data[:delta])
+    segments = -(-(len(data) + delta) // SEGMENT_SIZE)
+    assert encryptor.update_file(str(source), str(target), PASSWORD) == (rewritten, segments)
+    assert_decrypts(encryptor, source, target)
+
+
+def test_interrupted_update_is_completed(encryptor, paths):
+    source, target = paths
+    # An update that saved its pending manifest but died while writing segment 3
+    manifest = SegmentManifest.load(str(target))
+    manifest.clear(3)
+    manifest.save(str(target))
+    header = StreamHeader.unpack(target.read_bytes())
+    with open(target, 'r+b') as f:
+        f.seek(header.size + 3 * header.sealed_size + 20)
+        f.write(b'partial write')
+    assert encryptor.update_file(str(source), str(target), PASSWORD) == (1, SEGMENTS)
+    assert_decrypts(encryptor, source, target)
+
+
+def test_stale_manifest_of_replaced_container_is_ignored(encryptor, paths):
+    source, target = paths
+    encryptor.encrypt_file(str(source), str(target), PASSWORD, SEGMENT_SIZE)
+    assert SegmentManifest.load(str(target)) is None
+    assert encryptor.update_file(str(source), str(target), PASSWORD, SEGMENT_SIZE) == (SEGMENTS, SEGMENTS)
+    assert_decrypts(encryptor, source, target)
+    assert SegmentManifest.load(str(target)) is not None
+
+
+def test_rewritten_segments_get_fresh_nonces(encryptor, paths):
+    source, target = paths
+    before = target.read_bytes()
+    data = bytearray(source.read_bytes())
+    data[5] ^= 1
+    source.write_bytes(data)
+    encryptor.update_file(str(source), str(target), PASSWORD)
+    header = StreamHeader.unpack(before)
+    nonce = slice(header.size, header.size + StreamHeader.NONCE_SIZE)
+    assert target.read_bytes()[nonce] != before[nonce]
+
+
+def test_other_password_is_rejected(encryptor, paths):
+    source, target = paths
+    with pytest.raises(InvalidPasswordError):
+        encryptor.update_file(str(source), str(target), 'other password')
@@ -0,0 +1,54 @@
+"""Integrity scans of encrypted files and archives."""
+
+import os
+
+import pytest
+
+from secure_crypto import AESGCMEncryptor, DecryptionError, archive_sources, verify_files
+
+
+PASSWORD = 'verify-test'
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'tree'
+    (root / 'sub').mkdir(parents=True)
+    for name, size in (('a.bin', 70000), ('sub/b.bin', 10), ('sub/empty', 0)):
+        (root / name).write_bytes(os.urandom(size))
+    return root
+
+
+@pytest.fixture
+def archive(tmp_path, tree):
+    path = str(tmp_path / 'tree.ghar')
+    AESGCMEncryptor().pack_archive(archive_sources([str(tree)]), path, PASSWORD)
+    return path
+
+
+def test_verify_file_accepts_archive(archive):
+    assert AESGCMEncryptor().verify_file(archive, PASSWORD) == 70010
+
+
+def test_verify_file_rejects_damaged_archive_entry(archive):
+    with open(archive, 'r+b') as f:
+        f.seek(200)
+        byte = f.read(1)
+        f.seek(200)
+        f.write(bytes([byte[0] ^ 1]))
+    with pytest.raises(DecryptionError):
+        AESGCMEncryptor().verify_file(archive, PASSWORD)
+
+
+def test_verify_files_reports_archives_and_containers(tmp_path, tree, archive):
+    container = str(tmp_path / 'a.bin.enc')
+    AESGCMEncryptor().encrypt_file(str(tree / 'a.bin'), container, PASSWORD)
+    damaged = str(tmp_path / 'damaged.enc')
+    with open(container, 'rb') as src, open(damaged, 'wb') as dst:
+        data = bytearray(src.read())
+        data[-1] ^= 1
+        dst.write(data)
+
+    report = verify_files([archive, container, damaged], PASSWORD, workers=2)
+    assert report.good == [archive, container]
+    assert [path for path, _ in report.bad] == [damaged]
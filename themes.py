@@ -0,0 +1,408 @@
+"""
+GHHS-EC&DC - Theme stylesheets
+Both themes are combined into THEME_STYLESHEET, which the main window
+parses once. Every rule is scoped to QMainWindow[theme="dark"] or
+QMainWindow[theme="light"], so switching themes only changes the window's
+"theme" property and re-polishes widgets; no CSS is parsed again.
+"""
+
+import re
+
+
+# High contrast dark theme - убираем неподдерживаемые свойства
+DARK_STYLESHEET = """
+QMainWindow {
+    background-color: #0d1117;
+    color: #ffffff;
+}
+QFrame#headerFrame {
+    background-color: #161b22;
+    border-radius: 12px;
+    border: 2px solid #30363d;
+}
+QLabel#titleLabel {
+    font-size: 28px;
+    font-weight: 800;
+    color: #58a6ff;
+    padding: 0px;
+}
+QPushButton#themeButton, QPushButton#languageButton {
+    background-color: #21262d;
+    color: #c9d1d9;
+    border: 2px solid #30363d;
+    border-radius: 10px;
+    font-weight: 600;
+    font-size: 13px;
+    padding: 8px 4px;  /* Добавляем внутренние отступы */
+}
+QPushButton#themeButton:hover, QPushButton#languageButton:hover {
+    background-color: #30363d;
+    border: 2px solid #58a6ff;
+}
+QPushButton#themeButton:pressed, QPushButton#languageButton:pressed {
+    background-color: #0d1117;
+    border: 2px solid #8e6cff;
+}
+QTabWidget#mainTabs::pane {
+    border: 2px solid #30363d;
+    border-radius: 12px;
+    background-color: #161b22;
+}
+QTabBar::tab {
+    background-color: #21262d;
+    color: #8b949e;
+    padding: 12px 24px;
+    margin: 3px;
+    border: 2px solid #30363d;
+    border-radius: 10px;
+    font-weight: 600;
+    font-size: 13px;
+}
+QTabBar::tab:selected {
+    background-color: #1f6feb;
+    color: #ffffff;
+    border: 2px solid #58a6ff;
+}
+QTabBar::tab:hover {
+    background-color: #30363d;
+    color: #c9d1d9;
+}
+QGroupBox {
+    font-weight: 700;
+    border: 2px solid #30363d;
+    border-radius: 12px;
+    margin-top: 15px;
+    padding-top: 20px;
+    color: #f0f6fc;
+    background-color: #21262d;
+    font-size: 14px;
+}
+QGroupBox::title {
+    subcontrol-origin: margin;
+    left: 15px;
+    padding: 0 12px 0 12px;
+    color: #58a6ff;
+    background-color: #21262d;
+    font-weight: 700;
+}
+QTextEdit {
+    background-color: #0d1117;
+    color: #f0f6fc;
+    border: 2px solid #30363d;
+    border-radius: 10px;
+    padding: 12px;
+    font-family: 'Segoe UI', system-ui, sans-serif;
+    font-size: 13px;
+    selection-background-color: #1f6feb;
+    selection-color: #ffffff;
+}
+QTextEdit:focus {
+    border: 2px solid #58a6ff;
+    background-color: #161b22;
+}
+QPushButton {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #1f6feb, stop:1 #8e6cff);
+    color: #ffffff;
+    border: none;
+    padding: 12px 24px;
+    border-radius: 10px;
+    font-weight: 700;
+    font-size: 13px;
+    min-width: 120px;
+}
+QPushButton:hover {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #58a6ff, stop:1 #a371f7);
+}
+QPushButton:pressed {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0d419d, stop:1 #6e40c9);
+}
+QPushButton:disabled {
+    background-color: #30363d;
+    color: #8b949e;
+}
+QLabel {
+    color: #f0f6fc;
+    font-weight: 600;
+    font-size: 13px;
+    background-color: transparent;
+}
+QLabel#fileInfo {
+    color: #8b949e;
+    font-style: italic;
+    font-weight: 500;
+}
+QLabel#fileInfo[selected="true"] {
+    color: #3fb950;
+    font-style: normal;
+    font-weight: 600;
+}
+QTableWidget {
+    background-color: #0d1117;
+    color: #f0f6fc;
+    gridline-color: #30363d;
+    border: 2px solid #30363d;
+    border-radius: 10px;
+    selection-background-color: #1f6feb;
+    selection-color: #ffffff;
+}
+QHeaderView::section {
+    background-color: #21262d;
+    color: #c9d1d9;
+    border: none;
+    border-right: 1px solid #30363d;
+    padding: 6px;
+    font-weight: 600;
+}
+QSpinBox {
+    background-color: #0d1117;
+    color: #f0f6fc;
+    border: 2px solid #30363d;
+    border-radius: 8px;
+    padding: 4px 8px;
+}
+QProgressBar {
+    border: 2px solid #30363d;
+    border-radius: 10px;
+    text-align: center;
+    color: #ffffff;
+    font-weight: 600;
+    background-color: #0d1117;
+    font-size: 11px;
+    height: 18px;
+}
+QProgressBar::chunk {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #1f6feb, stop:1 #8e6cff);
+    border-radius: 8px;
+}
+QMessageBox {
+    background-color: #161b22;
+    color: #ffffff;
+    border: 2px solid #30363d;
+    border-radius: 12px;
+}
+QMessageBox QLabel {
+    color: #ffffff;
+}
+QMessageBox QPushButton {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #1f6feb, stop:1 #8e6cff);
+    color: #ffffff;
+    border: none;
+    padding: 8px 16px;
+    border-radius: 8px;
+    min-width: 70px;
+    font-weight: 600;
+}
+QMessageBox QPushButton:hover {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #58a6ff, stop:1 #a371f7);
+}
+"""
+
+# High contrast light theme - убираем неподдерживаемые свойства
+LIGHT_STYLESHEET = """
+QMainWindow {
+    background-color: #ffffff;
+    color: #24292f;
+}
+QFrame#headerFrame {
+    background-color: #f6f8fa;
+    border-radius: 12px;
+    border: 2px solid #d0d7de;
+}
+QLabel#titleLabel {
+    font-size: 28px;
+    font-weight: 800;
+    color: #0969da;
+    padding: 0px;
+}
+QPushButton#themeButton, QPushButton#languageButton {
+    background-color: #ffffff;
+    color: #24292f;
+    border: 2px solid #d0d7de;
+    border-radius: 10px;
+    font-weight: 600;
+    font-size: 13px;
+    padding: 8px 4px;  /* Добавляем внутренние отступы */
+}
+QPushButton#themeButton:hover, QPushButton#languageButton:hover {
+    background-color: #f6f8fa;
+    border: 2px solid #0969da;
+}
+QPushButton#themeButton:pressed, QPushButton#languageButton:pressed {
+    background-color: #eaeef2;
+    border: 2px solid #8250df;
+}
+QTabWidget#mainTabs::pane {
+    border: 2px solid #d0d7de;
+    border-radius: 12px;
+    background-color: #ffffff;
+}
+QTabBar::tab {
+    background-color: #f6f8fa;
+    color: #656d76;
+    padding: 12px 24px;
+    margin: 3px;
+    border: 2px solid #d0d7de;
+    border-radius: 10px;
+    font-weight: 600;
+    font-size: 13px;
+}
+QTabBar::tab:selected {
+    background-color: #0969da;
+    color: #ffffff;
+    border: 2px solid #0969da;
+}
+QTabBar::tab:hover {
+    background-color: #eaeef2;
+    color: #24292f;
+}
+QGroupBox {
+    font-weight: 700;
+    border: 2px solid #d0d7de;
+    border-radius: 12px;
+    margin-top: 15px;
+    padding-top: 20px;
+    color: #24292f;
+    background-color: #f6f8fa;
+    font-size: 14px;
+}
+QGroupBox::title {
+    subcontrol-origin: margin;
+    left: 15px;
+    padding: 0 12px 0 12px;
+    color: #0969da;
+    background-color: #f6f8fa;
+    font-weight: 700;
+}
+QTextEdit {
+    background-color: #ffffff;
+    color: #24292f;
+    border: 2px solid #d0d7de;
+    border-radius: 10px;
+    padding: 12px;
+    font-family: 'Segoe UI', system-ui, sans-serif;
+    font-size: 13px;
+    selection-background-color: #0969da;
+    selection-color: #ffffff;
+}
+QTextEdit:focus {
+    border: 2px solid #0969da;
+    background-color: #f6f8fa;
+}
+QPushButton {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0969da, stop:1 #8250df);
+    color: #ffffff;
+    border: none;
+    padding: 12px 24px;
+    border-radius: 10px;
+    font-weight: 700;
+    font-size: 13px;
+    min-width: 120px;
+}
+QPushButton:hover {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #1a7de8, stop:1 #8a63e0);
+}
+QPushButton:pressed {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0757b8, stop:1 #6b45b5);
+}
+QPushButton:disabled {
+    background-color: #d0d7de;
+    color: #8c959f;
+}
+QLabel {
+    color: #24292f;
+    font-weight: 600;
+    font-size: 13px;
+    background-color: transparent;
+}
+QLabel#fileInfo {
+    color: #656d76;
+    font-style: italic;
+    font-weight: 500;
+}
+QLabel#fileInfo[selected="true"] {
+    color: #1a7f37;
+    font-style: normal;
+    font-weight: 600;
+}
+QTableWidget {
+    background-color: #ffffff;
+    color: #24292f;
+    gridline-color: #d0d7de;
+    border: 2px solid #d0d7de;
+    border-radius: 10px;
+    selection-background-color: #0969da;
+    selection-color: #ffffff;
+}
+QHeaderView::section {
+    background-color: #f6f8fa;
+    color: #24292f;
+    border: none;
+    border-right: 1px solid #d0d7de;
+    padding: 6px;
+    font-weight: 600;
+}
+QSpinBox {
+    background-color: #ffffff;
+    color: #24292f;
+    border: 2px solid #d0d7de;
+    border-radius: 8px;
+    padding: 4px 8px;
+}
+QProgressBar {
+    border: 2px solid #d0d7de;
+    border-radius: 10px;
+    text-align: center;
+    color: #24292f;
+    font-weight: 600;
+    background-color: #ffffff;
+    font-size: 11px;
+    height: 18px;
+}
+QProgressBar::chunk {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0969da, stop:1 #8250df);
+    border-radius: 8px;
+}
+QMessageBox {
+    background-color: #ffffff;
+    color: #24292f;
+    border: 2px solid #d0d7de;
+    border-radius: 12px;
+}
+QMessageBox QLabel {
+    color: #24292f;
+}
+QMessageBox QPushButton {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0969da, stop:1 #8250df);
+    color: #ffffff;
+    border: none;
+    padding: 8px 16px;
+    border-radius: 8px;
+    min-width: 70px;
+    font-weight: 600;
+}
+QMessageBox QPushButton:hover {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #1a7de8, stop:1 #8a63e0);
+}
+"""
+
+_RULE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+
+
+def scope_stylesheet(theme, stylesheet):
+    """Prefix every selector of ``stylesheet`` with QMainWindow[theme="<theme>"]."""
+    scope = f'QMainWindow[theme="{theme}"]'
+    
+    def scoped(match):
+        selectors = []
+        for selector in match.group(1).split(','):
+            selector = selector.strip()
+            if selector.startswith('QMainWindow'):
+                selectors.append(scope + selector[len('QMainWindow'):])
+            else:
+                selectors.append(f'{scope} {selector}')
+        return '\n' + ', '.join(selectors) + ' {' + match.group(2) + '}'
+    
+    return _RULE.sub(scoped, stylesheet)
+
+
+THEME_STYLESHEET = scope_stylesheet('dark', DARK_STYLESHEET) + scope_stylesheet('light', LIGHT_STYLESHEET)